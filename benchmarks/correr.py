@@ -0,0 +1,262 @@
+"""
+Benchmarks de los caminos calientes de los dashboards
+
+Mide con datos sinteticos (benchmarks/generadores.py) las funciones que
+corren en cada rerun de Streamlit: grafo de dependencias, impacto en
+cascada, tareas vencidas, filtros del sidebar, programa nivelado, Gantt,
+carga por responsable, conteos del Resumen, mapa de la huerta, registros
+de Google Sheets y series de sensores, de 10^2 a 10^5 elementos.
+
+Cada corrida se agrega a benchmarks/historial.json (mediana en ms por caso
+y escala, con el commit) y se compara con la corrida anterior: los casos
+mas lentos que el umbral se listan como regresiones.
+
+Uso:
+    python benchmarks/correr.py
+    python benchmarks/correr.py --escalas 100 1000 --casos gantt programa
+    python benchmarks/correr.py --no-guardar --estricto   # CI: falla si hay regresiones
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "dashboard"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import generadores  # noqa: E402
+from historial import UMBRAL_REGRESION, cerrar_corrida  # noqa: E402
+from mapa_huerta import figura_mapa  # noqa: E402
+from pronostico_cosecha import normalizar_cosecha, series_semanales  # noqa: E402
+from salud_sensores import DetectorSensor  # noqa: E402
+from submuestreo import serie_para_grafico  # noqa: E402
+from tareas_core import ColeccionTareas  # noqa: E402
+from tareas_core.carga import carga_por_responsable  # noqa: E402
+from tareas_core.gantt import MAX_BARRAS, agregar, en_ventana, periodo_para, segmentos, tabla_gantt  # noqa: E402
+from tareas_core.programacion import programar  # noqa: E402
+from tareas_core.resumen import conteo_por_estado, resumen_conteos  # noqa: E402
+
+ESCALAS = [100, 1000, 10000, 100000]
+
+# Casos registrados: nombre -> (escala maxima, preparar(n) -> funcion a medir)
+CASOS = {}
+
+
+def caso(nombre, escala_maxima=max(ESCALAS)):
+    """Registra preparar(n), que arma los datos fuera del tiempo medido"""
+    def registrar(preparar):
+        CASOS[nombre] = (escala_maxima, preparar)
+        return preparar
+    return registrar
+
+
+# ============================================================
+# CASOS: TAREAS
+# ============================================================
+
+HOY = date.today()
+
+
+def _coleccion(n):
+    return ColeccionTareas(generadores.tareas(n, hoy=HOY))
+
+
+@caso("grafo_dependencias")
+def _grafo(n):
+    coleccion = _coleccion(n)
+    return coleccion._construir_grafo
+
+
+@caso("impacto_cascada")
+def _impacto(n):
+    # Las primeras tareas son las de cascada mas larga
+    coleccion = _coleccion(n)
+    raices = [t['id'] for t in coleccion.lista[:100]]
+
+    def medir():
+        coleccion._impacto.clear()
+        for tarea_id in raices:
+            coleccion.impacto_cascada(tarea_id)
+    return medir
+
+
+@caso("tareas_vencidas")
+def _vencidas(n):
+    coleccion = _coleccion(n)
+
+    def medir():
+        coleccion._fechas.clear()
+        coleccion.clasificar_fechas(HOY)
+    return medir
+
+
+@caso("filtros_sidebar")
+def _filtros(n):
+    # Mismas combinaciones que el sidebar: sin filtro, un filtro y varios
+    coleccion = _coleccion(n)
+    combinaciones = [
+        {},
+        {'responsable': 'persona1'},
+        {'estado': 'en_proceso', 'prioridad': 'alta'},
+        {'responsable': 'persona2', 'categoria': 'cat3', 'estado': 'por_iniciar', 'prioridad': 'media'},
+    ]
+
+    def medir():
+        for filtros in combinaciones:
+            coleccion.filtrar(**filtros)
+    return medir
+
+
+@caso("programa")
+def _programa(n):
+    coleccion = _coleccion(n)
+    return lambda: programar(coleccion, HOY)
+
+
+@caso("gantt")
+def _gantt(n):
+    # Tabla + ventana de 4 meses + agregacion si hace falta + trazas por color
+    coleccion = _coleccion(n)
+    programa = programar(coleccion, HOY)
+
+    def medir():
+        df = tabla_gantt(coleccion, coleccion.lista, programa=programa)
+        visible = en_ventana(df, HOY - timedelta(days=30), HOY + timedelta(days=90))
+        if len(visible) > MAX_BARRAS:
+            visible = agregar(visible, 'Responsable', 'Estado', periodo_para(visible))
+        segmentos(visible, 'Responsable', 'Estado', 'Tarea')
+    return medir
+
+
+@caso("carga_responsable")
+def _carga(n):
+    coleccion = _coleccion(n)
+    df = tabla_gantt(coleccion, coleccion.lista, programa=programar(coleccion, HOY))
+    return lambda: carga_por_responsable(df)
+
+
+@caso("resumen")
+def _resumen(n):
+    coleccion = _coleccion(n)
+    vencidas = coleccion.clasificar_fechas(HOY)['vencidas']
+
+    def medir():
+        resumen_conteos(coleccion.lista, vencidas)
+        conteo_por_estado(coleccion.lista, lambda t: coleccion.responsable_nombre(t['responsable']),
+                          coleccion.estado_nombre, 'Responsable')
+    return medir
+
+
+# ============================================================
+# CASOS: HUERTA
+# ============================================================
+
+@caso("mapa_huerta", escala_maxima=1000)
+def _mapa(n):
+    # Una traza por cama: mas alla de 10^3 camas el mapa deja de ser legible
+    zonas = generadores.zonas(n)
+    return lambda: figura_mapa(zonas)
+
+
+@caso("registros_cosecha")
+def _cosecha(n):
+    crudo = generadores.registros_cosecha(n)
+    return lambda: series_semanales(normalizar_cosecha(crudo))
+
+
+@caso("registros_huevos")
+def _huevos(n):
+    # Como la pestana Huevos: columna a numero y serie al ancho del grafico
+    crudo = generadores.registros_huevos(n)
+
+    def medir():
+        df = crudo.assign(cantidad_num=pd.to_numeric(crudo['Cantidad'], errors='coerce'))
+        serie_para_grafico(df[['cantidad_num']], 'cantidad_num')
+    return medir
+
+
+@caso("sensor_lttb")
+def _sensor_lttb(n):
+    df = generadores.lecturas_sensor(n)
+    return lambda: serie_para_grafico(df, 'humedad_suelo', col_x='fecha', metodo="lttb")
+
+
+@caso("sensor_minmax")
+def _sensor_minmax(n):
+    df = generadores.lecturas_sensor(n)
+    return lambda: serie_para_grafico(df, 'humedad_suelo', col_x='fecha', metodo="minmax")
+
+
+@caso("sensor_detector")
+def _sensor_detector(n):
+    # Lectura por lectura, como llegan al monitor de salud
+    df = generadores.lecturas_sensor(n)
+    lecturas = list(zip(df['humedad_suelo'].tolist(), df['fecha'].astype(str).tolist()))
+
+    def medir():
+        detector = DetectorSensor("WH51-1", "humedad_suelo")
+        for valor, fecha in lecturas:
+            detector.actualizar(valor, fecha)
+    return medir
+
+
+# ============================================================
+# MEDICION E HISTORIAL
+# ============================================================
+
+def medir(funcion, repeticiones, presupuesto):
+    """Tiempos en ms; corta antes de `repeticiones` si se pasa del presupuesto (s)"""
+    tiempos = []
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+        if time.perf_counter() - inicio > presupuesto:
+            break
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de los dashboards con datos sinteticos")
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS)
+    parser.add_argument("--casos", nargs="+", choices=sorted(CASOS), help="Solo estos casos")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--presupuesto", type=float, default=3.0,
+                        help="Segundos maximos por caso y escala (minimo una repeticion)")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION)
+    parser.add_argument("--no-guardar", action="store_true", help="No agregar la corrida al historial")
+    parser.add_argument("--estricto", action="store_true", help="Salir con error si hay regresiones")
+    args = parser.parse_args()
+
+    resultados = {}
+    for nombre in args.casos or CASOS:
+        escala_maxima, preparar = CASOS[nombre]
+        for n in sorted(args.escalas):
+            if n > escala_maxima:
+                continue
+            funcion = preparar(n)
+            funcion()  # calentamiento (imports y caches de pandas/plotly)
+            tiempos = medir(funcion, args.repeticiones, args.presupuesto)
+            clave = f"{nombre}@{n}"
+            resultados[clave] = {
+                'mediana_ms': round(statistics.median(tiempos), 3),
+                'min_ms': round(min(tiempos), 3),
+                'repeticiones': len(tiempos),
+            }
+            print(f"{nombre:20s} {n:>7d}  {resultados[clave]['mediana_ms']:10.2f} ms "
+                  f"(min {resultados[clave]['min_ms']:.2f}, n={len(tiempos)})")
+
+    lentos = cerrar_corrida(resultados, args.umbral, guardar=not args.no_guardar)
+    if lentos and args.estricto:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Datos sinteticos para los benchmarks
+====================================
+Generadores deterministas (semilla fija) con la forma de los datos reales:
+
+- tareas(): proyecto como data/tareas_proyecto.json con N tareas y una
+  densidad de dependencias (promedio de dependencias por tarea), siempre
+  hacia tareas anteriores para que el grafo no tenga ciclos
+- zonas(): N camas como config['zonas'] en una grilla
+- registros_cosecha() / registros_huevos(): filas del Google Sheet tal como
+  llegan del CSV (fechas y cantidades como texto)
+- lecturas_sensor(): serie por minuto de un sensor de suelo con ruido,
+  riegos y algunos valores fuera de rango
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+SEMILLA = 42
+
+ESTADOS = [
+    {'id': 'por_iniciar', 'nombre': 'Por iniciar', 'color': '#6c757d'},
+    {'id': 'en_proceso', 'nombre': 'En proceso', 'color': '#ffc107'},
+    {'id': 'pendiente_info', 'nombre': 'Pendiente info', 'color': '#17a2b8'},
+    {'id': 'bloqueado', 'nombre': 'Bloqueado', 'color': '#dc3545'},
+    {'id': 'revision', 'nombre': 'Revision/QA', 'color': '#6f42c1'},
+    {'id': 'finalizado', 'nombre': 'Finalizado', 'color': '#28a745'},
+]
+PESOS_ESTADO = [0.35, 0.2, 0.05, 0.05, 0.05, 0.3]
+PRIORIDADES = ['urgente', 'alta', 'media', 'baja']
+PESOS_PRIORIDAD = [0.05, 0.25, 0.5, 0.2]
+CULTIVOS = ['lechuga', 'rucula', 'espinaca', 'kale', 'tomate', 'albahaca', 'zanahoria', 'cilantro']
+COLORES_ZONA = ['#90EE90', '#228B22', '#FFA500', '#DEB887', '#9370DB', '#F08080']
+
+
+def tareas(n, densidad=1.0, n_responsables=12, n_categorias=10, hoy=None, semilla=SEMILLA):
+    """{'metadata', 'equipo', 'estados', 'categorias', 'tareas'} con n tareas"""
+    rng = np.random.default_rng(semilla)
+    hoy = hoy or date.today()
+    equipo = [{'id': f"persona{i}", 'nombre': f"Persona {i}", 'rol': 'Operario',
+               'capacidad': 0.5 if i % 4 == 3 else 1.0} for i in range(n_responsables)]
+    equipo.append({'id': 'sin_asignar', 'nombre': 'Sin asignar', 'rol': ''})
+    categorias = [{'id': f"cat{i}", 'nombre': f"Categoria {i}", 'icono': '📌'} for i in range(n_categorias)]
+
+    responsables = rng.integers(0, len(equipo), n)
+    cats = rng.integers(0, n_categorias, n)
+    estados = rng.choice(len(ESTADOS), n, p=PESOS_ESTADO)
+    prioridades = rng.choice(len(PRIORIDADES), n, p=PESOS_PRIORIDAD)
+    desfases = rng.integers(-60, 240, n)
+    duraciones = rng.integers(1, 6, n)
+    # Dependencias: Poisson(densidad) tareas entre las 200 anteriores
+    n_deps = rng.poisson(densidad, n)
+
+    lista = []
+    for i in range(n):
+        tarea_id = i + 1
+        previas = min(i, 200)
+        saltos = rng.integers(0, previas, min(n_deps[i], previas)) if previas else []
+        deps = sorted({int(tarea_id - 1 - k) for k in saltos})
+        lista.append({
+            'id': tarea_id,
+            'categoria': categorias[cats[i]]['id'],
+            'tarea': f"Tarea sintetica {tarea_id}",
+            'fecha_objetivo': (hoy + timedelta(days=int(desfases[i]))).isoformat(),
+            'estado': ESTADOS[estados[i]]['id'],
+            'responsable': equipo[responsables[i]]['id'],
+            'prioridad': PRIORIDADES[prioridades[i]],
+            'dependencias': deps,
+            'duracion_dias': int(duraciones[i]),
+            'notas': '',
+        })
+    return {
+        'metadata': {'proyecto': f"Sintetico {n}", 'fecha_inicio_obra': hoy.isoformat()},
+        'equipo': equipo,
+        'estados': ESTADOS,
+        'categorias': categorias,
+        'tareas': lista,
+    }
+
+
+def zonas(n, semilla=SEMILLA):
+    """n camas de 0.4-1.2 x 2-4 m en una grilla"""
+    rng = np.random.default_rng(semilla)
+    columnas = max(1, int(np.sqrt(n)))
+    anchos = rng.uniform(0.4, 1.2, n).round(1)
+    largos = rng.uniform(2.0, 4.0, n).round(1)
+    return [{
+        'id': f"cama{i + 1}",
+        'nombre': f"Cama {i + 1}",
+        'tipo': 'cama',
+        'grupo': 'hojas',
+        'ancho': float(anchos[i]),
+        'largo': float(largos[i]),
+        'alto': 1.0,
+        'x': (i % columnas) * 5,
+        'y': (i // columnas) * 2,
+        'cultivos': [CULTIVOS[i % len(CULTIVOS)]],
+        'sensor': f"WH51-{i + 1}",
+        'color': COLORES_ZONA[i % len(COLORES_ZONA)],
+    } for i in range(n)]
+
+
+def _marcas(n, rng, desde):
+    dias = np.sort(rng.integers(0, 730, n))
+    return [desde + timedelta(days=int(d)) for d in dias]
+
+
+def registros_cosecha(n, n_camas=20, semilla=SEMILLA):
+    """Pestana Cosecha: Marca temporal, Fecha (dd/mm/aaaa), Cultivo, Cama, Cantidad_kg"""
+    rng = np.random.default_rng(semilla)
+    fechas = _marcas(n, rng, datetime(2024, 1, 1))
+    return pd.DataFrame({
+        'Marca temporal': [f.strftime("%d/%m/%Y 08:00:00") for f in fechas],
+        'Fecha': [f.strftime("%d/%m/%Y") for f in fechas],
+        'Cultivo': rng.choice([c.capitalize() for c in CULTIVOS], n),
+        'Cama': [f"Cama {k}" for k in rng.integers(1, n_camas + 1, n)],
+        'Cantidad_kg': rng.gamma(2.0, 0.8, n).round(2).astype(str),
+    })
+
+
+def registros_huevos(n, semilla=SEMILLA):
+    """Pestana Huevos: Marca temporal, Fecha, Cantidad (texto)"""
+    rng = np.random.default_rng(semilla)
+    fechas = _marcas(n, rng, datetime(2024, 1, 1))
+    return pd.DataFrame({
+        'Marca temporal': [f.strftime("%d/%m/%Y 08:00:00") for f in fechas],
+        'Fecha': [f.strftime("%d/%m/%Y") for f in fechas],
+        'Cantidad': rng.poisson(9, n).astype(str),
+    })
+
+
+def lecturas_sensor(n, variable="humedad_suelo", semilla=SEMILLA):
+    """DataFrame fecha + variable con n lecturas por minuto"""
+    rng = np.random.default_rng(semilla)
+    fechas = pd.date_range("2025-01-01", periods=n, freq="min")
+    # Secado lento con riegos cada ~2 dias, ruido y 0.1% de lecturas invalidas
+    ciclo = (np.arange(n) % 2880) / 2880
+    valores = 60 - 25 * ciclo + rng.normal(0, 0.8, n)
+    invalidas = rng.random(n) < 0.001
+    valores[invalidas] = rng.choice([-1.0, 150.0], invalidas.sum())
+    return pd.DataFrame({'fecha': fechas, variable: valores.round(1)})
@@ -0,0 +1,79 @@
+"""
+Historial de corridas de benchmarks
+===================================
+benchmarks/historial.json es una lista de corridas (fecha, commit, python,
+plataforma y {clave: {'mediana_ms', ...}}). correr.py e importacion.py
+escriben en el mismo archivo con claves distintas; cada clave se compara
+con la ultima corrida que la midio.
+"""
+
+import json
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+HISTORIAL_PATH = Path(__file__).parent / "historial.json"
+
+# Mas lento que la corrida anterior por encima de este factor = regresion
+UMBRAL_REGRESION = 0.25
+
+# ...y por encima de esta diferencia absoluta (los casos de microsegundos son puro ruido)
+DIFERENCIA_MINIMA_MS = 1.0
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cargar_historial():
+    if not HISTORIAL_PATH.exists():
+        return []
+    with open(HISTORIAL_PATH, 'r') as f:
+        return json.load(f)
+
+
+def guardar_historial(historial):
+    with open(HISTORIAL_PATH, 'w') as f:
+        json.dump(historial, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def regresiones(resultados, historial, umbral):
+    """[(clave, ms anterior, ms actual)] contra la ultima corrida que midio cada clave"""
+    encontradas = []
+    for clave, actual in resultados.items():
+        anterior = next((c['resultados'][clave] for c in reversed(historial) if clave in c['resultados']), None)
+        if (anterior and actual['mediana_ms'] > anterior['mediana_ms'] * (1 + umbral)
+                and actual['mediana_ms'] - anterior['mediana_ms'] > DIFERENCIA_MINIMA_MS):
+            encontradas.append((clave, anterior['mediana_ms'], actual['mediana_ms']))
+    return encontradas
+
+
+def cerrar_corrida(resultados, umbral=UMBRAL_REGRESION, guardar=True):
+    """Lista las regresiones, agrega la corrida al historial y devuelve las regresiones"""
+    historial = cargar_historial()
+    lentos = regresiones(resultados, historial, umbral)
+    if lentos:
+        print(f"\nRegresiones (> {umbral:.0%} sobre la corrida anterior):")
+        for clave, antes, ahora in lentos:
+            print(f"  {clave:36s} {antes:10.2f} -> {ahora:10.2f} ms ({ahora / antes:.1f}x)")
+    else:
+        print("\nSin regresiones contra la corrida anterior")
+
+    if guardar:
+        historial.append({
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit_actual(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'resultados': resultados,
+        })
+        guardar_historial(historial)
+        print(f"Corrida guardada en {HISTORIAL_PATH}")
+    return lentos
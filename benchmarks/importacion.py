@@ -0,0 +1,126 @@
+"""
+Tiempo de importacion del primer render de cada app de Streamlit
+
+Un proceso nuevo de Streamlit ya tiene streamlit importado; lo que agrega
+cada app en frio es todo lo que importa hasta terminar de dibujar la pagina
+por defecto: los imports a nivel de modulo y los de esa pagina (los de las
+demas paginas se pagan solo al abrirlas).
+
+Cada app se dibuja una vez con AppTest en un interprete nuevo con
+-X importtime, sin estado de sesion (lo que ve un usuario al abrirla).
+Antes se importa streamlit y se corre un script vacio, para no contar la
+maquinaria de AppTest ni del runtime. Se reporta el total de imports
+(mediana de varias corridas), la duracion del render y el tiempo propio por
+paquete raiz (pandas, plotly, supabase...). Los totales van a
+benchmarks/historial.json como importacion:<app>.
+
+Uso:
+    python benchmarks/importacion.py
+    python benchmarks/importacion.py --apps tareas_equipo_supabase --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+DASHBOARD_DIR = BASE_DIR / "dashboard"
+sys.path.insert(0, str(Path(__file__).parent))
+
+from historial import UMBRAL_REGRESION, cerrar_corrida  # noqa: E402
+
+APPS = ["huerta_app", "huerta_operativo", "tareas_equipo", "tareas_equipo_supabase"]
+
+MARCA = "--imports-de-la-app--"
+
+# Corre en el interprete nuevo: argv[1] es la ruta de la app
+PRIMER_RENDER = f"""
+import sys
+import time
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+AppTest.from_string("import streamlit as st\\nst.markdown('')").run()
+sys.stderr.write("{MARCA}\\n")
+inicio = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+print((time.perf_counter() - inicio) * 1000)
+if at.exception:
+    sys.exit(at.exception[0].message)
+"""
+
+
+def correr_primer_render(ruta):
+    """(stderr de -X importtime posterior a la marca, ms del render) de un interprete nuevo"""
+    entorno = {**os.environ, 'PYTHONPATH': os.pathsep.join(
+        p for p in [str(DASHBOARD_DIR), os.environ.get('PYTHONPATH')] if p)}
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", PRIMER_RENDER, str(ruta)],
+                             cwd=DASHBOARD_DIR, env=entorno, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+    return proceso.stderr.split(MARCA, 1)[1], float(proceso.stdout.split()[-1])
+
+
+def perfil(salida):
+    """(total ms, {paquete raiz: ms propios}) de la salida de -X importtime"""
+    total = 0.0
+    paquetes = {}
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "[us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        raiz = nombre.strip().split(".")[0]
+        paquetes[raiz] = paquetes.get(raiz, 0.0) + int(propio) / 1000
+        # Sangria de 2 espacios por nivel: el nivel 0 son los imports de la app y de su pagina
+        if len(nombre) - len(nombre.lstrip()) == 1:
+            total += int(acumulado) / 1000
+    return total, paquetes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time del primer render de cada app en un interprete nuevo")
+    parser.add_argument("--apps", nargs="+", choices=APPS, default=APPS)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Paquetes mas lentos a listar por app")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION)
+    parser.add_argument("--no-guardar", action="store_true", help="No agregar la corrida al historial")
+    parser.add_argument("--estricto", action="store_true", help="Salir con error si hay regresiones")
+    args = parser.parse_args()
+
+    resultados = {}
+    for app in args.apps:
+        try:
+            corridas = []
+            for _ in range(args.repeticiones):
+                salida, render_ms = correr_primer_render(DASHBOARD_DIR / f"{app}.py")
+                corridas.append((*perfil(salida), render_ms))
+        except RuntimeError as e:
+            print(f"{app}: no se pudo dibujar la primera pagina ({e})")
+            continue
+        corridas.sort(key=lambda c: c[0])
+        totales = [c[0] for c in corridas]
+        renders = [c[2] for c in corridas]
+        _, paquetes, _ = corridas[len(corridas) // 2]
+        mas_lentos = sorted(paquetes.items(), key=lambda p: -p[1])[:args.top]
+        resultados[f"importacion:{app}"] = {
+            'mediana_ms': round(statistics.median(totales), 1),
+            'min_ms': round(min(totales), 1),
+            'render_ms': round(statistics.median(renders), 1),
+            'repeticiones': len(totales),
+            'paquetes_ms': {p: round(ms, 1) for p, ms in mas_lentos},
+        }
+        print(f"\n{app}: {statistics.median(totales):.0f} ms de imports (min {min(totales):.0f}, n={len(totales)}),"
+              f" render {statistics.median(renders):.0f} ms")
+        for paquete, ms in mas_lentos:
+            print(f"  {paquete:28s} {ms:8.1f} ms")
+
+    lentos = cerrar_corrida(resultados, args.umbral, guardar=not args.no_guardar)
+    if lentos and args.estricto:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
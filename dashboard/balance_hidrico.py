@@ -0,0 +1,212 @@
+"""
+HUERTA INTELIGENTE LPET - Balance hidrico por cama
+===================================================
+Modelo diario por cama que combina:
+- Humedad de suelo (WH51 de la cama o de otra cama del mismo grupo)
+- Lluvia del pluviometro WH40BH (solo camas al aire libre)
+- Grupo de cultivo (zonas[].grupo) para umbrales y secado por defecto
+
+Predice cuando cada cama cruza su umbral de 'aviso' (proximo riego).
+
+Es incremental: el estado por cama (ultimo dia cerrado, humedad y tasa
+de secado aprendida) se guarda en data/sensores/balance_hidrico.json y
+cada visita solo agrega las lecturas nuevas.
+"""
+
+import json
+from datetime import timedelta
+
+import pandas as pd
+
+from sensores import SENSORES_DIR, modelo_sensor, sensores_por_zona, cargar_historial
+
+ESTADO_PATH = SENSORES_DIR / "balance_hidrico.json"
+SENSOR_LLUVIA = "WH40BH"
+
+# Grupo de la zona -> clave en config['umbrales_riego']
+UMBRAL_POR_GRUPO = {
+    "hojas": "hojas_hierbas",
+    "hierbas": "hojas_hierbas",
+    "brasicas": "brasicas",
+    "tomate": "tomate",
+}
+
+# Secado inicial (% humedad por dia) antes de aprender de los datos
+SECADO_DEFAULT = {
+    "hojas_hierbas": 2.0,
+    "brasicas": 1.5,
+    "tomate": 1.2,
+}
+
+ALFA_SECADO = 0.2         # peso de cada dia seco nuevo en la tasa de secado
+LLUVIA_MIN_MM = 1.0       # bajo esto el dia cuenta como seco
+LLUVIA_SIN_RIEGO_MM = 5.0  # "Lluvia > X mm hoy -> No regar manana"
+
+
+def _fin_del_dia(dia):
+    """Ultimo instante de un dia 'YYYY-MM-DD' (para leer desde el dia siguiente)"""
+    return pd.Timestamp(dia) + timedelta(days=1) - timedelta(seconds=1)
+
+
+def grupo_riego(zona):
+    """Clave de umbrales de riego de una zona"""
+    if zona['tipo'] == 'invernadero':
+        return "tomate"
+    return UMBRAL_POR_GRUPO.get(zona.get('grupo'), "hojas_hierbas")
+
+
+def sensores_suelo(config):
+    """Diccionario zona_id -> sensores WH51 que la representan"""
+    por_zona = {z: [s for s in ss if modelo_sensor(s) == "WH51"]
+                for z, ss in sensores_por_zona(config).items()}
+    por_grupo = {}
+    for z in config['zonas']:
+        if por_zona.get(z['id']):
+            por_grupo.setdefault(z.get('grupo'), por_zona[z['id']])
+
+    resultado = {}
+    for z in config['zonas']:
+        if z['tipo'] not in ('cama', 'invernadero'):
+            continue
+        # Camas sin sensor usan el de otra cama del mismo grupo
+        resultado[z['id']] = por_zona.get(z['id']) or por_grupo.get(z.get('grupo'), [])
+    return resultado
+
+
+def serie_diaria(sensor_ids, desde=None):
+    """Humedad de suelo media por dia (promedio de los sensores dados)"""
+    series = []
+    for s in sensor_ids:
+        df = cargar_historial(s, desde=desde)
+        if len(df) > 0:
+            series.append(df.set_index('fecha')['humedad_suelo'].resample('D').mean())
+    if not series:
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+    return pd.concat(series, axis=1).mean(axis=1).dropna()
+
+
+def lluvia_diaria(desde=None):
+    """Lluvia total por dia del pluviometro"""
+    df = cargar_historial(SENSOR_LLUVIA, desde=desde)
+    if len(df) == 0:
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+    return df.set_index('fecha')['lluvia_mm'].resample('D').sum()
+
+
+class BalanceHidrico:
+    """Estado diario por cama, actualizado solo con dias nuevos"""
+
+    def __init__(self, config):
+        self.config = config
+        self.umbrales = config.get('umbrales_riego', {})
+        self.sensores = sensores_suelo(config)
+        self.estado = {}
+        if ESTADO_PATH.exists():
+            with open(ESTADO_PATH, 'r', encoding='utf-8') as f:
+                self.estado = json.load(f)
+
+    def guardar(self):
+        SENSORES_DIR.mkdir(parents=True, exist_ok=True)
+        with open(ESTADO_PATH, 'w', encoding='utf-8') as f:
+            json.dump(self.estado, f, ensure_ascii=False, indent=2)
+
+    def _estado_zona(self, zona):
+        clave = grupo_riego(zona)
+        est = self.estado.setdefault(zona['id'], {
+            'ultimo_dia': None,
+            'humedad': None,
+            'secado': SECADO_DEFAULT[clave],
+            'dias_secos': 0,
+        })
+        # Si cambiaron los sensores de la cama, se reinicia el aprendizaje
+        if est.get('sensores') != self.sensores.get(zona['id']):
+            est.update({'ultimo_dia': None, 'humedad': None, 'sensores': self.sensores.get(zona['id'])})
+        return est
+
+    def actualizar(self, hoy):
+        """Integra los dias cerrados nuevos (antes de hoy) y guarda el estado"""
+        hoy = pd.Timestamp(hoy).normalize()
+        ultimos = [self._estado_zona(z)['ultimo_dia'] for z in self.config['zonas']
+                   if z['id'] in self.sensores]
+        desde_global = min(ultimos) if ultimos and all(ultimos) else None
+        lluvia = lluvia_diaria(desde=_fin_del_dia(desde_global) if desde_global else None)
+        cache_series = {}
+
+        for zona in self.config['zonas']:
+            if zona['id'] not in self.sensores:
+                continue
+            est = self._estado_zona(zona)
+            sensores = tuple(self.sensores[zona['id']])
+            if not sensores:
+                continue
+            desde = est['ultimo_dia']
+            if (sensores, desde) not in cache_series:
+                cache_series[(sensores, desde)] = serie_diaria(
+                    sensores, desde=_fin_del_dia(desde) if desde else None)
+            diaria = cache_series[(sensores, desde)]
+            diaria = diaria[diaria.index < hoy]
+
+            al_aire = zona['tipo'] != 'invernadero'
+            for dia, humedad in diaria.items():
+                lluvia_dia = float(lluvia.get(dia, 0.0)) if al_aire else 0.0
+                if est['humedad'] is not None:
+                    delta = humedad - est['humedad']
+                    # Dia seco y sin riego: la caida es secado real
+                    if lluvia_dia < LLUVIA_MIN_MM and delta < 0:
+                        est['secado'] = (1 - ALFA_SECADO) * est['secado'] + ALFA_SECADO * (-delta)
+                        est['dias_secos'] += 1
+                est['humedad'] = float(humedad)
+                est['ultimo_dia'] = dia.strftime("%Y-%m-%d")
+
+        self.guardar()
+
+    def prediccion(self, hoy):
+        """Tabla con humedad actual y proximo riego estimado por cama"""
+        hoy = pd.Timestamp(hoy).normalize()
+        lluvia = lluvia_diaria(desde=hoy - timedelta(days=2))
+        lluvia_reciente = float(lluvia[lluvia.index >= hoy - timedelta(days=1)].sum())
+
+        cache_hoy = {}
+        filas = []
+        for zona in self.config['zonas']:
+            if zona['id'] not in self.sensores:
+                continue
+            clave = grupo_riego(zona)
+            umbral = self.umbrales.get(clave, {})
+            aviso = umbral.get('aviso')
+            est = self._estado_zona(zona)
+            sensores = self.sensores[zona['id']]
+
+            # Lecturas de hoy (dia abierto) si existen; si no, el ultimo dia cerrado
+            humedad = est['humedad']
+            if tuple(sensores) not in cache_hoy:
+                cache_hoy[tuple(sensores)] = serie_diaria(sensores, desde=hoy - timedelta(seconds=1))
+            hoy_parcial = cache_hoy[tuple(sensores)]
+            if len(hoy_parcial) > 0:
+                humedad = float(hoy_parcial.iloc[-1])
+
+            al_aire = zona['tipo'] != 'invernadero'
+            if humedad is None or aviso is None:
+                dias, estado = None, "Sin datos"
+            elif humedad <= aviso:
+                dias, estado = 0, "Regar hoy"
+            else:
+                dias = (humedad - aviso) / max(est['secado'], 0.1)
+                estado = "OK"
+            if dias is not None and al_aire and lluvia_reciente > LLUVIA_SIN_RIEGO_MM:
+                dias = max(dias, 1)
+                estado = "Lluvia reciente - no regar manana"
+
+            filas.append({
+                'Cama': zona['nombre'],
+                'Grupo': zona.get('grupo', clave),
+                'Sensor': ", ".join(sensores) or "-",
+                'Humedad (%)': round(humedad, 1) if humedad is not None else None,
+                'Aviso (%)': aviso,
+                'Secado (%/dia)': round(est['secado'], 2),
+                'Lluvia 48h (mm)': round(lluvia_reciente, 1) if al_aire else None,
+                'Dias para riego': round(dias, 1) if dias is not None else None,
+                'Proximo riego': (hoy + timedelta(days=int(dias))).strftime("%Y-%m-%d") if dias is not None else "-",
+                'Estado': estado,
+            })
+        return pd.DataFrame(filas)
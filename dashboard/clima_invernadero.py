@@ -0,0 +1,172 @@
+"""
+HUERTA INTELIGENTE LPET - Clima del invernadero
+================================================
+Reglas de ventilacion sobre el sensor WH31 del invernadero, segun
+config['umbrales_riego']['humedad_aire_invernadero']:
+
+- Humedad > ventilar durante mas de horas_ventilar -> Ventilar
+- Humedad > abrir_obligatorio                      -> Abrir si o si
+- Temperatura > temp_ventilar_c                    -> Ventilar + evaluar riego
+
+El backtest reproduce un historial completo con operaciones NumPy sobre
+todas las filas a la vez (sin ciclo por lectura).
+"""
+
+import numpy as np
+import pandas as pd
+
+SENSOR_INVERNADERO = "WH31"
+
+UMBRALES_DEFAULT = {
+    "ventilar": 80,
+    "abrir_obligatorio": 85,
+    "temp_ventilar_c": 32,
+    "horas_ventilar": 4,
+}
+
+NINGUNA, VENTILAR, VENTILAR_CALOR, ABRIR = 0, 1, 2, 3
+
+ACCIONES = {
+    NINGUNA: "Sin accion",
+    VENTILAR: "Ventilar",
+    VENTILAR_CALOR: "Ventilar + evaluar riego",
+    ABRIR: "Abrir si o si",
+}
+
+COLORES_ACCION = {
+    "Sin accion": "#4CAF50",
+    "Ventilar": "#FF9800",
+    "Ventilar + evaluar riego": "#F44336",
+    "Abrir si o si": "#B71C1C",
+}
+
+
+def umbrales_desde_config(config):
+    """Umbrales de la configuracion completados con los valores por defecto"""
+    umbrales = config.get('umbrales_riego', {}).get('humedad_aire_invernadero', {})
+    return {**UMBRALES_DEFAULT, **umbrales}
+
+
+def _horas_por_lectura(fechas):
+    """Horas que representa cada lectura (hasta la siguiente, sin contar huecos)"""
+    t = fechas.astype('datetime64[s]').astype(np.int64) / 3600.0
+    if len(t) < 2:
+        return np.zeros(len(t))
+    dt = np.diff(t)
+    paso = np.median(dt)
+    dt = np.append(dt, paso)
+    # Un hueco del gateway no cuenta como horas sobre el umbral
+    return np.minimum(dt, 3 * paso)
+
+
+def _horas_continuas(condicion, horas):
+    """Horas acumuladas de la racha actual en que condicion es verdadera"""
+    acumulado = np.cumsum(horas * condicion)
+    # Acumulado al cerrar la ultima racha falsa, propagado hacia adelante
+    base = np.where(condicion, 0.0, acumulado)
+    base = np.maximum.accumulate(base)
+    return np.where(condicion, acumulado - base, 0.0)
+
+
+def evaluar(fechas, humedad, temperatura, umbrales):
+    """
+    Codigo de accion por lectura (NINGUNA, VENTILAR, VENTILAR_CALOR, ABRIR).
+
+    fechas, humedad y temperatura son arreglos alineados y ordenados.
+    """
+    fechas = np.asarray(fechas, dtype='datetime64[ns]')
+    humedad = np.asarray(humedad, dtype=np.float64)
+    temperatura = np.asarray(temperatura, dtype=np.float64)
+    u = {**UMBRALES_DEFAULT, **umbrales}
+
+    sobre_ventilar = humedad > u['ventilar']
+    horas_sobre = _horas_continuas(sobre_ventilar, _horas_por_lectura(fechas))
+
+    return np.select(
+        [humedad > u['abrir_obligatorio'],
+         temperatura > u['temp_ventilar_c'],
+         horas_sobre > u['horas_ventilar']],
+        [ABRIR, VENTILAR_CALOR, VENTILAR],
+        default=NINGUNA
+    )
+
+
+def recomendacion_actual(df, umbrales):
+    """Accion recomendada para la ultima lectura del historial"""
+    if len(df) == 0:
+        return None
+    codigos = evaluar(df['fecha'].to_numpy(), df['humedad_aire'].to_numpy(),
+                      df['temperatura'].to_numpy(), umbrales)
+    ultima = df.iloc[-1]
+    return {
+        'fecha': ultima['fecha'],
+        'humedad_aire': ultima['humedad_aire'],
+        'temperatura': ultima['temperatura'],
+        'accion': ACCIONES[int(codigos[-1])],
+    }
+
+
+# ============================================================
+# BACKTEST
+# ============================================================
+
+def backtest(df, umbrales):
+    """
+    Reproduce el historial con las reglas.
+
+    Retorna (df con columna 'accion', resumen con horas y eventos por accion).
+    """
+    fechas = df['fecha'].to_numpy()
+    codigos = evaluar(fechas, df['humedad_aire'].to_numpy(),
+                      df['temperatura'].to_numpy(), umbrales)
+    horas = _horas_por_lectura(np.asarray(fechas, dtype='datetime64[ns]'))
+
+    # Un evento empieza cuando el codigo cambia a una accion distinta de NINGUNA
+    inicio = np.empty(len(codigos), dtype=bool)
+    if len(codigos):
+        inicio[0] = codigos[0] != NINGUNA
+        inicio[1:] = (codigos[1:] != codigos[:-1]) & (codigos[1:] != NINGUNA)
+
+    codigos_todos = np.arange(len(ACCIONES))
+    horas_accion = np.bincount(codigos, weights=horas, minlength=len(ACCIONES))
+    eventos = np.bincount(codigos[inicio], minlength=len(ACCIONES))
+    total_horas = horas.sum()
+
+    resumen = pd.DataFrame({
+        'Accion': [ACCIONES[c] for c in codigos_todos],
+        'Horas': horas_accion.round(1),
+        '% tiempo': (100 * horas_accion / total_horas).round(1) if total_horas else 0.0,
+        'Eventos': eventos,
+    })
+
+    df_eval = df[['fecha', 'humedad_aire', 'temperatura']].copy()
+    df_eval['accion'] = pd.Categorical.from_codes(codigos, categories=list(ACCIONES.values()))
+    return df_eval, resumen
+
+
+def barrido_umbrales(df, valores_ventilar, valores_temp, umbrales):
+    """
+    Horas de ventilacion y eventos para cada combinacion de umbrales.
+
+    Cada combinacion evalua el historial completo de forma vectorizada.
+    """
+    fechas = df['fecha'].to_numpy()
+    humedad = df['humedad_aire'].to_numpy()
+    temperatura = df['temperatura'].to_numpy()
+    horas = _horas_por_lectura(np.asarray(fechas, dtype='datetime64[ns]'))
+    dias = max(horas.sum() / 24, 1e-9)
+
+    filas = []
+    for v in valores_ventilar:
+        for t in valores_temp:
+            codigos = evaluar(fechas, humedad, temperatura,
+                              {**umbrales, 'ventilar': v, 'temp_ventilar_c': t})
+            activo = codigos != NINGUNA
+            n_eventos = int(activo[0]) + int(np.count_nonzero(activo[1:] & ~activo[:-1])) if len(activo) else 0
+            filas.append({
+                'Humedad ventilar (%)': v,
+                'Temp ventilar (C)': t,
+                'Horas con accion': round(float(horas[activo].sum()), 1),
+                'Eventos/dia': round(n_eventos / dias, 2),
+            })
+    return pd.DataFrame(filas)
@@ -0,0 +1,279 @@
+"""
+HUERTA INTELIGENTE LPET - Plan de compras de materiales
+========================================================
+Une presupuesto_real (config/huerta_config.json) con las tareas de
+data/tareas_proyecto.json:
+
+- Cada seccion del presupuesto se compra en una tarea "Compra ..."; sus
+  sucesoras en el grafo de dependencias son las que usan el material
+- Fecha limite de cada tarea = min(fecha_objetivo, inicio mas tardio de
+  sus sucesoras), en una sola pasada hacia atras por orden topologico
+- Material requerido para = min(limite de la tarea de compra,
+  metadata.fecha_limite_compras); pedir antes de esa fecha menos el
+  tiempo de entrega del proveedor
+- Lotes: pedidos al mismo proveedor con fechas a pocos dias se juntan
+- Al cambiar una fecha solo se recorren los ancestros de esa tarea; al
+  cambiar una cantidad solo la linea y su proveedor
+"""
+
+import heapq
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from presupuesto import Presupuesto
+from tareas_core.programacion import duracion
+
+# Tareas de compra por seccion del presupuesto (metadata.compras_por_seccion las reemplaza)
+COMPRAS_POR_SECCION = {
+    "huerta_12_camas": [11],
+    "encerramiento_huerta": [11],
+    "camas_algas_lombricompost": [37, 44],
+    "gallinero": [57],
+}
+
+# Secciones / items que no son materiales
+NO_MATERIALES = {"logistica", "transporte", "mano_obra_jornales"}
+
+# Proveedor por palabra clave del item (el item puede traer 'proveedor' propio)
+PROVEEDORES = {
+    "aserrio": {"dias_entrega": 5, "claves": ["tablas", "estacas", "estiba"]},
+    "agropecuaria": {"dias_entrega": 7, "claves": ["malla", "merulex", "geotextil"]},
+    "ferreteria": {"dias_entrega": 2, "claves": []},
+}
+PROVEEDOR_DEFAULT = "ferreteria"
+VENTANA_LOTE_DIAS = 3
+
+
+def _fecha(texto):
+    return datetime.strptime(texto, "%Y-%m-%d").date()
+
+
+def proveedor_item(nombre, item):
+    """Proveedor de un item: el guardado en el item o por palabra clave"""
+    if item.get('proveedor'):
+        return item['proveedor']
+    for proveedor, info in PROVEEDORES.items():
+        if any(clave in nombre for clave in info['claves']):
+            return proveedor
+    return PROVEEDOR_DEFAULT
+
+
+def unidades_a_comprar(item):
+    if item.get('en_existencia'):
+        return 0
+    return item['a_comprar'] if 'a_comprar' in item else item.get('cantidad', 0)
+
+
+class PlanCompras:
+    """Fechas de pedido y lotes por proveedor sobre el grafo de tareas"""
+
+    def __init__(self, datos_tareas, presupuesto_real, hoy=None):
+        self.hoy = hoy or date.today()
+        meta = datos_tareas['metadata']
+        self.limite_global = _fecha(meta['fecha_limite_compras']) if meta.get('fecha_limite_compras') else None
+        self.compras_seccion = {s: list(t) for s, t in
+                                meta.get('compras_por_seccion', COMPRAS_POR_SECCION).items()}
+        self.presupuesto = Presupuesto(presupuesto_real)
+
+        self.tareas = {t['id']: dict(t) for t in datos_tareas['tareas']}
+        self.sucesoras = {i: [] for i in self.tareas}
+        for t in self.tareas.values():
+            for d in t.get('dependencias', []):
+                if d in self.sucesoras:
+                    self.sucesoras[d].append(t['id'])
+        self.orden = self._orden_topologico()
+        self.posicion = {t: i for i, t in enumerate(self.orden)}
+
+        self.limite = {}
+        self._pasada_atras(self.orden)
+
+        self.lineas = {}
+        for (seccion, nombre), item in self.presupuesto.items.items():
+            if seccion in NO_MATERIALES or nombre in NO_MATERIALES:
+                continue
+            self._calcular_linea(seccion, nombre)
+        self.lotes = {}
+        for proveedor in {l['proveedor'] for l in self.lineas.values()}:
+            self._agrupar(proveedor)
+
+    # -------------------- grafo --------------------
+
+    def _orden_topologico(self):
+        pendientes = {i: len([d for d in t.get('dependencias', []) if d in self.tareas])
+                      for i, t in self.tareas.items()}
+        cola = sorted(i for i, n in pendientes.items() if n == 0)
+        orden = []
+        while cola:
+            actual = cola.pop()
+            orden.append(actual)
+            for s in self.sucesoras[actual]:
+                pendientes[s] -= 1
+                if pendientes[s] == 0:
+                    cola.append(s)
+        if len(orden) != len(self.tareas):
+            ciclo = sorted(i for i, n in pendientes.items() if n > 0)
+            raise ValueError(f"Dependencias circulares entre las tareas {ciclo}")
+        return orden
+
+    def _duracion(self, tarea_id):
+        return duracion(self.tareas[tarea_id])
+
+    def _limite_tarea(self, tarea_id):
+        """Fecha limite de fin: la propia o el inicio mas tardio de las sucesoras menos un dia"""
+        tarea = self.tareas[tarea_id]
+        candidatas = [_fecha(tarea['fecha_objetivo'])] if tarea.get('fecha_objetivo') else []
+        for s in self.sucesoras[tarea_id]:
+            if self.limite.get(s):
+                candidatas.append(self.limite[s] - timedelta(days=self._duracion(s)))
+        return min(candidatas) if candidatas else None
+
+    def _pasada_atras(self, tareas):
+        for tarea_id in reversed(tareas):
+            self.limite[tarea_id] = self._limite_tarea(tarea_id)
+
+    def inicio_tardio(self, tarea_id):
+        fin = self.limite.get(tarea_id)
+        return fin - timedelta(days=self._duracion(tarea_id) - 1) if fin else None
+
+    # -------------------- lineas de compra --------------------
+
+    def _calcular_linea(self, seccion, nombre):
+        item = self.presupuesto.items[(seccion, nombre)]
+        unidades = unidades_a_comprar(item)
+        clave = (seccion, nombre)
+        if not unidades or not self.presupuesto.suma[clave]:
+            self.lineas.pop(clave, None)
+            return
+        tareas_compra = [t for t in item.get('tareas', self.compras_seccion.get(seccion, []))
+                         if t in self.tareas]
+        fechas = [self.limite[t] for t in tareas_compra if self.limite.get(t)]
+        if self.limite_global:
+            fechas.append(self.limite_global)
+        requerido = min(fechas) if fechas else None
+        proveedor = proveedor_item(nombre, item)
+        entrega = item.get('dias_entrega', PROVEEDORES.get(proveedor, {}).get('dias_entrega', 0))
+        pedir = requerido - timedelta(days=entrega) if requerido else None
+        finalizada = bool(tareas_compra) and all(self.tareas[t]['estado'] == 'finalizado'
+                                                 for t in tareas_compra)
+        usan = sorted({s for t in tareas_compra for s in self.sucesoras[t]})
+        self.lineas[clave] = {
+            'seccion': seccion,
+            'item': nombre,
+            'unidades': unidades,
+            'costo_cop': self.presupuesto.suma[clave],
+            'proveedor': proveedor,
+            'tareas_compra': tareas_compra,
+            'tareas_que_usan': usan or tareas_compra,
+            'requerido_para': requerido,
+            'pedir_antes_de': pedir,
+            'comprado': finalizada,
+            'atrasado': bool(pedir and pedir < self.hoy and not finalizada),
+        }
+
+    def _agrupar(self, proveedor):
+        """Lotes del proveedor: une pedidos a menos de VENTANA_LOTE_DIAS del primero del lote"""
+        pendientes = sorted((l for l in self.lineas.values()
+                             if l['proveedor'] == proveedor and not l['comprado']),
+                            key=lambda l: (l['pedir_antes_de'] or date.max, l['item']))
+        lotes = []
+        for linea in pendientes:
+            fecha = linea['pedir_antes_de']
+            if lotes and fecha and lotes[-1]['pedir_antes_de'] \
+                    and (fecha - lotes[-1]['pedir_antes_de']).days <= VENTANA_LOTE_DIAS:
+                lotes[-1]['lineas'].append(linea)
+            else:
+                lotes.append({'proveedor': proveedor, 'pedir_antes_de': fecha, 'lineas': [linea]})
+        self.lotes[proveedor] = lotes
+
+    # -------------------- cambios incrementales --------------------
+
+    def cambiar_fecha(self, tarea_id, fecha_objetivo):
+        """Nueva fecha de una tarea: propaga solo hacia sus ancestros mientras cambie el limite"""
+        self.tareas[tarea_id]['fecha_objetivo'] = fecha_objetivo
+        cambiadas = set()
+        # Heap por posicion topologica descendente: cada ancestro se procesa una vez
+        cola = [(-self.posicion[tarea_id], tarea_id)]
+        en_cola = {tarea_id}
+        while cola:
+            _, actual = heapq.heappop(cola)
+            nuevo = self._limite_tarea(actual)
+            if nuevo == self.limite.get(actual) and actual != tarea_id:
+                continue
+            self.limite[actual] = nuevo
+            cambiadas.add(actual)
+            for d in self.tareas[actual].get('dependencias', []):
+                if d in self.tareas and d not in en_cola:
+                    en_cola.add(d)
+                    heapq.heappush(cola, (-self.posicion[d], d))
+        afectadas = [c for c, l in self.lineas.items() if cambiadas & set(l['tareas_compra'])]
+        if tarea_id in cambiadas or afectadas:
+            self._recalcular_lineas(afectadas)
+        return cambiadas
+
+    def cambiar_cantidad(self, seccion, nombre, **campos):
+        """Cambia cantidad / a_comprar / precio de un item y recalcula su linea y proveedor"""
+        self.presupuesto.actualizar_item(seccion, nombre, **campos)
+        self._recalcular_lineas([(seccion, nombre)])
+
+    def _recalcular_lineas(self, claves):
+        proveedores = set()
+        for seccion, nombre in claves:
+            anterior = self.lineas.get((seccion, nombre))
+            if anterior:
+                proveedores.add(anterior['proveedor'])
+            self._calcular_linea(seccion, nombre)
+            if (seccion, nombre) in self.lineas:
+                proveedores.add(self.lineas[(seccion, nombre)]['proveedor'])
+        for proveedor in proveedores:
+            self._agrupar(proveedor)
+
+    def actualizar(self, datos_tareas):
+        """Aplica solo las fechas que cambiaron respecto a las tareas guardadas"""
+        cambiadas = []
+        for t in datos_tareas['tareas']:
+            if t['id'] not in self.tareas:
+                continue
+            anterior = self.tareas[t['id']]
+            if t.get('estado') != anterior.get('estado'):
+                anterior['estado'] = t.get('estado')
+                self._recalcular_lineas([c for c, l in self.lineas.items() if t['id'] in l['tareas_compra']])
+            if t.get('fecha_objetivo') != anterior.get('fecha_objetivo'):
+                self.cambiar_fecha(t['id'], t.get('fecha_objetivo'))
+                cambiadas.append(t['id'])
+        return cambiadas
+
+    def actualizar_presupuesto(self, presupuesto_real):
+        """Aplica solo los items del presupuesto cuyas cantidades o precios cambiaron"""
+        nuevo = Presupuesto(presupuesto_real)
+        cambiados = []
+        for clave, item in nuevo.items.items():
+            if clave in self.presupuesto.items and item != self.presupuesto.items[clave]:
+                self.cambiar_cantidad(*clave, **item)
+                cambiados.append(clave)
+        return cambiados
+
+    # -------------------- salidas --------------------
+
+    def tabla_lineas(self):
+        columnas = ['seccion', 'item', 'unidades', 'costo_cop', 'proveedor', 'tareas_que_usan',
+                    'requerido_para', 'pedir_antes_de', 'comprado', 'atrasado']
+        df = pd.DataFrame(list(self.lineas.values()), columns=columnas + ['tareas_compra'])
+        return df[columnas].sort_values(['pedir_antes_de', 'proveedor']).reset_index(drop=True)
+
+    def tabla_lotes(self):
+        filas = []
+        for proveedor, lotes in self.lotes.items():
+            for n, lote in enumerate(lotes, 1):
+                filas.append({
+                    'proveedor': proveedor,
+                    'lote': n,
+                    'pedir_antes_de': lote['pedir_antes_de'],
+                    'items': len(lote['lineas']),
+                    'costo_cop': sum(l['costo_cop'] for l in lote['lineas']),
+                    'detalle': ", ".join(l['item'] for l in lote['lineas']),
+                    'atrasado': any(l['atrasado'] for l in lote['lineas']),
+                })
+        df = pd.DataFrame(filas, columns=['proveedor', 'lote', 'pedir_antes_de', 'items',
+                                          'costo_cop', 'detalle', 'atrasado'])
+        return df.sort_values('pedir_antes_de').reset_index(drop=True)
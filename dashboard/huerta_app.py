@@ -8,12 +8,23 @@ Ejecutar con: streamlit run dashboard/huerta_app.py
 import streamlit as st
 import json
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import os
 
+from modelo_financiero import (
+    ESCENARIOS_DEFAULT, PARAMETROS_ESCENARIO, entradas_desde_datos, sensibilidad,
+    evaluar_escenarios, vpn_por_tasa_cambio
+)
+from oferta_demanda import demanda_desde_datos, cruzar, resumen_semanal
+from pronostico_cosecha import PRONOSTICO_PATH, cargar_pronostico
+from taxonomia_cultivos import CLASES, CLASES_PRODUCTIVAS, indice_cultivos, normalizar, zonas_desde_datos
+
+# plotly.express se importa en las paginas que dibujan con el (ver
+# benchmarks/importacion.py); plotly.graph_objects ya lo carga Streamlit.
+# pandas queda arriba: lo usan los modulos de dominio y la pagina inicial.
+
 # ============================================================
 # CONFIGURACION DE PAGINA
 # ============================================================
@@ -87,6 +98,32 @@ def cargar_datos():
     st.warning("Archivo de datos no encontrado. Usando datos de ejemplo.")
     return generar_datos_ejemplo()
 
+@st.cache_data
+def cruce_oferta_demanda(version_pronostico, demanda):
+    """Cruce pronostico vs demanda (cache por version del pronostico y demanda)"""
+    meta, pronostico = cargar_pronostico()
+    if meta is None or len(pronostico) == 0:
+        return None
+    detalle, sugerencias, sobrantes = cruzar(pronostico, dict(demanda))
+    return meta, detalle, sugerencias, resumen_semanal(detalle, sobrantes)
+
+@st.cache_data
+def sensibilidad_finanzas(entradas, variacion):
+    """Tornado memoizado por hash de las entradas y la variacion"""
+    return sensibilidad(dict(entradas), variacion)
+
+def _dict_escenarios(escenarios):
+    return {n: dict(zip(PARAMETROS_ESCENARIO, valores)) for n, valores in escenarios}
+
+@st.cache_data(max_entries=256)
+def escenarios_finanzas(escenarios, finanzas_json):
+    """Metricas y curvas (cache por parametros de los escenarios)"""
+    return evaluar_escenarios(json.loads(finanzas_json), _dict_escenarios(escenarios))
+
+@st.cache_data(max_entries=256)
+def vpn_tasa_cambio(escenarios, finanzas_json, tasas):
+    return vpn_por_tasa_cambio(json.loads(finanzas_json), _dict_escenarios(escenarios), tasas)
+
 def generar_datos_ejemplo():
     """Genera datos de ejemplo si no existe el JSON"""
     return {
@@ -142,6 +179,8 @@ st.sidebar.caption(f"Ultima actualizacion: {datetime.now().strftime('%Y-%m-%d %H
 # PAGINA: VISTA GENERAL
 # ============================================================
 if pagina == "Vista General":
+    import plotly.express as px
+
     st.markdown('<div class="main-header">HUERTA INTELIGENTE LPET</div>', unsafe_allow_html=True)
     st.markdown(f"### {datos['metadata']['finca']} - {datos['metadata']['ubicacion']}")
 
@@ -624,6 +663,8 @@ elif pagina == "Mapa Interactivo":
 # PAGINA: ZONAS DE CULTIVO
 # ============================================================
 elif pagina == "Zonas de Cultivo":
+    import plotly.express as px
+
     st.markdown('<div class="main-header">ZONAS DE CULTIVO</div>', unsafe_allow_html=True)
 
     # Tabla de camas
@@ -703,50 +744,113 @@ elif pagina == "Produccion":
     # Grafico de produccion por categoria
     st.subheader("Produccion Semanal por Categoria")
 
-    categorias_prod = {
-        'Hojas (lechuga, espinaca)': prod.get('hojas_kg_semana', 8),
-        'Cruciferas (brocoli, kale)': prod.get('cruciferas_kg_semana', 4),
-        'Raices (zanahoria)': prod.get('raices_kg_semana', 5),
-        'Aromaticas': prod.get('aromaticas_kg_semana', 2),
-        'Tomate (invernadero)': prod.get('tomate_kg_semana', 4)
+    indice = indice_cultivos(zonas_desde_datos(datos))
+    kg_semana = indice.produccion_kg_mes() * 7 / 30
+    clases_activas = [c for c in CLASES_PRODUCTIVAS if kg_semana[c] > 0]
+
+    # Plan del documento (si lo trae) junto a la estimacion por area
+    plan_por_clase = {
+        'hojas': prod.get('hojas_kg_semana'),
+        'brasicas': prod.get('cruciferas_kg_semana'),
+        'raices': prod.get('raices_kg_semana'),
+        'aromaticas': prod.get('aromaticas_kg_semana'),
+        'tomate': prod.get('tomate_kg_semana'),
     }
 
-    fig_prod = px.bar(
-        x=list(categorias_prod.keys()),
-        y=list(categorias_prod.values()),
-        labels={'x': 'Categoria', 'y': 'Produccion (kg/semana)'},
-        color=list(categorias_prod.keys()),
-        color_discrete_sequence=['#4CAF50', '#8BC34A', '#FF9800', '#9C27B0', '#F44336']
-    )
-    fig_prod.update_layout(showlegend=False, height=400)
+    fig_prod = go.Figure()
+    fig_prod.add_trace(go.Bar(
+        name='Estimado (area x rendimiento)',
+        x=[CLASES[c]['nombre'] for c in clases_activas],
+        y=[round(kg_semana[c], 1) for c in clases_activas],
+        marker_color=[CLASES[c]['color'] for c in clases_activas]
+    ))
+    fig_prod.add_trace(go.Bar(
+        name='Plan',
+        x=[CLASES[c]['nombre'] for c in clases_activas],
+        y=[plan_por_clase.get(c) for c in clases_activas],
+        marker_color='#B0BEC5'
+    ))
+    fig_prod.update_layout(barmode='group', height=400,
+                           yaxis_title='Produccion (kg/semana)', xaxis_title='Categoria')
 
     st.plotly_chart(fig_prod, use_container_width=True)
 
+    if indice.sin_clasificar:
+        st.warning(f"Cultivos sin clase en la taxonomia: {', '.join(sorted(indice.sin_clasificar))}")
+
+    # Oferta pronosticada vs demanda de la cocina
+    st.markdown("---")
+    st.subheader("Oferta vs Demanda Semanal (Cocina)")
+
+    demanda_df = pd.DataFrame(sorted(demanda_desde_datos(datos).items()),
+                              columns=['Cultivo o clase', 'Kg/semana'])
+    with st.expander("Demanda semanal de la cocina"):
+        demanda_df = st.data_editor(demanda_df, num_rows="dynamic", hide_index=True,
+                                    use_container_width=True, key="demanda_cocina")
+    # Mismos nombres que el pronostico (alias y plurales); filas repetidas se suman
+    demanda_kg = {}
+    for _, r in demanda_df.dropna().iterrows():
+        if r['Kg/semana'] > 0:
+            item = normalizar(str(r['Cultivo o clase']))
+            demanda_kg[item] = demanda_kg.get(item, 0.0) + float(r['Kg/semana'])
+    demanda = tuple(sorted(demanda_kg.items()))
+
+    version = PRONOSTICO_PATH.stat().st_mtime if PRONOSTICO_PATH.exists() else None
+    cruce = cruce_oferta_demanda(version, demanda) if demanda else None
+    if cruce is None:
+        st.info("Sin pronostico de cosecha. Ejecuta `python scripts/pronosticar_cosecha.py`.")
+    else:
+        meta, detalle, sugerencias, resumen = cruce
+        st.caption(f"Pronostico generado {meta['generado']}")
+
+        semana_sel = st.selectbox("Semana", resumen['semana'].dt.strftime("%Y-%m-%d").tolist())
+        fila = resumen[resumen['semana'] == pd.Timestamp(semana_sel)].iloc[0]
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Demanda", f"{fila['demanda']:.1f} kg")
+        with col2:
+            st.metric("Cobertura", f"{fila['cobertura_%']:.0f}%")
+        with col3:
+            st.metric("Faltante", f"{fila['faltante']:.1f} kg")
+        with col4:
+            st.metric("Sobrante", f"{fila['sobrante']:.1f} kg")
+
+        det_sem = detalle[detalle['semana'] == pd.Timestamp(semana_sel)]
+        fig_cruce = go.Figure()
+        fig_cruce.add_trace(go.Bar(name='Mismo cultivo', x=det_sem['item'], y=det_sem['directo'],
+                                   marker_color='#4CAF50'))
+        fig_cruce.add_trace(go.Bar(name='Sustitucion', x=det_sem['item'], y=det_sem['sustitucion'],
+                                   marker_color='#FFC107'))
+        fig_cruce.add_trace(go.Bar(name='Faltante', x=det_sem['item'], y=det_sem['faltante'],
+                                   marker_color='#F44336'))
+        fig_cruce.update_layout(barmode='stack', height=350, yaxis_title='kg')
+        st.plotly_chart(fig_cruce, use_container_width=True)
+
+        sug_sem = sugerencias[sugerencias['semana'] == pd.Timestamp(semana_sel)]
+        if len(sug_sem) > 0:
+            st.markdown("**Sustituciones sugeridas:**")
+            for _, s in sug_sem.iterrows():
+                st.markdown(f"- Usar **{s['kg']:.1f} kg de {s['usar']}** en lugar de {s['pedido']}")
+
+        with st.expander("Resumen de las proximas semanas"):
+            st.dataframe(resumen.assign(semana=resumen['semana'].dt.strftime("%Y-%m-%d")),
+                         use_container_width=True, hide_index=True)
+
     # Calendario de cultivos
     st.markdown("---")
     st.subheader("Ciclos de Cultivo")
 
-    ciclos = datos.get('produccion', {}).get('cultivos_por_ciclo', {})
+    ciclos = indice.por_ciclo(datos.get('produccion', {}).get('cultivos_por_ciclo'))
+    titulos = list(ciclos)
 
     col1, col2 = st.columns(2)
 
-    with col1:
-        st.markdown("**Ciclo Rapido (30 dias):**")
-        for cultivo in ciclos.get('rapido_30_dias', ['lechuga', 'rucula', 'rabano']):
-            st.markdown(f"- {cultivo.capitalize()}")
-
-        st.markdown("**Ciclo Medio (60 dias):**")
-        for cultivo in ciclos.get('medio_60_dias', ['espinaca', 'acelga']):
-            st.markdown(f"- {cultivo.capitalize()}")
-
-    with col2:
-        st.markdown("**Ciclo Largo (90+ dias):**")
-        for cultivo in ciclos.get('largo_90_dias', ['brocoli', 'zanahoria']):
-            st.markdown(f"- {cultivo.capitalize()}")
-
-        st.markdown("**Permanentes:**")
-        for cultivo in ciclos.get('permanente', ['romero', 'tomillo']):
-            st.markdown(f"- {cultivo.capitalize()}")
+    for col, pares in ((col1, titulos[:2]), (col2, titulos[2:])):
+        with col:
+            for titulo in pares:
+                st.markdown(f"**{titulo}:**")
+                for cultivo in ciclos[titulo]:
+                    st.markdown(f"- {cultivo.capitalize()}")
 
 # ============================================================
 # PAGINA: ANIMALES
@@ -806,9 +910,12 @@ elif pagina == "Animales":
 # PAGINA: FINANZAS
 # ============================================================
 elif pagina == "Finanzas":
+    import plotly.express as px
+
     st.markdown('<div class="main-header">ANALISIS FINANCIERO</div>', unsafe_allow_html=True)
 
     finanzas = datos['finanzas']
+    finanzas_json = json.dumps(finanzas, sort_keys=True)
 
     # KPIs financieros
     col1, col2, col3, col4 = st.columns(4)
@@ -885,43 +992,116 @@ elif pagina == "Finanzas":
 
         st.plotly_chart(fig_flujo, use_container_width=True)
 
-    # Proyeccion de payback
+    # Valor de la produccion a precios de la taxonomia
     st.markdown("---")
-    st.subheader("Proyeccion de Recuperacion de Inversion")
-
-    inversion_cop = finanzas['inversion_inicial_usd']['total'] * 4000
-    beneficio_mensual = finanzas['analisis']['beneficio_neto_cop']
-
-    meses = list(range(13))
-    acumulado = [-inversion_cop + (beneficio_mensual * m * 0.7 if m < 3 else beneficio_mensual * m) for m in meses]
-
-    fig_payback = go.Figure()
-
-    fig_payback.add_trace(go.Scatter(
-        x=meses,
-        y=[a/1000000 for a in acumulado],
-        mode='lines+markers',
-        name='Flujo Acumulado',
-        line=dict(color='#2196F3', width=3),
-        fill='tozeroy',
-        fillcolor='rgba(33, 150, 243, 0.1)'
-    ))
-
-    fig_payback.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Punto de Equilibrio")
-
-    fig_payback.update_layout(
-        title="Flujo de Caja Acumulado (Millones COP)",
-        xaxis_title="Mes",
-        yaxis_title="COP (Millones)",
-        height=400
+    st.subheader("Valor Mensual de la Produccion por Categoria")
+
+    indice = indice_cultivos(zonas_desde_datos(datos))
+    kg_mes = indice.produccion_kg_mes()
+    valor_mes = indice.valor_cop_mes()
+    clases_activas = [c for c in CLASES_PRODUCTIVAS if kg_mes[c] > 0]
+
+    valor_df = pd.DataFrame({
+        'Categoria': [CLASES[c]['nombre'] for c in clases_activas],
+        'Area (m2)': [round(indice.area_por_clase()[c], 1) for c in clases_activas],
+        'Kg/mes': [round(kg_mes[c], 1) for c in clases_activas],
+        'Precio (COP/kg)': [CLASES[c]['precio_cop_kg'] for c in clases_activas],
+        'Valor (COP/mes)': [round(valor_mes[c]) for c in clases_activas],
+    })
+    st.dataframe(valor_df, use_container_width=True, hide_index=True)
+    st.caption(f"Valor total estimado: ${valor_mes[clases_activas].sum():,.0f} COP/mes "
+               f"(ahorro en verduras del plan: ${finanzas['ahorros_mensual_cop'].get('verduras_hotel', 0):,.0f} COP/mes)")
+
+    # Proyeccion de payback por escenarios
+    st.markdown("---")
+    st.subheader("Escenarios de Recuperacion de Inversion")
+
+    tabla_esc = pd.DataFrame.from_dict(ESCENARIOS_DEFAULT, orient='index')[PARAMETROS_ESCENARIO]
+    tabla_esc.index.name = 'Escenario'
+    with st.expander("Editar escenarios (agrega filas para escenarios propios)"):
+        tabla_esc = st.data_editor(tabla_esc.reset_index(), num_rows="dynamic", hide_index=True,
+                                   use_container_width=True, key="escenarios_financieros")
+    tabla_esc = tabla_esc.dropna().drop_duplicates('Escenario', keep='last')
+    escenarios = tuple(
+        (str(fila['Escenario']), tuple(float(fila[p]) for p in PARAMETROS_ESCENARIO))
+        for _, fila in tabla_esc.iterrows()
     )
 
-    st.plotly_chart(fig_payback, use_container_width=True)
+    if escenarios:
+        metricas, curvas = escenarios_finanzas(escenarios, finanzas_json)
+        nombres_esc = [n for n, _ in escenarios]
+        visibles = st.multiselect("Escenarios a comparar", nombres_esc, default=nombres_esc[:3])
+        descontado = st.toggle("Flujo descontado", value=False)
+
+        st.dataframe(metricas[metricas['Escenario'].isin(visibles)].round(1),
+                     use_container_width=True, hide_index=True)
+
+        col_curva = 'acumulado_descontado' if descontado else 'acumulado'
+        fig_payback = go.Figure()
+        for nombre in visibles:
+            curva = curvas[curvas['escenario'] == nombre]
+            fig_payback.add_trace(go.Scatter(x=curva['mes'], y=curva[col_curva] / 1000000,
+                                             mode='lines', name=nombre))
+        fig_payback.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Punto de Equilibrio")
+        fig_payback.update_layout(
+            title="Flujo de Caja Acumulado (Millones COP)" + (" - descontado" if descontado else ""),
+            xaxis_title="Mes",
+            yaxis_title="COP (Millones)",
+            height=400
+        )
+        st.plotly_chart(fig_payback, use_container_width=True)
+
+        # Sensibilidad a la tasa de cambio (la inversion esta en USD)
+        tasas = tuple(range(3400, 5001, 200))
+        vpn_tc = vpn_tasa_cambio(escenarios, finanzas_json, tasas)
+        fig_tc = px.line(vpn_tc[visibles] / 1000000, markers=True,
+                         labels={'value': 'VPN (Millones COP)', 'tasa_cop_usd': 'COP por USD'},
+                         title="VPN segun tasa COP/USD")
+        fig_tc.update_layout(height=350)
+        st.plotly_chart(fig_tc, use_container_width=True)
+
+    # Sensibilidad de las entradas
+    st.markdown("---")
+    st.subheader("Analisis de Sensibilidad")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        variacion = st.slider("Variacion de cada entrada (+/- %)", 5, 50, 20, 5)
+    with col2:
+        metrica = st.radio("Impacto sobre", ["Payback (meses)", "Beneficio neto (COP/mes)"], horizontal=True)
+
+    entradas = tuple(sorted(entradas_desde_datos(finanzas).items()))
+    tornado = sensibilidad_finanzas(entradas, variacion / 100)
+    clave = 'payback_meses' if metrica.startswith("Payback") else 'beneficio_neto_cop'
+    tornado = tornado[tornado['metrica'] == clave]
+    base = tornado['base'].iloc[0]
+
+    if not np.isfinite(base):
+        st.info("Con el beneficio neto base en cero o negativo no hay payback: "
+                "revisa el tornado de Beneficio neto.")
+    else:
+        # Una variacion sin beneficio positivo da payback infinito: se muestra en el borde del grafico
+        maximo = tornado[['bajo', 'alto']].replace(np.inf, np.nan).abs().max().max()
+        tope = (maximo if pd.notna(maximo) else abs(base)) * 1.5 or 1.0
+        bajo = tornado['bajo'].clip(upper=tope) - base
+        alto = tornado['alto'].clip(upper=tope) - base
+
+        fig_tornado = go.Figure()
+        fig_tornado.add_trace(go.Bar(y=tornado['entrada'], x=bajo, base=base, orientation='h',
+                                     name=f"-{variacion}%", marker_color='#F44336'))
+        fig_tornado.add_trace(go.Bar(y=tornado['entrada'], x=alto, base=base, orientation='h',
+                                     name=f"+{variacion}%", marker_color='#4CAF50'))
+        fig_tornado.add_vline(x=base, line_color="black")
+        fig_tornado.update_layout(barmode='overlay', height=350, xaxis_title=metrica,
+                                  title=f"Tornado: {metrica} (base {base:,.1f})")
+        st.plotly_chart(fig_tornado, use_container_width=True)
 
 # ============================================================
 # PAGINA: CRONOGRAMA
 # ============================================================
 elif pagina == "Cronograma":
+    import plotly.express as px
+
     st.markdown('<div class="main-header">CRONOGRAMA DE IMPLEMENTACION</div>', unsafe_allow_html=True)
 
     cronograma = datos.get('cronograma', {})
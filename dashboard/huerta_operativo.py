@@ -12,10 +12,31 @@ import streamlit as st
 import json
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
 import os
 
+from submuestreo import serie_para_grafico, ANCHO_GRAFICO_PX
+from mapa_huerta import figura_mapa, figura_vista_previa
+from sensores import (
+    VARIABLES_POR_MODELO, modelo_sensor, sensores_configurados, cargar_historial,
+    agregar_lecturas, cargar_alertas, encolar_alertas, marcar_alerta_atendida
+)
+from salud_sensores import MonitorSalud
+from balance_hidrico import BalanceHidrico
+from montecarlo import N_ESCENARIOS, resumen_escenarios
+from planificador_siembras import PlanSiembras, plan_vigente, guardar_plan, demanda_desde_datos
+from pronostico_cosecha import PRONOSTICO_PATH, cargar_pronostico
+from presupuesto import Presupuesto
+from taxonomia_cultivos import CLASES, CLASES_PRODUCTIVAS, indice_cultivos, zonas_desde_config
+from clima_invernadero import (
+    SENSOR_INVERNADERO, COLORES_ACCION, umbrales_desde_config, recomendacion_actual,
+    backtest, barrido_umbrales
+)
+
+# plotly.express se importa en las paginas que dibujan con el (ver
+# benchmarks/importacion.py); plotly.graph_objects ya lo carga Streamlit.
+# pandas queda arriba: lo usan los modulos de dominio y la pagina inicial.
+
 # ============================================================
 # CONFIGURACION
 # ============================================================
@@ -28,6 +49,7 @@ st.set_page_config(
 # Ruta de configuracion
 CONFIG_PATH = "config/huerta_config.json"
 SHEETS_CONFIG_PATH = "config/google_sheets.json"
+DATOS_PATH = "output/huerta_datos.json"
 
 # ============================================================
 # FUNCIONES DE DATOS
@@ -91,6 +113,21 @@ def cargar_datos_sheets(sheet_id, tab_name):
     except Exception as e:
         return None
 
+@st.cache_data(ttl=300)
+def preparar_serie_grafico(df, col_y, ultimos=None, ancho=ANCHO_GRAFICO_PX, metodo="lttb", col_x=None):
+    """Serie reducida al ancho del grafico (cache por serie, rango y ancho)"""
+    return serie_para_grafico(df, col_y, col_x=col_x, n_puntos=ancho, metodo=metodo, ultimos=ultimos)
+
+@st.cache_data
+def leer_pronostico_cosecha(version):
+    """Ultimo artefacto del job de pronostico (version = fecha de modificacion del archivo)"""
+    return cargar_pronostico()
+
+@st.cache_data(max_entries=64)
+def escenarios_montecarlo(parametros, n=N_ESCENARIOS):
+    """Resumen Monte Carlo (cache por hash de parametros: volver a un ajuste es instantaneo)"""
+    return resumen_escenarios(parametros, n=n)
+
 # ============================================================
 # SIDEBAR
 # ============================================================
@@ -99,7 +136,9 @@ st.sidebar.markdown("---")
 
 pagina = st.sidebar.radio(
     "Menu",
-    ["📊 Dashboard", "✏️ Editor Huerta", "📝 Ver Registros", "📈 Estimaciones", "⚙️ Configuracion"]
+    ["📊 Dashboard", "✏️ Editor Huerta", "📝 Ver Registros", "📈 Estimaciones",
+     "🗓️ Siembras", "💰 Presupuesto", "💧 Riego",
+     "🌡️ Clima Invernadero", "🩺 Salud Sensores", "⚙️ Configuracion"]
 )
 
 # Cargar configuracion
@@ -139,40 +178,7 @@ if pagina == "📊 Dashboard":
     # Mapa de la huerta
     st.subheader("Mapa de la Huerta")
 
-    fig = go.Figure()
-
-    for zona in config['zonas']:
-        x0, y0 = zona['x'], zona['y']
-        x1, y1 = x0 + zona['largo'], y0 + zona['ancho']
-
-        fig.add_trace(go.Scatter(
-            x=[x0, x1, x1, x0, x0],
-            y=[y0, y0, y1, y1, y0],
-            fill='toself',
-            fillcolor=zona['color'],
-            line=dict(color='black', width=1),
-            name=zona['nombre'],
-            hovertemplate=f"<b>{zona['nombre']}</b><br>" +
-                         f"Area: {zona['ancho'] * zona['largo']:.1f} m²<br>" +
-                         f"Cultivos: {', '.join(zona['cultivos'])}<extra></extra>"
-        ))
-
-        # Etiqueta
-        fig.add_annotation(
-            x=(x0 + x1) / 2,
-            y=(y0 + y1) / 2,
-            text=zona['nombre'],
-            showarrow=False,
-            font=dict(size=10)
-        )
-
-    fig.update_layout(
-        height=500,
-        showlegend=True,
-        xaxis=dict(title="Metros", scaleanchor="y"),
-        yaxis=dict(title="Metros"),
-        legend=dict(orientation="h", y=-0.1)
-    )
+    fig = figura_mapa(config['zonas'])
 
     st.plotly_chart(fig, use_container_width=True)
 
@@ -235,37 +241,10 @@ elif pagina == "✏️ Editor Huerta":
         st.subheader("Vista previa")
 
         # Mini mapa con la zona editada
-        fig_preview = go.Figure()
-
-        # Mostrar todas las zonas
-        for i, z in enumerate(config['zonas']):
-            if i == zona_idx:
-                # Zona editada (valores nuevos)
-                x0, y0 = nueva_x, nueva_y
-                x1, y1 = x0 + nuevo_largo, y0 + nuevo_ancho
-                color = nuevo_color
-                nombre = nuevo_nombre
-            else:
-                x0, y0 = z['x'], z['y']
-                x1, y1 = x0 + z['largo'], y0 + z['ancho']
-                color = z['color']
-                nombre = z['nombre']
-
-            fig_preview.add_trace(go.Scatter(
-                x=[x0, x1, x1, x0, x0],
-                y=[y0, y0, y1, y1, y0],
-                fill='toself',
-                fillcolor=color,
-                line=dict(color='black', width=2 if i == zona_idx else 1),
-                name=nombre,
-                showlegend=False
-            ))
-
-        fig_preview.update_layout(
-            height=400,
-            xaxis=dict(title="X (m)", scaleanchor="y"),
-            yaxis=dict(title="Y (m)")
-        )
+        zonas_preview = list(config['zonas'])
+        zonas_preview[zona_idx] = {**zona, 'nombre': nuevo_nombre, 'x': nueva_x, 'y': nueva_y,
+                                   'ancho': nuevo_ancho, 'largo': nuevo_largo, 'color': nuevo_color}
+        fig_preview = figura_vista_previa(zonas_preview, resaltada=zona_idx)
 
         st.plotly_chart(fig_preview, use_container_width=True)
 
@@ -331,6 +310,8 @@ elif pagina == "✏️ Editor Huerta":
 # PAGINA: VER REGISTROS
 # ============================================================
 elif pagina == "📝 Ver Registros":
+    import plotly.express as px
+
     st.title("📝 Registros de Operarios")
 
     # Configurar conexion
@@ -380,6 +361,28 @@ elif pagina == "📝 Ver Registros":
                 3. Ingresa el ID del Sheet arriba
                 """)
 
+            # Pronostico precalculado por scripts/pronosticar_cosecha.py
+            st.markdown("#### Pronostico proximas semanas")
+            version = PRONOSTICO_PATH.stat().st_mtime if PRONOSTICO_PATH.exists() else None
+            meta, df_pron = leer_pronostico_cosecha(version)
+            if meta is None or len(df_pron) == 0:
+                st.info("Aun no hay pronostico. Ejecuta `python scripts/pronosticar_cosecha.py`.")
+            else:
+                st.caption(f"Generado {meta['generado']} con {meta['registros']} registros "
+                           f"(hasta la semana del {meta.get('ultima_semana', '-')})")
+                vista = st.radio("Ver por", ["Cultivo", "Cama"], horizontal=True, key="vista_pron")
+                col_grupo = 'cultivo' if vista == "Cultivo" else 'cama'
+                agregado = df_pron.groupby(['semana', col_grupo], as_index=False)[['kg', 'kg_min', 'kg_max']].sum()
+                fig = px.bar(agregado, x='semana', y='kg', color=col_grupo,
+                             title="Kg pronosticados por semana")
+                total = df_pron.groupby('semana')[['kg_min', 'kg_max']].sum().reset_index()
+                fig.add_trace(go.Scatter(x=total['semana'], y=total['kg_max'], mode='lines',
+                                         line=dict(dash='dot', color='gray'), name='Total P90'))
+                fig.add_trace(go.Scatter(x=total['semana'], y=total['kg_min'], mode='lines',
+                                         line=dict(dash='dot', color='gray'), name='Total P10'))
+                fig.update_layout(height=350)
+                st.plotly_chart(fig, use_container_width=True)
+
         with tab2:
             st.subheader("Registro de Huevos")
             df_huevos = cargar_datos_sheets(sheet_id, "Huevos")
@@ -390,7 +393,11 @@ elif pagina == "📝 Ver Registros":
                 if len(df_huevos.columns) > 2:
                     col_cantidad = df_huevos.columns[2]
                     df_huevos['cantidad_num'] = pd.to_numeric(df_huevos[col_cantidad], errors='coerce')
-                    fig = px.line(df_huevos.tail(30), y='cantidad_num', title="Huevos ultimos 30 registros")
+                    rango_huevos = st.radio("Rango", ["Ultimos 30 registros", "Todo el historial"],
+                                            horizontal=True, key="rango_huevos")
+                    ultimos = 30 if rango_huevos == "Ultimos 30 registros" else None
+                    df_graf = preparar_serie_grafico(df_huevos[['cantidad_num']], 'cantidad_num', ultimos)
+                    fig = px.line(df_graf, y='cantidad_num', title=f"Huevos - {rango_huevos.lower()}")
                     st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("No hay datos de huevos.")
@@ -429,6 +436,8 @@ elif pagina == "📝 Ver Registros":
 # PAGINA: ESTIMACIONES
 # ============================================================
 elif pagina == "📈 Estimaciones":
+    import plotly.express as px
+
     st.title("📈 Estimaciones y Proyecciones")
 
     # Cargar datos de sheets si hay
@@ -441,23 +450,24 @@ elif pagina == "📈 Estimaciones":
 
     col1, col2 = st.columns(2)
 
+    indice = indice_cultivos(zonas_desde_config(config), config.get('cultivos'),
+                             config.get('reparto_area', "completa"))
+    area_clase = indice.area_por_clase()
+    clases_activas = [c for c in CLASES_PRODUCTIVAS if area_clase[c] > 0]
+
     with col1:
         st.subheader("Produccion")
 
-        # Productividad por m2 (editable)
-        prod_hojas = st.number_input("Kg hojas/m²/mes", 0.5, 5.0, 2.0, 0.1)
-        prod_raices = st.number_input("Kg raices/m²/mes", 1.0, 8.0, 3.0, 0.1)
-        prod_tomate = st.number_input("Kg tomate/m²/mes", 2.0, 10.0, 4.0, 0.1)
-
-        # Calcular produccion estimada
-        area_hojas = sum(z['ancho'] * z['largo'] for z in config['zonas']
-                        if any(c in ['lechuga', 'rucula', 'espinaca', 'acelga', 'kale']
-                              for c in z['cultivos']))
-        area_raices = sum(z['ancho'] * z['largo'] for z in config['zonas']
-                         if any(c in ['zanahoria', 'remolacha', 'rabano']
-                               for c in z['cultivos']))
-        area_tomate = sum(z['ancho'] * z['largo'] for z in config['zonas']
-                         if 'tomate' in z['cultivos'])
+        # Productividad por m2 (editable, valores iniciales de la taxonomia)
+        rendimientos = {}
+        for clase in clases_activas:
+            rendimientos[clase] = st.number_input(
+                f"Kg {CLASES[clase]['nombre'].lower()}/m²/mes ({area_clase[clase]:.1f} m²)",
+                0.0, 10.0, float(CLASES[clase]['rendimiento_kg_m2_mes']), 0.1)
+
+        if indice.sin_clasificar:
+            st.warning(f"Cultivos sin clase en la taxonomia (no se cuentan): "
+                       f"{', '.join(sorted(indice.sin_clasificar))}")
 
     with col2:
         st.subheader("Animales")
@@ -475,20 +485,14 @@ elif pagina == "📈 Estimaciones":
     st.subheader("Resultados Estimados (Mensual)")
 
     # Calculos
-    kg_hojas_mes = area_hojas * prod_hojas
-    kg_raices_mes = area_raices * prod_raices
-    kg_tomate_mes = area_tomate * prod_tomate
+    kg_clase_mes = indice.produccion_kg_mes(rendimientos)
     huevos_mes = gallinas * (tasa_postura / 100) * 30
 
-    col1, col2, col3, col4 = st.columns(4)
-
-    with col1:
-        st.metric("Hojas verdes", f"{kg_hojas_mes:.1f} kg/mes")
-    with col2:
-        st.metric("Raices", f"{kg_raices_mes:.1f} kg/mes")
-    with col3:
-        st.metric("Tomate", f"{kg_tomate_mes:.1f} kg/mes")
-    with col4:
+    columnas = st.columns(len(clases_activas) + 1)
+    for col, clase in zip(columnas, clases_activas):
+        with col:
+            st.metric(CLASES[clase]['nombre'], f"{kg_clase_mes[clase]:.1f} kg/mes")
+    with columnas[-1]:
         st.metric("Huevos", f"{huevos_mes:.0f}/mes")
 
     st.markdown("---")
@@ -498,9 +502,11 @@ elif pagina == "📈 Estimaciones":
 
     with col1:
         # Ingresos
-        precio_hojas = st.number_input("Precio hojas (COP/kg)", 1000, 20000, 8000, 500)
-        precio_raices = st.number_input("Precio raices (COP/kg)", 1000, 15000, 5000, 500)
-        precio_tomate = st.number_input("Precio tomate (COP/kg)", 1000, 15000, 6000, 500)
+        precios = {}
+        for clase in clases_activas:
+            precios[clase] = st.number_input(
+                f"Precio {CLASES[clase]['nombre'].lower()} (COP/kg)",
+                0, 60000, int(CLASES[clase]['precio_cop_kg']), 500)
         precio_huevo = st.number_input("Precio huevo (COP/u)", 200, 2000, 800, 50)
 
     with col2:
@@ -513,12 +519,10 @@ elif pagina == "📈 Estimaciones":
                                         config['costos']['insumos_mensual_cop'], 10000)
 
     # Calcular financiero
-    ingreso_hojas = kg_hojas_mes * precio_hojas
-    ingreso_raices = kg_raices_mes * precio_raices
-    ingreso_tomate = kg_tomate_mes * precio_tomate
+    ingreso_clase = indice.valor_cop_mes(rendimientos, precios)
     ingreso_huevos = huevos_mes * precio_huevo
 
-    ingreso_total = ingreso_hojas + ingreso_raices + ingreso_tomate + ingreso_huevos
+    ingreso_total = ingreso_clase[clases_activas].sum() + ingreso_huevos
     costo_total = costo_operario + costo_insumos
     beneficio_neto = ingreso_total - costo_total
 
@@ -537,13 +541,386 @@ elif pagina == "📈 Estimaciones":
 
     # Grafico de composicion
     fig_ingresos = go.Figure(data=[
-        go.Bar(name='Ingresos', x=['Hojas', 'Raices', 'Tomate', 'Huevos'],
-               y=[ingreso_hojas, ingreso_raices, ingreso_tomate, ingreso_huevos],
-               marker_color=['#4CAF50', '#FF9800', '#F44336', '#FFD700'])
+        go.Bar(name='Ingresos',
+               x=[CLASES[c]['nombre'] for c in clases_activas] + ['Huevos'],
+               y=[ingreso_clase[c] for c in clases_activas] + [ingreso_huevos],
+               marker_color=[CLASES[c]['color'] for c in clases_activas] + ['#FFD700'])
     ])
     fig_ingresos.update_layout(title="Composicion de Ingresos", height=300)
     st.plotly_chart(fig_ingresos, use_container_width=True)
 
+    st.markdown("---")
+    st.subheader("Escenarios (Monte Carlo)")
+    st.caption(f"{N_ESCENARIOS:,} escenarios alrededor de los valores de arriba")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        var_rendimiento = st.slider("Variacion rendimientos (+/- %)", 0, 60, 30, 5)
+    with col2:
+        var_precio = st.slider("Variacion precios (+/- %)", 0, 50, 20, 5)
+    with col3:
+        desv_postura = st.slider("Desviacion tasa postura (puntos %)", 0, 20, 8)
+
+    parametros_mc = {
+        'areas': {c: float(area_clase[c]) for c in clases_activas},
+        'rendimientos': rendimientos,
+        'precios': precios,
+        'gallinas': gallinas,
+        'tasa_postura': tasa_postura / 100,
+        'precio_huevo': precio_huevo,
+        'costo_fijo': costo_total,
+        'var_rendimiento': var_rendimiento / 100,
+        'var_precio': var_precio / 100,
+        'desv_postura': desv_postura / 100,
+    }
+    mc = escenarios_montecarlo(parametros_mc)
+    tabla_mc = mc['bandas']
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Beneficio P5 (pesimista)", f"${tabla_mc.loc['beneficio_neto', 'P5']:,.0f} COP")
+    with col2:
+        st.metric("Beneficio P50", f"${tabla_mc.loc['beneficio_neto', 'P50']:,.0f} COP")
+    with col3:
+        st.metric("Probabilidad de perdida", f"{mc['prob_perdida'] * 100:.1f}%")
+
+    nombres_mc = {f"kg_{c}": f"{CLASES[c]['nombre']} (kg/mes)" for c in clases_activas}
+    nombres_mc.update({
+        'huevos': "Huevos (/mes)",
+        'ingresos': "Ingresos (COP/mes)",
+        'beneficio_neto': "Beneficio neto (COP/mes)",
+    })
+    st.dataframe(tabla_mc.rename(index=nombres_mc).round(1), use_container_width=True)
+
+    fig_mc = px.bar(mc['histograma'], x='beneficio', y='escenarios',
+                    title="Distribucion del beneficio neto mensual")
+    fig_mc.add_vline(x=0, line_dash="dash", line_color="red")
+    fig_mc.update_layout(height=300, bargap=0, xaxis_title="COP/mes")
+    st.plotly_chart(fig_mc, use_container_width=True)
+
+# ============================================================
+# PAGINA: SIEMBRAS
+# ============================================================
+elif pagina == "🗓️ Siembras":
+    st.title("🗓️ Plan de Siembras Escalonadas")
+
+    datos_huerta = {}
+    if os.path.exists(DATOS_PATH):
+        with open(DATOS_PATH, 'r', encoding='utf-8') as f:
+            datos_huerta = json.load(f)
+    demanda = demanda_desde_datos(datos_huerta)
+
+    plan, replanificadas = plan_vigente(config, demanda)
+    if replanificadas:
+        st.caption(f"Camas replanificadas en esta visita: {', '.join(replanificadas)}")
+
+    ind = plan.indicadores()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Demanda hotel", f"{demanda['objetivo']} kg/sem", f"{demanda['min']}-{demanda['max']} kg")
+    with col2:
+        st.metric("Oferta anual", f"{ind['kg_total']:.0f} kg")
+    with col3:
+        st.metric("Faltante anual", f"{ind['faltante_kg']:.0f} kg")
+    with col4:
+        st.metric("Semanas bajo minimo", ind['semanas_bajo_minimo'])
+
+    semanas = [plan.fecha_semana(s) for s in range(plan.horizonte)]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=semanas, y=plan.oferta.round(1), name='Oferta planificada',
+                         marker_color='#4CAF50'))
+    fig.add_hrect(y0=demanda['min'], y1=demanda['max'], fillcolor="#2196F3", opacity=0.1,
+                  line_width=0, annotation_text="Rango demanda hotel")
+    fig.add_hline(y=demanda['objetivo'], line_dash="dash", line_color="#2196F3")
+    fig.update_layout(title="Cosecha semanal planificada vs demanda", height=350,
+                      yaxis_title="kg/semana")
+    st.plotly_chart(fig, use_container_width=True)
+
+    nombres_zona = {z['id']: z['nombre'] for z in config['zonas']}
+    df_plan = pd.DataFrame(plan.a_dict()['siembras'])
+    if len(df_plan) > 0:
+        df_plan['Cama'] = df_plan['zona'].map(nombres_zona)
+        df_plan['Siembra'] = df_plan['semana_siembra'].map(lambda s: plan.fecha_semana(s).strftime("%Y-%m-%d"))
+        df_plan['Fin cosecha'] = df_plan['semana_fin'].map(lambda s: plan.fecha_semana(s).strftime("%Y-%m-%d"))
+        df_plan = df_plan.rename(columns={'cultivo': 'Cultivo', 'kg': 'Kg estimados'})
+
+        cama_sel = st.selectbox("Filtrar por cama", ["Todas"] + sorted(df_plan['Cama'].unique()))
+        if cama_sel != "Todas":
+            df_plan = df_plan[df_plan['Cama'] == cama_sel]
+        st.dataframe(df_plan[['Siembra', 'Cama', 'Cultivo', 'Fin cosecha', 'Kg estimados']],
+                     use_container_width=True, hide_index=True)
+
+    st.caption("El plan se ajusta solo al cambiar camas en el Editor (solo se replanifican las camas cambiadas).")
+    if st.button("🔄 Replanificar todo desde esta semana"):
+        guardar_plan(PlanSiembras(config['zonas'], demanda).planificar())
+        st.rerun()
+
+# ============================================================
+# PAGINA: PRESUPUESTO
+# ============================================================
+elif pagina == "💰 Presupuesto":
+    st.title("💰 Presupuesto Real")
+
+    if 'presupuesto_real' not in config:
+        st.info("La configuracion no tiene bloque 'presupuesto_real'.")
+    else:
+        # El modelo vive en la sesion: cada edicion solo recorre el camino item -> seccion -> total
+        if 'presupuesto_sim' not in st.session_state:
+            st.session_state.presupuesto_sim = Presupuesto(config['presupuesto_real'])
+            st.session_state.presupuesto_base = st.session_state.presupuesto_sim.tabla_items()
+            st.session_state.presupuesto_editados = set()
+        sim = st.session_state.presupuesto_sim
+        base = st.session_state.presupuesto_base
+
+        st.subheader("Validacion de totales guardados")
+        problemas = Presupuesto(config['presupuesto_real']).validar()
+        if len(problemas) == 0:
+            st.success("Todos los subtotales y totales guardados coinciden con los items.")
+        else:
+            st.warning(f"{len(problemas)} diferencias entre lo guardado y lo calculado")
+            st.dataframe(problemas, use_container_width=True, hide_index=True)
+
+        st.markdown("---")
+        st.subheader("Simulacion (que pasa si...)")
+        st.caption("Edita cantidades, precios o stock; los totales se recalculan al instante.")
+
+        campos = {'Cantidad': 'cantidad', 'Precio unit': 'precio_unit',
+                  'En stock': 'en_stock', 'A comprar': 'a_comprar'}
+        st.data_editor(base, key="editor_presupuesto", use_container_width=True, hide_index=True,
+                       disabled=['Seccion', 'Item', 'Total'], height=400)
+
+        # Aplicar solo las filas editadas; Total y A comprar se derivan, asi que
+        # el editor se rearma desde el modelo (sin ediciones pendientes) para mostrarlos
+        editadas = st.session_state.get("editor_presupuesto", {}).get('edited_rows', {})
+        if editadas:
+            for fila, cambios in editadas.items():
+                original = base.iloc[int(fila)]
+                valores = {campos[c]: v for c, v in cambios.items() if c in campos and pd.notna(v)}
+                sim.actualizar_item(original['Seccion'], original['Item'], **valores)
+                st.session_state.presupuesto_editados.add((original['Seccion'], original['Item']))
+            st.session_state.presupuesto_base = sim.tabla_items()
+            st.session_state.pop("editor_presupuesto", None)
+            st.rerun()
+
+        total_guardado = config['presupuesto_real'].get('total_general', 0)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total general", f"${sim.total():,.0f}",
+                      f"{sim.total() - total_guardado:+,.0f} vs guardado")
+        with col2:
+            st.metric("Infraestructura", f"${sim.total('total_infraestructura'):,.0f}")
+        with col3:
+            st.metric("Items editados", len(st.session_state.presupuesto_editados))
+
+        df_sub = sim.subtotales()
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=df_sub['Seccion'], y=df_sub['Subtotal guardado'], name='Guardado',
+                             marker_color='#9E9E9E'))
+        fig.add_trace(go.Bar(x=df_sub['Seccion'], y=df_sub['Subtotal calculado'], name='Simulado',
+                             marker_color='#4CAF50'))
+        fig.update_layout(barmode='group', title="Subtotal por seccion (COP)", height=350)
+        st.plotly_chart(fig, use_container_width=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("💾 Guardar presupuesto simulado"):
+                config['presupuesto_real'] = sim.a_config()
+                config['metadata']['ultima_modificacion'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+                guardar_config(config)
+                for k in ['presupuesto_sim', 'presupuesto_base', 'presupuesto_editados', 'editor_presupuesto']:
+                    st.session_state.pop(k, None)
+                st.success("Guardado con subtotales y totales recalculados")
+                st.rerun()
+        with col2:
+            if st.button("↩️ Descartar simulacion"):
+                for k in ['presupuesto_sim', 'presupuesto_base', 'presupuesto_editados', 'editor_presupuesto']:
+                    st.session_state.pop(k, None)
+                st.rerun()
+
+# ============================================================
+# PAGINA: RIEGO
+# ============================================================
+elif pagina == "💧 Riego":
+    import plotly.express as px
+
+    st.title("💧 Proximo Riego por Cama")
+    st.caption("Balance hidrico diario: humedad WH51, lluvia WH40BH y grupo de cultivo")
+
+    ahora = datetime.now()
+    balance = BalanceHidrico(config)
+    balance.actualizar(ahora)
+    df_riego = balance.prediccion(ahora)
+
+    if len(df_riego) == 0:
+        st.info("No hay camas con sensor de humedad de suelo configurado.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Regar hoy", int((df_riego['Estado'] == "Regar hoy").sum()))
+        with col2:
+            st.metric("Sin datos", int((df_riego['Estado'] == "Sin datos").sum()))
+        with col3:
+            lluvia = df_riego['Lluvia 48h (mm)'].dropna()
+            st.metric("Lluvia 48h", f"{lluvia.iloc[0]:.1f} mm" if len(lluvia) else "-")
+
+        st.dataframe(df_riego, use_container_width=True, hide_index=True)
+
+        con_eta = df_riego.dropna(subset=['Dias para riego'])
+        if len(con_eta) > 0:
+            fig = px.bar(con_eta, x='Cama', y='Dias para riego', color='Grupo',
+                         title="Dias hasta cruzar el umbral de aviso")
+            fig.update_layout(height=350)
+            st.plotly_chart(fig, use_container_width=True)
+
+        st.caption("La tasa de secado de cada cama se aprende de los dias secos sin riego; "
+                   "las camas sin sensor usan el WH51 de otra cama del mismo grupo.")
+
+# ============================================================
+# PAGINA: CLIMA INVERNADERO
+# ============================================================
+elif pagina == "🌡️ Clima Invernadero":
+    import plotly.express as px
+
+    st.title("🌡️ Clima del Invernadero")
+
+    umbrales = umbrales_desde_config(config)
+    df_clima = cargar_historial(SENSOR_INVERNADERO)
+
+    if len(df_clima) == 0:
+        st.info(f"No hay lecturas del sensor {SENSOR_INVERNADERO}. Importalas en 🩺 Salud Sensores.")
+    else:
+        # Recomendacion actual
+        rec = recomendacion_actual(df_clima, umbrales)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Humedad aire", f"{rec['humedad_aire']:.0f}%")
+        with col2:
+            st.metric("Temperatura", f"{rec['temperatura']:.1f} C")
+        with col3:
+            st.metric("Recomendacion", rec['accion'])
+        st.caption(f"Ultima lectura: {rec['fecha']}")
+
+        st.markdown("---")
+        st.subheader("Backtest de Umbrales")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            fechas_min = df_clima['fecha'].min().date()
+            fechas_max = df_clima['fecha'].max().date()
+            rango = st.date_input("Periodo", (fechas_min, fechas_max),
+                                  min_value=fechas_min, max_value=fechas_max)
+            horas_ventilar = st.slider("Horas sobre humedad para ventilar", 1, 12, int(umbrales['horas_ventilar']))
+        with col2:
+            ventilar = st.slider("Humedad ventilar (%)", 60, 95, int(umbrales['ventilar']))
+            abrir = st.slider("Humedad abrir obligatorio (%)", 60, 100, int(umbrales['abrir_obligatorio']))
+            temp_ventilar = st.slider("Temperatura ventilar (C)", 20, 40, int(umbrales['temp_ventilar_c']))
+
+        umbrales_prueba = {
+            "ventilar": ventilar,
+            "abrir_obligatorio": abrir,
+            "temp_ventilar_c": temp_ventilar,
+            "horas_ventilar": horas_ventilar,
+        }
+
+        df_periodo = df_clima
+        if isinstance(rango, tuple) and len(rango) == 2:
+            df_periodo = df_clima[(df_clima['fecha'].dt.date >= rango[0]) &
+                                  (df_clima['fecha'].dt.date <= rango[1])]
+
+        df_eval, resumen = backtest(df_periodo, umbrales_prueba)
+        st.dataframe(resumen, use_container_width=True, hide_index=True)
+
+        df_graf = preparar_serie_grafico(df_eval, 'humedad_aire', metodo="minmax", col_x='fecha')
+        fig = px.scatter(df_graf, x='fecha', y='humedad_aire', color='accion',
+                         color_discrete_map=COLORES_ACCION,
+                         title=f"Humedad aire y acciones ({len(df_eval):,} lecturas)")
+        fig.update_traces(marker=dict(size=4))
+        fig.add_hline(y=ventilar, line_dash="dash", line_color="orange", annotation_text="Ventilar")
+        fig.add_hline(y=abrir, line_dash="dash", line_color="red", annotation_text="Abrir")
+        st.plotly_chart(fig, use_container_width=True)
+
+        with st.expander("Comparar combinaciones de umbrales"):
+            grid = barrido_umbrales(df_periodo, range(ventilar - 6, ventilar + 7, 2),
+                                    range(temp_ventilar - 4, temp_ventilar + 5, 2), umbrales_prueba)
+            st.dataframe(grid, use_container_width=True, hide_index=True)
+
+        if st.button("💾 Guardar umbrales en configuracion"):
+            config.setdefault('umbrales_riego', {})['humedad_aire_invernadero'] = umbrales_prueba
+            config['metadata']['ultima_modificacion'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+            guardar_config(config)
+            st.success("Umbrales guardados!")
+
+# ============================================================
+# PAGINA: SALUD SENSORES
+# ============================================================
+elif pagina == "🩺 Salud Sensores":
+    import plotly.express as px
+
+    st.title("🩺 Salud de Sensores")
+    st.info("Deteccion automatica de sondas pegadas, con deriva o fuera de rango. "
+            "Solo se procesan las lecturas nuevas desde la ultima visita.")
+
+    sensores_ids = sensores_configurados(config)
+
+    # Procesar lecturas nuevas (incremental) y alimentar la cola de alertas
+    monitor = MonitorSalud(config)
+    nuevas_alertas = monitor.procesar(sensores_ids)
+    agregadas = encolar_alertas(nuevas_alertas)
+    if agregadas:
+        st.warning(f"{agregadas} alertas nuevas en la cola")
+
+    resumen = monitor.resumen()
+    if len(resumen) > 0:
+        st.subheader("Estado por Sensor")
+        st.dataframe(resumen, use_container_width=True, hide_index=True)
+    else:
+        st.info("Aun no hay lecturas. Importa un CSV exportado de Ecowitt abajo.")
+
+    st.markdown("---")
+    st.subheader("Cola de Alertas")
+
+    alertas_pendientes = cargar_alertas(solo_pendientes=True)
+    if alertas_pendientes:
+        for alerta in alertas_pendientes[:20]:
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                icono = "🔴" if alerta['nivel'] == 'critico' else "🟡"
+                st.markdown(f"{icono} **{alerta['fecha']}** - {alerta['mensaje']}")
+            with col2:
+                if st.button("Atendida", key=f"alerta_{alerta['id']}"):
+                    marcar_alerta_atendida(alerta['id'])
+                    st.rerun()
+        if len(alertas_pendientes) > 20:
+            st.caption(f"... y {len(alertas_pendientes) - 20} alertas mas")
+    else:
+        st.success("No hay alertas pendientes")
+
+    st.markdown("---")
+    st.subheader("Historial")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        sensor_sel = st.selectbox("Sensor", sensores_ids)
+    with col2:
+        variable_sel = st.selectbox("Variable", VARIABLES_POR_MODELO.get(modelo_sensor(sensor_sel), []))
+
+    df_sensor = cargar_historial(sensor_sel)
+    if len(df_sensor) > 0 and variable_sel in df_sensor.columns:
+        df_graf = preparar_serie_grafico(df_sensor, variable_sel, metodo="minmax", col_x='fecha')
+        fig = px.line(df_graf, x='fecha', y=variable_sel,
+                      title=f"{sensor_sel} - {variable_sel} ({len(df_sensor):,} lecturas)")
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.caption("Sin lecturas para este sensor.")
+
+    with st.expander("Importar lecturas (CSV)"):
+        st.caption(f"Columnas: fecha, {', '.join(VARIABLES_POR_MODELO.get(modelo_sensor(sensor_sel), []))}")
+        archivo = st.file_uploader("Archivo CSV", type=['csv'], key="csv_sensor")
+        if archivo and st.button("Importar"):
+            n = agregar_lecturas(sensor_sel, pd.read_csv(archivo))
+            st.success(f"{n} lecturas nuevas importadas en {sensor_sel}")
+            st.rerun()
+
 # ============================================================
 # PAGINA: CONFIGURACION
 # ============================================================
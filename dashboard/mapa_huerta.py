@@ -0,0 +1,78 @@
+"""
+HUERTA INTELIGENTE LPET - Mapa de zonas
+=======================================
+Figuras del mapa de la huerta (Dashboard y vista previa del Editor) a
+partir de config['zonas'].
+
+- Una traza rellena por zona (la leyenda permite ocultar camas) y las
+  etiquetas como anotaciones del layout
+- La figura se arma de una vez con todas las trazas: add_trace en un ciclo
+  vuelve a validar la tupla completa de trazas en cada llamada (cuadratico
+  en el numero de zonas)
+"""
+
+import plotly.graph_objects as go
+
+
+def _contorno(zona):
+    """(x, y) del rectangulo de la zona, cerrado"""
+    x0, y0 = zona['x'], zona['y']
+    x1, y1 = x0 + zona['largo'], y0 + zona['ancho']
+    return [x0, x1, x1, x0, x0], [y0, y0, y1, y1, y0]
+
+
+def figura_mapa(zonas):
+    """Mapa con hover de area y cultivos y el nombre de cada zona"""
+    trazas = []
+    etiquetas = []
+    for zona in zonas:
+        x, y = _contorno(zona)
+        trazas.append(go.Scatter(
+            x=x,
+            y=y,
+            fill='toself',
+            fillcolor=zona['color'],
+            line=dict(color='black', width=1),
+            name=zona['nombre'],
+            hovertemplate=f"<b>{zona['nombre']}</b><br>" +
+                          f"Area: {zona['ancho'] * zona['largo']:.1f} m²<br>" +
+                          f"Cultivos: {', '.join(zona['cultivos'])}<extra></extra>"
+        ))
+        etiquetas.append(dict(
+            x=(x[0] + x[1]) / 2,
+            y=(y[0] + y[2]) / 2,
+            text=zona['nombre'],
+            showarrow=False,
+            font=dict(size=10)
+        ))
+
+    return go.Figure(data=trazas, layout=dict(
+        height=500,
+        showlegend=True,
+        xaxis=dict(title="Metros", scaleanchor="y"),
+        yaxis=dict(title="Metros"),
+        legend=dict(orientation="h", y=-0.1),
+        annotations=etiquetas
+    ))
+
+
+def figura_vista_previa(zonas, resaltada=None):
+    """Mapa compacto sin leyenda; la zona en la posicion resaltada va con borde grueso"""
+    trazas = []
+    for i, zona in enumerate(zonas):
+        x, y = _contorno(zona)
+        trazas.append(go.Scatter(
+            x=x,
+            y=y,
+            fill='toself',
+            fillcolor=zona['color'],
+            line=dict(color='black', width=2 if i == resaltada else 1),
+            name=zona['nombre'],
+            showlegend=False
+        ))
+
+    return go.Figure(data=trazas, layout=dict(
+        height=400,
+        xaxis=dict(title="X (m)", scaleanchor="y"),
+        yaxis=dict(title="Y (m)")
+    ))
@@ -0,0 +1,220 @@
+"""
+HUERTA INTELIGENTE LPET - Modelo financiero
+============================================
+Calculos de la pagina Finanzas (huerta_app) a partir de datos['finanzas']:
+
+- Entradas: inversion, costos operativos, ahorros y tour de bienestar
+- Beneficio neto mensual y payback (meses) para muchas combinaciones
+  de entradas a la vez (una fila por combinacion)
+- Sensibilidad: cada entrada +/- X% evaluada en un solo lote
+- Escenarios: VPN, TIR y payback descontado de muchos escenarios a la
+  vez, con rampa de ingresos mensual y tasa COP/USD por escenario
+"""
+
+import numpy as np
+import pandas as pd
+
+TASA_COP_USD = 4000
+
+ENTRADAS = ["inversion_cop", "costos_operativos_cop", "ahorros_cop", "tour_bienestar_cop"]
+
+NOMBRES_ENTRADA = {
+    "inversion_cop": "Inversion inicial",
+    "costos_operativos_cop": "Costos operativos",
+    "ahorros_cop": "Ahorros hotel",
+    "tour_bienestar_cop": "Ingresos tour bienestar",
+}
+
+
+def entradas_desde_datos(finanzas, tasa_cop_usd=TASA_COP_USD):
+    """Entradas base (COP) del bloque datos['finanzas']"""
+    return {
+        "inversion_cop": finanzas['inversion_inicial_usd']['total'] * tasa_cop_usd,
+        "costos_operativos_cop": finanzas['costos_operativos_mensual_cop']['total'],
+        "ahorros_cop": finanzas['ahorros_mensual_cop']['total'],
+        "tour_bienestar_cop": finanzas['ingresos_mensual_cop']['tour_bienestar']['total'],
+    }
+
+
+def evaluar(matriz):
+    """
+    Metricas por fila de una matriz (n, ENTRADAS).
+
+    Retorna dict de arreglos (n,): beneficio_neto_cop, payback_meses
+    (inf si el beneficio no es positivo).
+    """
+    matriz = np.asarray(matriz, dtype=np.float64)
+    inversion, costos, ahorros, tour = matriz.T
+    beneficio = ahorros + tour - costos
+    with np.errstate(divide='ignore'):
+        payback = np.where(beneficio > 0, inversion / beneficio, np.inf)
+    return {"beneficio_neto_cop": beneficio, "payback_meses": payback}
+
+
+# ============================================================
+# SENSIBILIDAD
+# ============================================================
+
+def sensibilidad(entradas, variacion=0.2):
+    """
+    Tornado de cada entrada +/- variacion.
+
+    Retorna DataFrame: entrada, metrica, base, bajo, alto, impacto
+    (bajo/alto = metrica con la entrada en -variacion / +variacion),
+    ordenado por impacto dentro de cada metrica.
+    """
+    base = np.array([entradas[e] for e in ENTRADAS], dtype=np.float64)
+    k = len(ENTRADAS)
+    # Fila 0 = base, luego k filas con -variacion y k filas con +variacion
+    factores = np.ones((2 * k + 1, k))
+    factores[1 + np.arange(k), np.arange(k)] = 1 - variacion
+    factores[1 + k + np.arange(k), np.arange(k)] = 1 + variacion
+    resultado = evaluar(factores * base)
+
+    filas = []
+    for metrica, valores in resultado.items():
+        for i, e in enumerate(ENTRADAS):
+            bajo, alto = valores[1 + i], valores[1 + k + i]
+            filas.append({
+                "entrada": NOMBRES_ENTRADA[e],
+                "metrica": metrica,
+                "base": valores[0],
+                "bajo": bajo,
+                "alto": alto,
+                "impacto": abs(alto - bajo) if np.isfinite([alto, bajo]).all() else np.inf,
+            })
+    df = pd.DataFrame(filas)
+    return df.sort_values(["metrica", "impacto"], ascending=[True, True]).reset_index(drop=True)
+
+
+# ============================================================
+# ESCENARIOS: VPN, TIR Y PAYBACK DESCONTADO
+# ============================================================
+
+HORIZONTE_MESES = 36
+
+# Parametros de un escenario (los factores multiplican las entradas base)
+PARAMETROS_ESCENARIO = [
+    "factor_inversion", "factor_costos", "factor_ahorros", "factor_tour",
+    "tasa_cop_usd", "rampa_inicial", "meses_rampa", "descuento_anual",
+]
+
+ESCENARIOS_DEFAULT = {
+    "Pesimista": {"factor_inversion": 1.15, "factor_costos": 1.10, "factor_ahorros": 0.80,
+                  "factor_tour": 0.60, "tasa_cop_usd": 4400, "rampa_inicial": 0.4,
+                  "meses_rampa": 6, "descuento_anual": 0.15},
+    "Base": {"factor_inversion": 1.0, "factor_costos": 1.0, "factor_ahorros": 1.0,
+             "factor_tour": 1.0, "tasa_cop_usd": TASA_COP_USD, "rampa_inicial": 0.7,
+             "meses_rampa": 3, "descuento_anual": 0.12},
+    "Optimista": {"factor_inversion": 1.0, "factor_costos": 0.95, "factor_ahorros": 1.10,
+                  "factor_tour": 1.20, "tasa_cop_usd": 3800, "rampa_inicial": 0.8,
+                  "meses_rampa": 2, "descuento_anual": 0.10},
+}
+
+
+def _matriz_parametros(escenarios):
+    """dict nombre -> parametros  ->  (nombres, arreglo (S, PARAMETROS_ESCENARIO))"""
+    nombres = list(escenarios)
+    valores = np.array([[float(escenarios[n][p]) for p in PARAMETROS_ESCENARIO] for n in nombres])
+    return nombres, valores.reshape(len(nombres), len(PARAMETROS_ESCENARIO))
+
+
+def flujos(finanzas, escenarios, horizonte=HORIZONTE_MESES):
+    """
+    Flujo mensual (S, horizonte + 1) en COP; columna 0 = inversion.
+
+    Los ingresos (ahorros + tour) suben linealmente de rampa_inicial a 100%
+    en meses_rampa meses; los costos operativos se pagan completos.
+    """
+    _, p = _matriz_parametros(escenarios)
+    col = {n: p[:, i][:, None] for i, n in enumerate(PARAMETROS_ESCENARIO)}
+    base = entradas_desde_datos(finanzas, tasa_cop_usd=1)     # inversion queda en USD
+
+    meses = np.arange(1, horizonte + 1)[None, :]
+    avance = (meses - 1) / np.maximum(col['meses_rampa'], 1)
+    rampa = np.clip(col['rampa_inicial'] + (1 - col['rampa_inicial']) * avance, 0, 1)
+
+    ingresos = rampa * (base['ahorros_cop'] * col['factor_ahorros'] + base['tour_bienestar_cop'] * col['factor_tour'])
+    costos = base['costos_operativos_cop'] * col['factor_costos']
+    inversion = base['inversion_cop'] * col['factor_inversion'] * col['tasa_cop_usd']
+    return np.hstack([-inversion, ingresos - costos])
+
+
+def _vpn(flujo, tasa_mensual):
+    """VPN por fila para una tasa mensual por fila"""
+    t = np.arange(flujo.shape[1])[None, :]
+    return (flujo / (1 + tasa_mensual[:, None]) ** t).sum(axis=1)
+
+
+def tir_mensual(flujo, iteraciones=80):
+    """TIR mensual por fila por biseccion simultanea (NaN si no cambia de signo)"""
+    n = flujo.shape[0]
+    bajo = np.full(n, -0.99)
+    alto = np.full(n, 1.0)
+    v_bajo = _vpn(flujo, bajo)
+    valida = np.sign(v_bajo) != np.sign(_vpn(flujo, alto))
+    for _ in range(iteraciones):
+        medio = (bajo + alto) / 2
+        v_medio = _vpn(flujo, medio)
+        mismo = np.sign(v_medio) == np.sign(v_bajo)
+        bajo = np.where(mismo, medio, bajo)
+        v_bajo = np.where(mismo, v_medio, v_bajo)
+        alto = np.where(mismo, alto, medio)
+    return np.where(valida, (bajo + alto) / 2, np.nan)
+
+
+def _payback(acumulado):
+    """Mes (fraccionario) en que el acumulado cruza a >= 0, NaN si no cruza"""
+    positivo = acumulado >= 0
+    cruza = positivo.any(axis=1)
+    k = np.argmax(positivo, axis=1)
+    filas = np.arange(len(k))
+    previo = acumulado[filas, np.maximum(k - 1, 0)]
+    actual = acumulado[filas, k]
+    fraccion = np.where(actual != previo, -previo / np.where(actual != previo, actual - previo, 1), 0)
+    return np.where(cruza & (k > 0), k - 1 + fraccion, np.where(cruza, 0.0, np.nan))
+
+
+def evaluar_escenarios(finanzas, escenarios, horizonte=HORIZONTE_MESES):
+    """
+    Metricas y curvas de todos los escenarios en un lote.
+
+    Retorna (metricas DataFrame por escenario, curvas DataFrame largo con
+    escenario, mes, acumulado, acumulado_descontado).
+    """
+    nombres, p = _matriz_parametros(escenarios)
+    flujo = flujos(finanzas, escenarios, horizonte)
+    tasa_mensual = (1 + p[:, PARAMETROS_ESCENARIO.index('descuento_anual')]) ** (1 / 12) - 1
+    t = np.arange(flujo.shape[1])[None, :]
+    descontado = flujo / (1 + tasa_mensual[:, None]) ** t
+
+    acumulado = np.cumsum(flujo, axis=1)
+    acumulado_desc = np.cumsum(descontado, axis=1)
+    tir = tir_mensual(flujo)
+
+    metricas = pd.DataFrame({
+        'Escenario': nombres,
+        'Inversion (COP)': -flujo[:, 0],
+        'VPN (COP)': acumulado_desc[:, -1],
+        'TIR anual (%)': ((1 + tir) ** 12 - 1) * 100,
+        'Payback (meses)': _payback(acumulado),
+        'Payback descontado (meses)': _payback(acumulado_desc),
+    })
+    meses = flujo.shape[1]
+    curvas = pd.DataFrame({
+        'escenario': np.repeat(nombres, meses),
+        'mes': np.tile(np.arange(meses), len(nombres)),
+        'acumulado': acumulado.ravel(),
+        'acumulado_descontado': acumulado_desc.ravel(),
+    })
+    return metricas, curvas
+
+
+def vpn_por_tasa_cambio(finanzas, escenarios, tasas, horizonte=HORIZONTE_MESES):
+    """VPN de cada escenario para cada tasa COP/USD (DataFrame tasas x escenarios)"""
+    pares = [(n, float(tc)) for n in escenarios for tc in tasas]
+    combinados = {f"{n} @ {tc:.0f}": {**escenarios[n], 'tasa_cop_usd': tc} for n, tc in pares}
+    metricas, _ = evaluar_escenarios(finanzas, combinados, horizonte)
+    metricas['escenario'] = [n for n, _ in pares]
+    metricas['tasa_cop_usd'] = [tc for _, tc in pares]
+    return metricas.pivot(index='tasa_cop_usd', columns='escenario', values='VPN (COP)')
@@ -0,0 +1,90 @@
+"""
+HUERTA INTELIGENTE LPET - Escenarios Monte Carlo para Estimaciones
+===================================================================
+Muestrea rendimientos, tasa de postura y precios alrededor de los valores
+de la pagina Estimaciones y evalua todos los escenarios en un solo lote
+NumPy (una fila por escenario, sin ciclos por escenario).
+
+- Rendimientos y precios: distribucion triangular (min, valor, max)
+- Tasa de postura: normal truncada a [0, 1]
+- Resultado: percentiles de kg/mes, ingresos y beneficio neto
+"""
+
+import numpy as np
+import pandas as pd
+
+N_ESCENARIOS = 100_000
+PERCENTILES = [5, 25, 50, 75, 95]
+DIAS_MES = 30
+
+def _triangular(rng, centro, variacion, n):
+    """Muestras triangulares centro*(1 +/- variacion), nunca negativas"""
+    centro = np.asarray(centro, dtype=np.float64)
+    bajo = np.maximum(centro * (1 - variacion), 0.0)
+    alto = np.maximum(centro * (1 + variacion), bajo + 1e-9)
+    if variacion <= 0:
+        return np.broadcast_to(centro, (n,) + centro.shape).copy()
+    return rng.triangular(bajo, centro, alto, size=(n,) + centro.shape)
+
+
+def simular(parametros, n=N_ESCENARIOS, semilla=0):
+    """
+    Evalua n escenarios.
+
+    parametros: dict con
+      areas, rendimientos, precios   -> dicts por clase de cultivo (m2, kg/m2/mes, COP/kg)
+      gallinas, tasa_postura (0-1), precio_huevo
+      costo_fijo                     -> COP/mes (operario + insumos)
+      var_rendimiento, var_precio, desv_postura (fracciones)
+
+    Retorna dict de arreglos (n,): kg_<clase>, huevos, ingresos, beneficio_neto.
+    """
+    p = parametros
+    rng = np.random.default_rng(semilla)
+
+    clases = list(p['areas'])
+    areas = np.array([p['areas'][c] for c in clases], dtype=np.float64)
+    rendimientos = _triangular(rng, [p['rendimientos'][c] for c in clases],
+                               p['var_rendimiento'], n)
+    precios = _triangular(rng, [p['precios'][c] for c in clases], p['var_precio'], n)
+
+    kg = rendimientos * areas                      # (n, clases)
+    postura = np.clip(rng.normal(p['tasa_postura'], p['desv_postura'], n), 0.0, 1.0)
+    huevos = p['gallinas'] * postura * DIAS_MES
+    precio_huevo = _triangular(rng, p['precio_huevo'], p['var_precio'], n)
+
+    ingresos = (kg * precios).sum(axis=1) + huevos * precio_huevo
+    resultado = {f"kg_{c}": kg[:, i] for i, c in enumerate(clases)}
+    resultado.update({
+        'huevos': huevos,
+        'ingresos': ingresos,
+        'beneficio_neto': ingresos - p['costo_fijo'],
+    })
+    return resultado
+
+
+def bandas(resultado, percentiles=PERCENTILES):
+    """DataFrame metrica x percentil (un solo np.percentile sobre todas las metricas)"""
+    nombres = list(resultado)
+    matriz = np.vstack([resultado[k] for k in nombres])
+    valores = np.percentile(matriz, percentiles, axis=1).T
+    return pd.DataFrame(valores, index=nombres, columns=[f"P{q}" for q in percentiles])
+
+
+def resumen_escenarios(parametros, n=N_ESCENARIOS, semilla=0, bins=60):
+    """
+    Bandas de percentiles, probabilidad de perdida e histograma del beneficio.
+
+    Es lo que la pagina guarda en cache: no incluye los arreglos completos.
+    """
+    resultado = simular(parametros, n=n, semilla=semilla)
+    beneficio = resultado['beneficio_neto']
+    conteos, bordes = np.histogram(beneficio, bins=bins)
+    return {
+        'bandas': bandas(resultado),
+        'prob_perdida': float(np.mean(beneficio < 0)),
+        'histograma': pd.DataFrame({
+            'beneficio': (bordes[:-1] + bordes[1:]) / 2,
+            'escenarios': conteos,
+        }),
+    }
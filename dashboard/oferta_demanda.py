@@ -0,0 +1,141 @@
+"""
+HUERTA INTELIGENTE LPET - Cruce semanal oferta / demanda del hotel
+===================================================================
+Une la cosecha pronosticada (output/pronostico_cosecha.json) con la
+demanda semanal de la cocina y calcula faltantes, sobrantes y
+sustituciones sugeridas.
+
+- Demanda por cultivo ("lechuga") o por clase ("aromaticas"): una clase
+  la cubre cualquier cultivo de esa clase
+- Sustituciones: primero las preferidas de SUSTITUTOS (rucula por
+  lechuga...), luego cualquier cultivo de la misma clase
+- Todo el cruce es matricial: semanas x cultivos, un paso por par de
+  sustitucion (nunca un ciclo por semana)
+"""
+
+import numpy as np
+import pandas as pd
+
+from taxonomia_cultivos import CLASES, CULTIVOS, normalizar
+
+# Reparto por defecto de demanda_hotel_kg_semana['objetivo'] (cocina italiana)
+REPARTO_DEMANDA_DEFAULT = {
+    "lechuga": 0.15,
+    "rucula": 0.05,
+    "hojas": 0.10,
+    "tomate": 0.25,
+    "albahaca": 0.05,
+    "aromaticas": 0.05,
+    "brasicas": 0.15,
+    "raices": 0.20,
+}
+
+# Cultivo pedido -> sustitutos preferidos, en orden
+SUSTITUTOS = {
+    "lechuga": ["rucula", "mesclun", "espinaca"],
+    "rucula": ["mostaza", "mesclun", "lechuga"],
+    "espinaca": ["acelga", "kale"],
+    "acelga": ["espinaca"],
+    "albahaca": ["oregano", "perejil"],
+    "perejil": ["cilantro"],
+    "cilantro": ["perejil"],
+    "brocoli": ["coliflor", "kale"],
+    "coliflor": ["brocoli"],
+    "zanahoria": ["remolacha"],
+}
+
+
+def demanda_desde_datos(datos):
+    """kg/semana por cultivo o clase: produccion.demanda_hotel_por_cultivo o el reparto por defecto"""
+    produccion = datos.get('produccion', {})
+    if produccion.get('demanda_hotel_por_cultivo'):
+        return {normalizar(k): float(v) for k, v in produccion['demanda_hotel_por_cultivo'].items()}
+    objetivo = produccion.get('demanda_hotel_kg_semana', {}).get('objetivo', 20)
+    return {k: round(objetivo * f, 2) for k, f in REPARTO_DEMANDA_DEFAULT.items()}
+
+
+def _clase(item):
+    return item if item in CLASES else CULTIVOS.get(item, {}).get('clase')
+
+
+def cruzar(pronostico, demanda):
+    """
+    Cruce semanas x items.
+
+    pronostico: DataFrame cultivo, semana, kg (por cama o ya agregado).
+    demanda: dict item -> kg/semana (item = cultivo o clase).
+
+    Retorna (detalle, sugerencias, sobrantes):
+      detalle: semana, item, demanda, directo, sustitucion, faltante
+      sugerencias: semana, pedido, usar, kg
+      sobrantes: kg sin destino (semanas x cultivos)
+    """
+    oferta = pronostico.pivot_table(index='semana', columns='cultivo', values='kg',
+                                    aggfunc='sum', fill_value=0.0)
+    semanas = oferta.index
+    cultivos = list(oferta.columns)
+    items = list(demanda)
+
+    # Matrices (semanas x cultivos) y (semanas x items)
+    sobrante = oferta.to_numpy(dtype=np.float64).copy()
+    pedido = np.tile(np.array([demanda[i] for i in items], dtype=np.float64), (len(semanas), 1))
+    col_cultivo = {c: j for j, c in enumerate(cultivos)}
+
+    # 1. Entrega directa del mismo cultivo
+    directo = np.zeros_like(pedido)
+    for i, item in enumerate(items):
+        j = col_cultivo.get(item)
+        if j is None:
+            continue
+        directo[:, i] = np.minimum(pedido[:, i], sobrante[:, j])
+        sobrante[:, j] -= directo[:, i]
+    faltante = pedido - directo
+
+    # 2. Pares de sustitucion: preferidos primero, luego misma clase
+    pares = []
+    for i, item in enumerate(items):
+        if item in CLASES:
+            continue
+        pares += [(i, s) for s in SUSTITUTOS.get(item, []) if s in col_cultivo]
+    for i, item in enumerate(items):
+        clase = _clase(item)
+        if clase is None:
+            continue  # item fuera de la taxonomia: solo entrega directa o sustitutos preferidos
+        pares += [(i, c) for c in cultivos
+                  if c != item and CULTIVOS.get(c, {}).get('clase') == clase and (i, c) not in pares]
+
+    sustitucion = np.zeros_like(pedido)
+    sugerencias = []
+    for i, origen in pares:
+        j = col_cultivo[origen]
+        mover = np.minimum(faltante[:, i], sobrante[:, j])
+        if not mover.any():
+            continue
+        faltante[:, i] -= mover
+        sobrante[:, j] -= mover
+        sustitucion[:, i] += mover
+        # Un pedido de clase cubierto por un cultivo de la clase no es una sustitucion
+        if items[i] not in CLASES:
+            for k in np.flatnonzero(mover > 1e-9):
+                sugerencias.append({'semana': semanas[k], 'pedido': items[i],
+                                    'usar': origen, 'kg': round(float(mover[k]), 2)})
+
+    detalle = pd.DataFrame({
+        'semana': np.repeat(semanas, len(items)),
+        'item': np.tile(items, len(semanas)),
+        'demanda': pedido.ravel(),
+        'directo': directo.ravel(),
+        'sustitucion': sustitucion.ravel(),
+        'faltante': faltante.ravel(),
+    })
+    sobrantes = pd.DataFrame(sobrante, index=semanas, columns=cultivos)
+    return detalle, pd.DataFrame(sugerencias, columns=['semana', 'pedido', 'usar', 'kg']), sobrantes
+
+
+def resumen_semanal(detalle, sobrantes):
+    """Una fila por semana: demanda, cubierto, faltante y sobrante totales"""
+    por_semana = detalle.groupby('semana')[['demanda', 'directo', 'sustitucion', 'faltante']].sum()
+    por_semana['sobrante'] = sobrantes.sum(axis=1)
+    por_semana['cobertura_%'] = (100 * (por_semana['directo'] + por_semana['sustitucion'])
+                                 / por_semana['demanda'].replace(0, np.nan)).round(1)
+    return por_semana.round(2).reset_index()
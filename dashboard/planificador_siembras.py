@@ -0,0 +1,306 @@
+"""
+HUERTA INTELIGENTE LPET - Planificador de siembras escalonadas
+===============================================================
+Asigna cultivo y semana de siembra a cada cama de config['zonas'] en un
+horizonte de 52 semanas para cubrir produccion.demanda_hotel_kg_semana.
+
+Heuristica (sin solver externo):
+- Las camas se atienden en orden de la semana en que quedan libres
+- En cada cama libre se prueban todos los cultivos compatibles con su
+  grupo y siembras con 0..MAX_RETRASO semanas de espera
+- Se elige la opcion que mas reduce el faltante (y el exceso sobre el
+  maximo) por semana que ocupa la cama
+
+Es incremental: el plan guarda una huella por cama y al cambiar una cama
+solo se vuelve a planificar esa cama, con las demas fijas. Cada semana
+la ventana avanza: las siembras en curso se conservan y solo se planifican
+las semanas nuevas al final del horizonte.
+"""
+
+import hashlib
+import heapq
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from taxonomia_cultivos import CLASES, CULTIVOS, TIPOS_PRODUCTIVOS
+
+BASE_DIR = Path(__file__).parent.parent
+PLAN_PATH = BASE_DIR / "data" / "plan_siembras.json"
+
+HORIZONTE_SEMANAS = 52
+MAX_RETRASO = 3
+PENALIDAD_EXCESO = 0.3   # kg sobre el maximo valen menos que kg faltantes
+
+DEMANDA_DEFAULT = {"min": 15, "max": 25, "objetivo": 20}
+
+# Clases que se pueden sembrar segun el grupo de la cama
+CLASES_POR_GRUPO = {
+    "hojas": ["hojas"],
+    "hierbas": ["aromaticas"],
+    "brasicas": ["brasicas"],
+    "rotacion": ["raices", "legumbres", "hojas"],
+    "invernadero": ["tomate", "aromaticas"],
+}
+
+
+def demanda_desde_datos(datos):
+    """demanda_hotel_kg_semana de huerta_datos.json (o la por defecto)"""
+    return {**DEMANDA_DEFAULT, **datos.get('produccion', {}).get('demanda_hotel_kg_semana', {})}
+
+
+def _grupo(zona):
+    return "invernadero" if zona['tipo'] == 'invernadero' else zona.get('grupo', "rotacion")
+
+
+def candidatos_zona(zona):
+    """Cultivos de ciclo definido que se pueden sembrar en la zona"""
+    clases = CLASES_POR_GRUPO.get(_grupo(zona), [])
+    return sorted(c for c, info in CULTIVOS.items()
+                  if info['clase'] in clases and info.get('ciclo_dias'))
+
+
+def _curva_cosecha(cultivo, area):
+    """Semanas de ciclo y kg por semana desde la siembra (cosecha en el ultimo tercio)"""
+    info = CULTIVOS[cultivo]
+    semanas = int(np.ceil(info['ciclo_dias'] / 7))
+    total = CLASES[info['clase']]['rendimiento_kg_m2_mes'] * area * info['ciclo_dias'] / 30
+    ventana = max(1, semanas // 3)
+    curva = np.zeros(semanas)
+    curva[semanas - ventana:] = total / ventana
+    return curva
+
+
+def lunes_actual():
+    hoy = datetime.now().date()
+    return hoy - timedelta(days=hoy.weekday())
+
+
+def huella_zona(zona):
+    """Cambia si cambia algo que afecta el plan de la cama"""
+    datos = [zona['tipo'], _grupo(zona), round(zona['ancho'] * zona['largo'], 3)]
+    return hashlib.md5(json.dumps(datos).encode()).hexdigest()[:12]
+
+
+class PlanSiembras:
+    """Siembras por cama y oferta semanal resultante"""
+
+    def __init__(self, zonas, demanda, inicio=None, horizonte=HORIZONTE_SEMANAS):
+        self.zonas = {z['id']: z for z in zonas if z.get('tipo') in TIPOS_PRODUCTIVOS}
+        self.demanda = {**DEMANDA_DEFAULT, **demanda}
+        self.horizonte = horizonte
+        self.inicio = inicio or lunes_actual().isoformat()
+        self.siembras = []
+        self.huellas = {}
+        self.oferta = np.zeros(horizonte)
+        self._curvas = {}
+
+    # -------------------- costo --------------------
+
+    def _costo(self, oferta):
+        """Faltante bajo el objetivo + exceso penalizado sobre el maximo (por fila)"""
+        faltante = np.maximum(self.demanda['objetivo'] - oferta, 0).sum(axis=-1)
+        exceso = np.maximum(oferta - self.demanda['max'], 0).sum(axis=-1)
+        return faltante + PENALIDAD_EXCESO * exceso
+
+    def _opciones(self, zona_id):
+        """Pares (cultivo, curva de cosecha) de la zona, calculados una vez"""
+        if zona_id not in self._curvas:
+            zona = self.zonas[zona_id]
+            area = zona['ancho'] * zona['largo']
+            self._curvas[zona_id] = [(c, _curva_cosecha(c, area)) for c in candidatos_zona(zona)]
+        return self._curvas[zona_id]
+
+    def _mejor_siembra(self, zona_id, t):
+        """(cultivo, siembra, fin, oferta) con mejor ganancia por semana, o None"""
+        opciones = self._opciones(zona_id)
+        if not opciones:
+            return None
+        H = self.horizonte
+        filas, info = [], []
+        for cultivo, curva in opciones:
+            for retraso in range(MAX_RETRASO + 1):
+                ini = t + retraso
+                if ini >= H:
+                    break
+                fila = np.zeros(H)
+                fin = min(ini + len(curva), H)
+                fila[ini:fin] = curva[:fin - ini]
+                filas.append(fila)
+                info.append((cultivo, ini, ini + len(curva)))
+        if not filas:
+            return None
+
+        matriz = np.vstack(filas)
+        ganancia = self._costo(self.oferta) - self._costo(self.oferta + matriz)
+        ocupacion = np.array([fin - t for _, _, fin in info], dtype=np.float64)
+        puntaje = ganancia / ocupacion
+        mejor = int(np.argmax(puntaje))
+        if ganancia[mejor] <= 1e-9:
+            return None
+        cultivo, ini, fin = info[mejor]
+        return cultivo, ini, fin, matriz[mejor]
+
+    # -------------------- planificacion --------------------
+
+    def _planificar(self, zona_ids, libre=None):
+        """Llena las camas dadas desde la semana 0 (o su semana libre) con las demas fijas"""
+        libre = libre or {}
+        cola = [(libre.get(z, 0), z) for z in sorted(zona_ids)]
+        heapq.heapify(cola)
+        while cola:
+            t, zona_id = heapq.heappop(cola)
+            if t >= self.horizonte:
+                continue
+            eleccion = self._mejor_siembra(zona_id, t)
+            if eleccion is None:
+                # Nada aporta ahora: la cama descansa una semana
+                heapq.heappush(cola, (t + 1, zona_id))
+                continue
+            cultivo, ini, fin, fila = eleccion
+            self.oferta += fila
+            self.siembras.append({
+                'zona': zona_id, 'cultivo': cultivo,
+                'semana_siembra': ini, 'semana_fin': fin,
+                'kg': round(float(fila.sum()), 2),
+            })
+            heapq.heappush(cola, (fin, zona_id))
+
+    def _quitar(self, zona_ids):
+        self.siembras = [s for s in self.siembras if s['zona'] not in zona_ids]
+        self._recalcular_oferta()
+
+    def _recalcular_oferta(self):
+        self.oferta = np.zeros(self.horizonte)
+        for s in self.siembras:
+            zona = self.zonas[s['zona']]
+            curva = _curva_cosecha(s['cultivo'], zona['ancho'] * zona['largo'])
+            # Una siembra en curso puede haber empezado antes de la semana 0
+            ini = s['semana_siembra']
+            desde = max(ini, 0)
+            fin = min(ini + len(curva), self.horizonte)
+            if fin > desde:
+                self.oferta[desde:fin] += curva[desde - ini:fin - ini]
+
+    def planificar(self):
+        """Plan completo de todas las camas"""
+        self.siembras = []
+        self.oferta = np.zeros(self.horizonte)
+        self._planificar(list(self.zonas))
+        self.huellas = {z: huella_zona(zona) for z, zona in self.zonas.items()}
+        return self
+
+    def replanificar(self, zona_ids):
+        """Vuelve a planificar solo las camas dadas"""
+        zona_ids = [z for z in zona_ids if z in self.zonas]
+        self._quitar(set(zona_ids))
+        self._planificar(zona_ids)
+        for z in zona_ids:
+            self.huellas[z] = huella_zona(self.zonas[z])
+        return self
+
+    def avanzar(self, semanas):
+        """
+        Corre el inicio `semanas` adelante: descarta las siembras terminadas,
+        conserva las en curso (semana_siembra negativa) y planifica cada
+        cama desde que queda libre hasta el nuevo final del horizonte.
+        """
+        if semanas <= 0:
+            return self
+        self.inicio = (date.fromisoformat(self.inicio) + timedelta(weeks=semanas)).isoformat()
+        self.siembras = [{**s, 'semana_siembra': s['semana_siembra'] - semanas,
+                          'semana_fin': s['semana_fin'] - semanas}
+                         for s in self.siembras if s['semana_fin'] > semanas]
+        self._recalcular_oferta()
+        libre = {z: 0 for z in self.zonas}
+        for s in self.siembras:
+            libre[s['zona']] = max(libre[s['zona']], s['semana_fin'])
+        self._planificar(list(self.zonas), libre)
+        return self
+
+    def actualizar(self, zonas):
+        """
+        Ajusta el plan a zonas nuevas: replanifica solo camas agregadas o cambiadas.
+
+        Retorna la lista de camas replanificadas.
+        """
+        nuevas = {z['id']: z for z in zonas if z.get('tipo') in TIPOS_PRODUCTIVOS}
+        cambiadas = [z for z, zona in nuevas.items() if self.huellas.get(z) != huella_zona(zona)]
+
+        self.siembras = [s for s in self.siembras if s['zona'] in nuevas]
+        self.huellas = {z: h for z, h in self.huellas.items() if z in nuevas}
+        self.zonas = nuevas
+        for z in cambiadas:
+            self._curvas.pop(z, None)
+        self._recalcular_oferta()
+        if cambiadas:
+            self.replanificar(cambiadas)
+        return cambiadas
+
+    # -------------------- resultados --------------------
+
+    def fecha_semana(self, semana):
+        return datetime.fromisoformat(self.inicio) + timedelta(weeks=semana)
+
+    def indicadores(self):
+        faltante = np.maximum(self.demanda['objetivo'] - self.oferta, 0)
+        return {
+            'faltante_kg': float(faltante.sum()),
+            'semanas_bajo_minimo': int((self.oferta < self.demanda['min']).sum()),
+            'semanas_sobre_maximo': int((self.oferta > self.demanda['max']).sum()),
+            'kg_total': float(self.oferta.sum()),
+        }
+
+    # -------------------- persistencia --------------------
+
+    def a_dict(self):
+        return {
+            'inicio': self.inicio,
+            'horizonte': self.horizonte,
+            'demanda': self.demanda,
+            'huellas': self.huellas,
+            'siembras': sorted(self.siembras, key=lambda s: (s['semana_siembra'], s['zona'])),
+        }
+
+    @classmethod
+    def desde_dict(cls, datos, zonas):
+        plan = cls(zonas, datos['demanda'], inicio=datos['inicio'], horizonte=datos['horizonte'])
+        plan.huellas = datos.get('huellas', {})
+        plan.siembras = [s for s in datos.get('siembras', []) if s['zona'] in plan.zonas]
+        plan._recalcular_oferta()
+        return plan
+
+
+def guardar_plan(plan):
+    PLAN_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(PLAN_PATH, 'w', encoding='utf-8') as f:
+        json.dump(plan.a_dict(), f, ensure_ascii=False, indent=2)
+
+
+def plan_vigente(config, demanda):
+    """
+    Plan guardado ajustado a las zonas actuales (o uno nuevo).
+
+    Se replanifica todo solo si cambia la demanda, no hay plan o el plan
+    ya salio del horizonte; si el inicio guardado es de una semana anterior
+    la ventana avanza hasta esta semana; si cambia una cama, solo esa.
+    Retorna (plan, camas replanificadas).
+    """
+    zonas = config.get('zonas', [])
+    demanda = {**DEMANDA_DEFAULT, **demanda}
+    if PLAN_PATH.exists():
+        with open(PLAN_PATH, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        semanas = (lunes_actual() - date.fromisoformat(datos['inicio'])).days // 7
+        if datos.get('demanda') == demanda and semanas < datos['horizonte']:
+            plan = PlanSiembras.desde_dict(datos, zonas).avanzar(semanas)
+            cambiadas = plan.actualizar(zonas)
+            if cambiadas or semanas > 0:
+                guardar_plan(plan)
+            return plan, cambiadas
+
+    plan = PlanSiembras(zonas, demanda).planificar()
+    guardar_plan(plan)
+    return plan, list(plan.zonas)
@@ -0,0 +1,199 @@
+"""
+HUERTA INTELIGENTE LPET - Modelo del presupuesto real
+======================================================
+Arbol de config['presupuesto_real']:
+
+    total_general
+    ├── total_infraestructura
+    │   ├── huerta_12_camas (subtotal) -> items
+    │   ├── encerramiento_huerta ...
+    │   └── logistica
+    └── mantenimiento_bodega
+
+- Total de un item = (a_comprar si existe, si no cantidad) x precio_unit;
+  sin precio_unit es un valor global (se respeta el total guardado);
+  los items en_existencia valen 0
+- Subtotales y totales se derivan; al cambiar un item solo se recorre su
+  camino hasta la raiz (suma de la diferencia)
+- validar() compara los totales guardados a mano con los calculados
+"""
+
+import copy
+
+import pandas as pd
+
+from modelo_financiero import TASA_COP_USD
+
+# Totales de nivel superior y las secciones que suman
+TOTALES = {
+    "total_infraestructura": ["huerta_12_camas", "encerramiento_huerta",
+                              "camas_algas_lombricompost", "gallinero", "logistica"],
+    "total_general": ["total_infraestructura", "mantenimiento_bodega"],
+}
+RAIZ = "total_general"
+
+# Llaves de una seccion que no son items
+CAMPOS_SECCION = {"subtotal", "items", "dimensiones", "cantidad", "nota", "medida"}
+
+
+def total_item(item):
+    """Total calculado de un item del presupuesto"""
+    if item.get('en_existencia'):
+        return 0
+    if 'precio_unit' not in item:
+        return item.get('total', 0)
+    unidades = item['a_comprar'] if 'a_comprar' in item else item.get('cantidad', 0)
+    return unidades * item['precio_unit']
+
+
+class Presupuesto:
+    """Items, subtotales derivados y propagacion incremental de cambios"""
+
+    def __init__(self, presupuesto_real):
+        self.original = presupuesto_real
+        self.items = {}          # (seccion, item) -> dict del item
+        self.padre = {}          # nodo -> nodo padre
+        self.suma = {}           # nodo -> total calculado
+        self._cargar()
+
+    def _items_de(self, seccion):
+        datos = self.original[seccion]
+        if 'items' in datos:
+            return datos['items'].items()
+        # Secciones como 'logistica' guardan sus items directo en la seccion
+        return ((k, v if isinstance(v, dict) else {'total': v})
+                for k, v in datos.items() if k not in CAMPOS_SECCION)
+
+    def _cargar(self):
+        for total, hijos in TOTALES.items():
+            for hijo in hijos:
+                self.padre[hijo] = total
+        secciones = [s for hijos in TOTALES.values() for s in hijos if s not in TOTALES]
+        for seccion in secciones:
+            if seccion not in self.original:
+                continue
+            for nombre, item in self._items_de(seccion):
+                clave = (seccion, nombre)
+                self.items[clave] = dict(item)
+                self.padre[clave] = seccion
+        self.recalcular()
+
+    def recalcular(self):
+        """Suma completa del arbol (solo al cargar)"""
+        self.suma = {nodo: 0 for nodo in set(self.padre.values()) | set(self.padre)}
+        for clave, item in self.items.items():
+            self.suma[clave] = total_item(item)
+        # Hojas hacia la raiz: items -> secciones -> totales
+        for clave in self.items:
+            self.suma[self.padre[clave]] += self.suma[clave]
+        for total in ("total_infraestructura", RAIZ):
+            self.suma[total] = sum(self.suma.get(h, 0) for h in TOTALES[total])
+
+    def camino(self, nodo):
+        """Nodos desde el padre de nodo hasta la raiz"""
+        ruta = []
+        while nodo in self.padre:
+            nodo = self.padre[nodo]
+            ruta.append(nodo)
+        return ruta
+
+    def actualizar_item(self, seccion, nombre, **campos):
+        """
+        Cambia campos de un item y propaga solo por su camino.
+
+        Retorna la diferencia aplicada al total.
+        """
+        clave = (seccion, nombre)
+        item = self.items[clave]
+        item.update(campos)
+        # Si cambia cantidad o stock, lo que falta comprar se deriva
+        if 'a_comprar' in item and 'en_stock' in item and 'a_comprar' not in campos \
+                and ('cantidad' in campos or 'en_stock' in campos):
+            item['a_comprar'] = max(item.get('cantidad', 0) - item['en_stock'], 0)
+        nuevo = total_item(item)
+        if 'precio_unit' not in item:
+            item['total'] = nuevo
+        delta = nuevo - self.suma[clave]
+        if delta:
+            self.suma[clave] = nuevo
+            for nodo in self.camino(clave):
+                self.suma[nodo] += delta
+        return delta
+
+    # -------------------- consultas --------------------
+
+    def total(self, nodo=RAIZ):
+        return self.suma.get(nodo, 0)
+
+    def subtotales(self):
+        """DataFrame seccion, calculado, guardado"""
+        filas = []
+        for total, hijos in TOTALES.items():
+            for hijo in hijos:
+                if hijo in TOTALES:
+                    continue
+                guardado = self.original.get(hijo, {}).get('subtotal')
+                filas.append({'Seccion': hijo, 'Subtotal calculado': self.suma.get(hijo, 0),
+                              'Subtotal guardado': guardado})
+        return pd.DataFrame(filas)
+
+    def tabla_items(self):
+        """Un item por fila (para el editor de la pagina)"""
+        filas = []
+        for (seccion, nombre), item in self.items.items():
+            filas.append({
+                'Seccion': seccion,
+                'Item': nombre,
+                'Cantidad': item.get('cantidad'),
+                'Precio unit': item.get('precio_unit'),
+                'En stock': item.get('en_stock'),
+                'A comprar': item.get('a_comprar'),
+                'Total': self.suma[(seccion, nombre)],
+            })
+        return pd.DataFrame(filas)
+
+    def validar(self):
+        """Diferencias entre totales guardados y calculados"""
+        problemas = []
+        for (seccion, nombre), item in self.items.items():
+            original = self.original[seccion].get('items', self.original[seccion]).get(nombre)
+            guardado = original.get('total') if isinstance(original, dict) else original
+            calculado = self.suma[(seccion, nombre)]
+            if guardado is not None and guardado != calculado:
+                problemas.append({'Nivel': 'item', 'Nodo': f"{seccion}.{nombre}",
+                                  'Guardado': guardado, 'Calculado': calculado})
+            if 'a_comprar' in item and 'en_stock' in item and 'cantidad' in item \
+                    and item['a_comprar'] != item['cantidad'] - item['en_stock']:
+                problemas.append({'Nivel': 'stock', 'Nodo': f"{seccion}.{nombre}",
+                                  'Guardado': item['a_comprar'],
+                                  'Calculado': item['cantidad'] - item['en_stock']})
+        for nodo in list(self.suma):
+            if isinstance(nodo, tuple):
+                continue
+            if nodo in TOTALES:
+                guardado = self.original.get(nodo)
+            else:
+                guardado = self.original.get(nodo, {}).get('subtotal')
+            if guardado is not None and guardado != self.suma[nodo]:
+                problemas.append({'Nivel': 'total' if nodo in TOTALES else 'subtotal', 'Nodo': nodo,
+                                  'Guardado': guardado, 'Calculado': self.suma[nodo]})
+        return pd.DataFrame(problemas, columns=['Nivel', 'Nodo', 'Guardado', 'Calculado'])
+
+    def a_config(self):
+        """presupuesto_real con items editados y todos los totales derivados"""
+        salida = copy.deepcopy(self.original)
+        for (seccion, nombre), item in self.items.items():
+            destino = salida[seccion]['items'] if 'items' in salida[seccion] else salida[seccion]
+            if isinstance(destino.get(nombre), dict):
+                destino[nombre] = {**item, 'total': self.suma[(seccion, nombre)]}
+            else:
+                destino[nombre] = self.suma[(seccion, nombre)]
+        for nodo, valor in self.suma.items():
+            if isinstance(nodo, tuple):
+                continue
+            if nodo in TOTALES:
+                salida[nodo] = valor
+            elif nodo in salida:
+                salida[nodo]['subtotal'] = valor
+        salida['total_usd_aprox'] = round(self.total() / TASA_COP_USD)
+        return salida
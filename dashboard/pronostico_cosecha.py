@@ -0,0 +1,155 @@
+"""
+HUERTA INTELIGENTE LPET - Pronostico de cosecha
+================================================
+Modelo por cultivo y cama sobre el registro de Cosecha (Google Sheets):
+
+- Serie semanal de kg (semanas sin registro = 0)
+- Indice estacional por mes del ano, encogido hacia 1 con poca historia
+- Nivel desestacionalizado con suavizado exponencial
+- Banda del 80% a partir del error de un paso del nivel
+
+El ajuste corre en scripts/pronosticar_cosecha.py (job programado), que
+guarda output/pronostico_cosecha.json. Las paginas solo leen ese archivo
+con cargar_pronostico(): nunca se ajusta un modelo dentro de Streamlit.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from taxonomia_cultivos import normalizar
+
+BASE_DIR = Path(__file__).parent.parent
+PRONOSTICO_PATH = BASE_DIR / "output" / "pronostico_cosecha.json"
+
+SEMANAS_PRONOSTICO = 8
+ALFA_NIVEL = 0.3
+# Semanas de historia que "valen" lo mismo que el indice neutro (1.0)
+PESO_PRIOR_ESTACIONAL = 4
+Z_BANDA_80 = 1.2816
+
+
+def normalizar_cosecha(df):
+    """
+    Registro de Cosecha -> DataFrame fecha, cultivo, cama, kg.
+
+    Usa los nombres del formulario (Fecha, Cultivo, Cama, Cantidad_kg) o, si
+    no estan, las columnas B-E como en docs/SETUP_GOOGLE_FORMS.md.
+    """
+    nombres = {'Fecha': 'fecha', 'Cultivo': 'cultivo', 'Cama': 'cama', 'Cantidad_kg': 'kg'}
+    if all(c in df.columns for c in nombres):
+        out = df[list(nombres)].rename(columns=nombres)
+    else:
+        out = df.iloc[:, 1:5].copy()
+        out.columns = ['fecha', 'cultivo', 'cama', 'kg']
+
+    out['fecha'] = pd.to_datetime(out['fecha'], errors='coerce', dayfirst=True)
+    out['kg'] = pd.to_numeric(out['kg'], errors='coerce')
+    out['cultivo'] = out['cultivo'].astype(str).map(normalizar)
+    out['cama'] = out['cama'].astype(str).str.strip()
+    return out.dropna(subset=['fecha', 'kg']).reset_index(drop=True)
+
+
+def series_semanales(cosecha, hasta=None):
+    """Matriz semana x (cultivo, cama) de kg, con ceros en semanas sin cosecha"""
+    cosecha = cosecha.copy()
+    cosecha['semana'] = cosecha['fecha'].dt.to_period('W-SUN').dt.start_time
+    tabla = cosecha.pivot_table(index='semana', columns=['cultivo', 'cama'],
+                                values='kg', aggfunc='sum', fill_value=0.0)
+    fin = tabla.index.max() if hasta is None else pd.Timestamp(hasta).to_period('W-SUN').start_time
+    semanas = pd.date_range(tabla.index.min(), fin, freq='W-MON')
+    return tabla.reindex(semanas, fill_value=0.0)
+
+
+def _indices_estacionales(tabla):
+    """Indice (12 meses x series) encogido hacia 1 segun las semanas observadas"""
+    meses = tabla.index.month
+    media = tabla.mean(axis=0).replace(0, np.nan)
+    por_mes = tabla.groupby(meses).mean()
+    n_mes = tabla.groupby(meses).size()
+    bruto = (por_mes / media).fillna(1.0)
+    peso = n_mes.to_numpy()[:, None]
+    encogido = (peso * bruto + PESO_PRIOR_ESTACIONAL) / (peso + PESO_PRIOR_ESTACIONAL)
+    return encogido.reindex(range(1, 13), fill_value=1.0)
+
+
+def ajustar(tabla, semanas=SEMANAS_PRONOSTICO):
+    """
+    Pronostico de las siguientes semanas para todas las series a la vez.
+
+    Retorna DataFrame largo: cultivo, cama, semana, kg, kg_min, kg_max.
+    """
+    indices = _indices_estacionales(tabla)
+    idx_hist = indices.loc[tabla.index.month].to_numpy()
+    desestacional = tabla / np.where(idx_hist > 0, idx_hist, 1.0)
+
+    nivel = desestacional.ewm(alpha=ALFA_NIVEL, adjust=False).mean()
+    # Error de un paso: lo observado contra el nivel de la semana anterior re-estacionalizado
+    previsto = nivel.shift(1) * idx_hist
+    error = (tabla - previsto).iloc[1:]
+    sigma = error.std(axis=0).fillna(0.0)
+
+    futuras = pd.date_range(tabla.index.max() + pd.Timedelta(weeks=1), periods=semanas, freq='W-MON')
+    idx_fut = indices.loc[futuras.month].to_numpy()
+    kg = np.clip(nivel.iloc[-1].to_numpy()[None, :] * idx_fut, 0, None)
+    banda = Z_BANDA_80 * sigma.to_numpy()[None, :] * np.sqrt(np.arange(1, semanas + 1))[:, None]
+
+    columnas = tabla.columns
+    largo = pd.DataFrame({
+        'cultivo': np.tile(columnas.get_level_values('cultivo'), semanas),
+        'cama': np.tile(columnas.get_level_values('cama'), semanas),
+        'semana': np.repeat(futuras, len(columnas)),
+        'kg': kg.ravel(),
+        'kg_min': np.clip(kg - banda, 0, None).ravel(),
+        'kg_max': (kg + banda).ravel(),
+    })
+    return largo.round({'kg': 2, 'kg_min': 2, 'kg_max': 2})
+
+
+# ============================================================
+# ARTEFACTO
+# ============================================================
+
+def generar_pronostico(cosecha, semanas=SEMANAS_PRONOSTICO, hoy=None):
+    """Artefacto listo para guardar a partir del registro normalizado"""
+    hoy = pd.Timestamp(hoy or datetime.now())
+    # Solo semanas cerradas: la semana en curso todavia esta incompleta
+    hasta = hoy.to_period('W-SUN').start_time - pd.Timedelta(weeks=1)
+    cosecha = cosecha[cosecha['fecha'] < hasta + pd.Timedelta(weeks=1)]
+    if len(cosecha) == 0:
+        return {'generado': hoy.strftime("%Y-%m-%d %H:%M"), 'registros': 0, 'pronostico': []}
+
+    tabla = series_semanales(cosecha, hasta=hasta)
+    pron = ajustar(tabla, semanas)
+    pron['semana'] = pron['semana'].dt.strftime("%Y-%m-%d")
+    return {
+        'generado': hoy.strftime("%Y-%m-%d %H:%M"),
+        'registros': int(len(cosecha)),
+        'ultima_semana': tabla.index.max().strftime("%Y-%m-%d"),
+        'semanas_historia': int(len(tabla)),
+        'pronostico': pron.to_dict(orient='records'),
+    }
+
+
+def guardar_pronostico(artefacto, ruta=PRONOSTICO_PATH):
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ruta.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(artefacto, f, ensure_ascii=False, indent=2)
+    # Reemplazo atomico: la pagina nunca lee un archivo a medio escribir
+    tmp.replace(ruta)
+
+
+def cargar_pronostico(ruta=PRONOSTICO_PATH):
+    """(metadatos, DataFrame del pronostico) del ultimo artefacto, o (None, None)"""
+    if not ruta.exists():
+        return None, None
+    with open(ruta, 'r', encoding='utf-8') as f:
+        artefacto = json.load(f)
+    df = pd.DataFrame(artefacto.pop('pronostico'),
+                      columns=['cultivo', 'cama', 'semana', 'kg', 'kg_min', 'kg_max'])
+    df['semana'] = pd.to_datetime(df['semana'])
+    return artefacto, df
@@ -0,0 +1,350 @@
+"""
+HUERTA INTELIGENTE LPET - Salud de sensores
+============================================
+Deteccion en linea de sondas con deriva, pegadas o enterradas.
+Cada serie usa memoria O(1) y costo O(1) por lectura:
+
+- Media y varianza acumuladas (Welford)
+- Media y varianza exponenciales (EWMA) para picos y deriva
+- Contador de lecturas repetidas (sonda pegada)
+- Pares redundantes (ej. WH51-6 / WH51-7 en el invernadero) comparados
+  por la diferencia entre ambos
+
+El estado se guarda en data/sensores/estado_salud.json para procesar
+solo las lecturas nuevas en cada corrida.
+"""
+
+import json
+import math
+
+import pandas as pd
+
+from sensores import (
+    SENSORES_DIR, RANGOS_FISICOS, VARIABLES_POR_MODELO, modelo_sensor,
+    sensores_por_zona, cargar_historial
+)
+
+ESTADO_PATH = SENSORES_DIR / "estado_salud.json"
+
+PARAMETROS_DEFAULT = {
+    "alfa": 0.05,              # peso de la lectura nueva en la EWMA
+    "min_lecturas": 30,        # lecturas antes de evaluar picos y deriva
+    "umbral_pico": 5.0,        # desviaciones de la EWMA para marcar un pico
+    "umbral_deriva": 2.5,      # desviaciones entre EWMA y media historica
+    "tolerancia_plana": 0.05,  # cambio minimo para no contar como repetida
+    "max_repetidas": 288,      # lecturas iguales seguidas (~1 dia a 5 min)
+}
+
+NOMBRES_BANDERAS = {
+    "fuera_rango": "Lectura fuera de rango fisico",
+    "pegado": "Sonda pegada (valor sin cambio)",
+    "pico": "Pico atipico",
+    "deriva": "Deriva respecto al historico",
+    "divergencia": "Par redundante en desacuerdo",
+}
+
+NIVEL_BANDERA = {
+    "fuera_rango": "critico",
+    "pegado": "critico",
+    "pico": "aviso",
+    "deriva": "aviso",
+    "divergencia": "aviso",
+}
+
+
+class EstadisticaEnLinea:
+    """Media/varianza de Welford + EWMA de una serie"""
+
+    __slots__ = ("n", "media", "m2", "ewma", "ewvar")
+
+    def __init__(self, n=0, media=0.0, m2=0.0, ewma=None, ewvar=0.0):
+        self.n = n
+        self.media = media
+        self.m2 = m2
+        self.ewma = ewma
+        self.ewvar = ewvar
+
+    @property
+    def desviacion(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    @property
+    def desviacion_ewma(self):
+        return math.sqrt(self.ewvar)
+
+    def actualizar(self, valor, alfa):
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valor - self.media)
+
+        if self.ewma is None:
+            self.ewma = valor
+        else:
+            diff = valor - self.ewma
+            incremento = alfa * diff
+            self.ewma += incremento
+            self.ewvar = (1 - alfa) * (self.ewvar + diff * incremento)
+
+    def a_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class DetectorSensor:
+    """Detector de anomalias de una variable de un sensor"""
+
+    def __init__(self, sensor_id, variable, parametros=None, estado=None):
+        self.sensor_id = sensor_id
+        self.variable = variable
+        self.p = {**PARAMETROS_DEFAULT, **(parametros or {})}
+        estado = estado or {}
+        self.stats = EstadisticaEnLinea(**estado.get('stats', {}))
+        self.ultimo_valor = estado.get('ultimo_valor')
+        self.repetidas = estado.get('repetidas', 0)
+        self.ultima_fecha = estado.get('ultima_fecha')
+        self.banderas = set(estado.get('banderas', []))
+
+    def actualizar(self, valor, fecha):
+        """Procesa una lectura y devuelve las banderas activas"""
+        self.ultima_fecha = str(fecha)
+        banderas = set()
+
+        if valor is None or not math.isfinite(valor):
+            self.banderas = banderas
+            return banderas
+
+        minimo, maximo = RANGOS_FISICOS.get(self.variable, (-math.inf, math.inf))
+        if not minimo <= valor <= maximo:
+            banderas.add("fuera_rango")
+            self.banderas = banderas
+            return banderas
+
+        # Sonda pegada: el valor no cambia durante max_repetidas lecturas
+        if self.ultimo_valor is not None and abs(valor - self.ultimo_valor) <= self.p['tolerancia_plana']:
+            self.repetidas += 1
+        else:
+            self.repetidas = 0
+        self.ultimo_valor = valor
+        if self.repetidas >= self.p['max_repetidas']:
+            banderas.add("pegado")
+
+        s = self.stats
+        if s.n >= self.p['min_lecturas']:
+            # Pico: se compara contra la EWMA antes de incorporar la lectura
+            if s.desviacion_ewma > 0 and abs(valor - s.ewma) > self.p['umbral_pico'] * s.desviacion_ewma:
+                banderas.add("pico")
+            if s.desviacion > 0 and abs(s.ewma - s.media) > self.p['umbral_deriva'] * s.desviacion:
+                banderas.add("deriva")
+
+        # Todas las lecturas entran a la EWMA para absorber cambios de nivel
+        # reales (riego, lluvia) y no marcar picos indefinidamente
+        s.actualizar(valor, self.p['alfa'])
+
+        self.banderas = banderas
+        return banderas
+
+    def a_dict(self):
+        return {
+            'stats': self.stats.a_dict(),
+            'ultimo_valor': self.ultimo_valor,
+            'repetidas': self.repetidas,
+            'ultima_fecha': self.ultima_fecha,
+            'banderas': sorted(self.banderas),
+        }
+
+
+class ComparadorPar:
+    """Compara dos sondas redundantes por la diferencia entre sus lecturas"""
+
+    def __init__(self, sensor_a, sensor_b, variable, parametros=None, estado=None):
+        self.sensor_a = sensor_a
+        self.sensor_b = sensor_b
+        self.variable = variable
+        self.p = {**PARAMETROS_DEFAULT, **(parametros or {})}
+        estado = estado or {}
+        self.stats = EstadisticaEnLinea(**estado.get('stats', {}))
+        self.divergente = estado.get('divergente', False)
+        self.ultima_fecha = estado.get('ultima_fecha')
+
+    @property
+    def clave(self):
+        return f"{self.sensor_a}|{self.sensor_b}|{self.variable}"
+
+    def actualizar(self, valor_a, valor_b):
+        if not (math.isfinite(valor_a) and math.isfinite(valor_b)):
+            return self.divergente
+        s = self.stats
+        s.actualizar(valor_a - valor_b, self.p['alfa'])
+        # La EWMA de la diferencia se aleja de su media historica cuando
+        # una de las dos sondas deriva o queda enterrada
+        self.divergente = (
+            s.n >= self.p['min_lecturas'] and s.desviacion > 0
+            and abs(s.ewma - s.media) > self.p['umbral_deriva'] * s.desviacion
+        )
+        return self.divergente
+
+    def a_dict(self):
+        return {'stats': self.stats.a_dict(), 'divergente': self.divergente,
+                'ultima_fecha': self.ultima_fecha}
+
+
+def pares_redundantes(config):
+    """Pares de sensores del mismo modelo instalados en la misma zona"""
+    pares = []
+    for sensores in sensores_por_zona(config).values():
+        for i, a in enumerate(sensores):
+            for b in sensores[i + 1:]:
+                if modelo_sensor(a) == modelo_sensor(b):
+                    pares.append((a, b))
+    return pares
+
+
+# ============================================================
+# MONITOR DE TODOS LOS SENSORES
+# ============================================================
+
+class MonitorSalud:
+    """Detectores de todos los sensores + pares, con estado persistente"""
+
+    def __init__(self, config, parametros=None):
+        self.parametros = parametros
+        self.pares = pares_redundantes(config)
+        estado = self._cargar_estado()
+        self.detectores = {
+            clave: DetectorSensor(*clave.split('|'), parametros, est)
+            for clave, est in estado.get('detectores', {}).items()
+        }
+        self.comparadores = {
+            clave: ComparadorPar(*clave.split('|'), parametros, est)
+            for clave, est in estado.get('pares', {}).items()
+        }
+
+    def _cargar_estado(self):
+        if ESTADO_PATH.exists():
+            with open(ESTADO_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def guardar(self):
+        SENSORES_DIR.mkdir(parents=True, exist_ok=True)
+        with open(ESTADO_PATH, 'w', encoding='utf-8') as f:
+            json.dump({
+                'detectores': {k: d.a_dict() for k, d in self.detectores.items()},
+                'pares': {k: c.a_dict() for k, c in self.comparadores.items()},
+            }, f, ensure_ascii=False, indent=2)
+
+    def detector(self, sensor_id, variable):
+        clave = f"{sensor_id}|{variable}"
+        if clave not in self.detectores:
+            self.detectores[clave] = DetectorSensor(sensor_id, variable, self.parametros)
+        return self.detectores[clave]
+
+    def ultima_fecha(self, sensor_id):
+        fechas = [d.ultima_fecha for d in self.detectores.values()
+                  if d.sensor_id == sensor_id and d.ultima_fecha]
+        return max(fechas) if fechas else None
+
+    def procesar_sensor(self, sensor_id, df=None):
+        """Procesa las lecturas nuevas de un sensor; devuelve alertas nuevas"""
+        if df is None:
+            df = cargar_historial(sensor_id, desde=self.ultima_fecha(sensor_id))
+        alertas = []
+        for variable in VARIABLES_POR_MODELO.get(modelo_sensor(sensor_id), []):
+            if variable not in df.columns or len(df) == 0:
+                continue
+            det = self.detector(sensor_id, variable)
+            # El df puede empezar antes de esta serie (lectura comun con su par)
+            nuevas = df if det.ultima_fecha is None else df[df['fecha'] > pd.Timestamp(det.ultima_fecha)]
+            previas = set(det.banderas)
+            for fecha, valor in zip(nuevas['fecha'], nuevas[variable].astype(float)):
+                banderas = det.actualizar(valor, fecha)
+                for b in banderas - previas:
+                    alertas.append(crear_alerta(sensor_id, variable, b, fecha, valor))
+                previas = banderas
+        return alertas
+
+    def procesar_pares(self, historiales):
+        """Compara pares redundantes en las fechas comunes de las lecturas nuevas"""
+        alertas = []
+        for a, b in self.pares:
+            if a not in historiales or b not in historiales:
+                continue
+            for variable in VARIABLES_POR_MODELO.get(modelo_sensor(a), []):
+                unido = pd.merge(historiales[a][['fecha', variable]],
+                                 historiales[b][['fecha', variable]],
+                                 on='fecha', suffixes=('_a', '_b'))
+                clave = f"{a}|{b}|{variable}"
+                if clave not in self.comparadores:
+                    self.comparadores[clave] = ComparadorPar(a, b, variable, self.parametros)
+                comp = self.comparadores[clave]
+                if comp.ultima_fecha is not None:
+                    unido = unido[unido['fecha'] > pd.Timestamp(comp.ultima_fecha)]
+                previo = comp.divergente
+                for fecha, va, vb in zip(unido['fecha'], unido[f'{variable}_a'].astype(float),
+                                         unido[f'{variable}_b'].astype(float)):
+                    if comp.actualizar(va, vb) and not previo:
+                        alertas.append(crear_alerta(f"{a}/{b}", variable, "divergencia",
+                                                    fecha, va - vb))
+                    previo = comp.divergente
+                    comp.ultima_fecha = str(fecha)
+        return alertas
+
+    def procesar(self, sensores_ids):
+        """Procesa lecturas nuevas de todos los sensores y guarda el estado"""
+        historiales = {}
+        alertas = []
+        desde = {s: self.ultima_fecha(s) for s in sensores_ids}
+        # Los dos sensores de un par se leen desde la marca mas antigua: si sus
+        # lecturas se importaron en momentos distintos, el adelantado aun tiene
+        # fechas en comun con el otro (cada detector salta las ya procesadas)
+        for a, b in self.pares:
+            if a in desde and b in desde:
+                comun = None if desde[a] is None or desde[b] is None else \
+                    min(desde[a], desde[b], key=pd.Timestamp)
+                desde[a] = desde[b] = comun
+        for sensor_id in sensores_ids:
+            df = cargar_historial(sensor_id, desde=desde[sensor_id])
+            historiales[sensor_id] = df
+            alertas += self.procesar_sensor(sensor_id, df)
+        alertas += self.procesar_pares(historiales)
+        self.guardar()
+        return alertas
+
+    def resumen(self):
+        """Tabla de salud por sensor y variable"""
+        filas = []
+        for det in self.detectores.values():
+            s = det.stats
+            filas.append({
+                'Sensor': det.sensor_id,
+                'Variable': det.variable,
+                'Ultima lectura': det.ultima_fecha,
+                'Ultimo valor': det.ultimo_valor,
+                'Lecturas': s.n,
+                'Media': round(s.media, 2),
+                'Desv.': round(s.desviacion, 2),
+                'EWMA': round(s.ewma, 2) if s.ewma is not None else None,
+                'Estado': ", ".join(NOMBRES_BANDERAS[b] for b in sorted(det.banderas)) or "OK",
+            })
+        for comp in self.comparadores.values():
+            if comp.divergente:
+                filas.append({
+                    'Sensor': f"{comp.sensor_a}/{comp.sensor_b}",
+                    'Variable': comp.variable,
+                    'Lecturas': comp.stats.n,
+                    'Media': round(comp.stats.media, 2),
+                    'Desv.': round(comp.stats.desviacion, 2),
+                    'Estado': NOMBRES_BANDERAS['divergencia'],
+                })
+        return pd.DataFrame(filas)
+
+
+def crear_alerta(sensor, variable, bandera, fecha, valor):
+    return {
+        'fecha': pd.Timestamp(fecha).strftime("%Y-%m-%d %H:%M"),
+        'sensor': sensor,
+        'variable': variable,
+        'tipo': bandera,
+        'nivel': NIVEL_BANDERA[bandera],
+        'mensaje': f"{NOMBRES_BANDERAS[bandera]}: {sensor} {variable} = {valor:.1f}",
+    }
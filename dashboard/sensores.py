@@ -0,0 +1,197 @@
+"""
+HUERTA INTELIGENTE LPET - Historial de sensores Ecowitt
+========================================================
+- Historial comprimido por sensor en data/sensores/<sensor>.serie
+- Cola de alertas para el iPad del operario (data/alertas_sensores.json)
+
+El historial se lee como DataFrame: una fila por lectura, columna 'fecha'
++ una columna por variable del modelo (ver VARIABLES_POR_MODELO). Los
+valores se guardan a la resolucion de RESOLUCION (ver series_comprimidas).
+Un historial CSV antiguo (<sensor>.csv) se migra al leerlo por primera vez.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from series_comprimidas import leer_serie, agregar_serie, ultima_fecha
+
+BASE_DIR = Path(__file__).parent.parent
+SENSORES_DIR = BASE_DIR / "data" / "sensores"
+ALERTAS_PATH = BASE_DIR / "data" / "alertas_sensores.json"
+
+# Maximo de alertas guardadas (las atendidas mas viejas se descartan)
+MAX_ALERTAS = 500
+
+VARIABLES_POR_MODELO = {
+    "WH51": ["humedad_suelo"],
+    "WH31": ["temperatura", "humedad_aire"],
+    "WN32": ["temperatura", "humedad_aire"],
+    "WH40BH": ["lluvia_mm"],
+}
+
+# Rangos fisicos posibles; fuera de ellos la lectura es un error de sonda
+RANGOS_FISICOS = {
+    "humedad_suelo": (0, 100),
+    "humedad_aire": (0, 100),
+    "temperatura": (-5, 60),
+    "lluvia_mm": (0, 200),
+}
+
+# Resolucion guardada por variable (la de las sondas Ecowitt o mejor)
+RESOLUCION = {
+    "humedad_suelo": 0.1,
+    "humedad_aire": 0.1,
+    "temperatura": 0.01,
+    "lluvia_mm": 0.1,
+}
+
+# Sensores que no estan asociados a una zona en config['zonas']
+SENSORES_SIN_ZONA = ["WN32", "WH40BH"]
+
+
+def modelo_sensor(sensor_id):
+    """Modelo Ecowitt a partir del id ('WH51-6' -> 'WH51')"""
+    return sensor_id.split("-")[0]
+
+
+def sensores_por_zona(config):
+    """Diccionario zona_id -> lista de sensores instalados"""
+    resultado = {}
+    for z in config.get('zonas', []):
+        sensor = z.get('sensor')
+        if not sensor:
+            continue
+        resultado[z['id']] = sensor if isinstance(sensor, list) else [sensor]
+    return resultado
+
+
+def sensores_configurados(config):
+    """Lista de ids de sensores instalados segun la configuracion"""
+    ids = [s for sensores in sensores_por_zona(config).values() for s in sensores]
+    return ids + [s for s in SENSORES_SIN_ZONA if s not in ids]
+
+
+# ============================================================
+# HISTORIAL
+# ============================================================
+
+def ruta_historial(sensor_id):
+    return SENSORES_DIR / f"{sensor_id}.serie"
+
+
+def _a_segundos(fechas):
+    return np.asarray(fechas, dtype='datetime64[s]').astype(np.int64)
+
+
+def _migrar_csv(sensor_id):
+    """Pasa un historial CSV antiguo al formato comprimido (el CSV queda como .csv.bak)"""
+    ruta_csv = SENSORES_DIR / f"{sensor_id}.csv"
+    if not ruta_csv.exists() or ruta_historial(sensor_id).exists():
+        return
+    df = pd.read_csv(ruta_csv, parse_dates=['fecha'])
+    df = df.sort_values('fecha', kind='stable').drop_duplicates('fecha', keep='last')
+    _guardar(sensor_id, df)
+    ruta_csv.rename(ruta_csv.with_name(ruta_csv.name + ".bak"))
+
+
+def _guardar(sensor_id, df):
+    variables = VARIABLES_POR_MODELO.get(modelo_sensor(sensor_id), [])
+    valores = {v: df[v].to_numpy(dtype=np.float64) if v in df.columns else np.full(len(df), np.nan)
+               for v in variables}
+    SENSORES_DIR.mkdir(parents=True, exist_ok=True)
+    agregar_serie(ruta_historial(sensor_id), variables, [RESOLUCION[v] for v in variables],
+                  _a_segundos(df['fecha']), valores)
+
+
+def cargar_historial(sensor_id, desde=None):
+    """Lecturas del sensor ordenadas por fecha (DataFrame vacio si no hay)"""
+    _migrar_csv(sensor_id)
+    ruta = ruta_historial(sensor_id)
+    columnas = ['fecha'] + VARIABLES_POR_MODELO.get(modelo_sensor(sensor_id), [])
+    if not ruta.exists():
+        return pd.DataFrame(columns=columnas)
+
+    desde_s = int(_a_segundos(pd.Timestamp(desde).to_datetime64())) if desde is not None else None
+    _, segundos, valores = leer_serie(ruta, desde=desde_s)
+    df = pd.DataFrame({'fecha': pd.to_datetime(segundos, unit='s'), **valores})
+    return df[[c for c in columnas if c in df.columns]]
+
+
+def agregar_lecturas(sensor_id, df):
+    """Agrega lecturas nuevas al historial del sensor (ignora duplicados por fecha)"""
+    variables = VARIABLES_POR_MODELO.get(modelo_sensor(sensor_id), [])
+    df = df[['fecha'] + [v for v in variables if v in df.columns]].copy()
+    df['fecha'] = pd.to_datetime(df['fecha']).dt.floor('s')
+
+    _migrar_csv(sensor_id)
+    ruta = ruta_historial(sensor_id)
+    if ruta.exists():
+        ultima = ultima_fecha(ruta)
+        if ultima is not None:
+            df = df[df['fecha'] > pd.to_datetime(ultima, unit='s')]
+    df = df.sort_values('fecha', kind='stable').drop_duplicates('fecha', keep='last')
+    if len(df) == 0:
+        return 0
+
+    _guardar(sensor_id, df)
+    return len(df)
+
+
+# ============================================================
+# COLA DE ALERTAS
+# ============================================================
+
+def cargar_alertas(solo_pendientes=False):
+    """Alertas en cola, la mas reciente primero"""
+    if not ALERTAS_PATH.exists():
+        return []
+    with open(ALERTAS_PATH, 'r', encoding='utf-8') as f:
+        alertas = json.load(f)
+    if solo_pendientes:
+        alertas = [a for a in alertas if not a.get('atendida')]
+    return sorted(alertas, key=lambda a: a['fecha'], reverse=True)
+
+
+def guardar_alertas(alertas):
+    ALERTAS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(ALERTAS_PATH, 'w', encoding='utf-8') as f:
+        json.dump(alertas, f, ensure_ascii=False, indent=2)
+
+
+def encolar_alertas(nuevas):
+    """Agrega alertas a la cola; no repite una alerta pendiente igual (sensor + tipo)"""
+    if not nuevas:
+        return 0
+    alertas = cargar_alertas()
+    pendientes = {(a['sensor'], a['tipo']) for a in alertas if not a.get('atendida')}
+    siguiente_id = max((a['id'] for a in alertas), default=0) + 1
+
+    agregadas = 0
+    for alerta in nuevas:
+        if (alerta['sensor'], alerta['tipo']) in pendientes:
+            continue
+        alertas.append({**alerta, 'id': siguiente_id, 'atendida': False})
+        pendientes.add((alerta['sensor'], alerta['tipo']))
+        siguiente_id += 1
+        agregadas += 1
+
+    if len(alertas) > MAX_ALERTAS:
+        atendidas = sorted((a for a in alertas if a.get('atendida')), key=lambda a: a['fecha'])
+        sobran = {a['id'] for a in atendidas[:len(alertas) - MAX_ALERTAS]}
+        alertas = [a for a in alertas if a['id'] not in sobran]
+
+    guardar_alertas(alertas)
+    return agregadas
+
+
+def marcar_alerta_atendida(alerta_id):
+    alertas = cargar_alertas()
+    for a in alertas:
+        if a['id'] == alerta_id:
+            a['atendida'] = True
+            a['fecha_atendida'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+    guardar_alertas(alertas)
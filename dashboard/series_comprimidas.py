@@ -0,0 +1,264 @@
+"""
+HUERTA INTELIGENTE LPET - Almacenamiento comprimido de series de sensores
+==========================================================================
+Formato binario por sensor pensado para la tarjeta SD de la caja de la
+finca (anos de lecturas cada 5 minutos):
+
+- Fechas: delta-of-delta en segundos (lecturas regulares -> residuo 0)
+- Valores: cuantizados a la resolucion del sensor y guardados como deltas
+- Residuos en zigzag y empaquetados a los bits minimos de cada bloque
+- Bloques de hasta PUNTOS_POR_BLOQUE lecturas con fecha min/max en la
+  cabecera: se puede leer 'desde' una fecha saltando bloques enteros
+
+Archivo:
+    MAGIA | largo (uint32) | JSON {columnas, resoluciones}
+    bloque 1 | bloque 2 | ...
+
+Bloque:
+    CABECERA (n, largo, t_min, t_max) | fechas | columna 1 | columna 2 | ...
+
+Codificar y decodificar usa operaciones NumPy sobre el bloque completo
+(sin ciclos por lectura).
+"""
+
+import json
+import struct
+
+import numpy as np
+
+MAGIA = b"HLPS1\n"
+PUNTOS_POR_BLOQUE = 4096
+
+# n puntos, largo del cuerpo en bytes, fecha minima y maxima (segundos epoch)
+CABECERA_BLOQUE = struct.Struct("<IIqq")
+# primeros valores (hasta 2) y ancho en bits de los residuos
+CABECERA_SECCION = struct.Struct("<qqB")
+
+
+# ============================================================
+# ENTEROS: ZIGZAG + EMPAQUETADO DE BITS
+# ============================================================
+
+def _zigzag(a):
+    """Enteros con signo -> sin signo (0, -1, 1, -2 ... -> 0, 1, 2, 3 ...)"""
+    return ((a << 1) ^ (a >> 63)).astype(np.uint64)
+
+
+def _unzigzag(u):
+    return ((u >> np.uint64(1)).astype(np.int64)) ^ -((u & np.uint64(1)).astype(np.int64))
+
+
+def _empaquetar(u):
+    """Empaqueta uint64 al ancho minimo comun. Retorna (ancho, bytes)"""
+    if len(u) == 0 or not u.any():
+        return 0, b""
+    ancho = int(u.max()).bit_length()
+    bits = (u[:, None] >> np.arange(ancho, dtype=np.uint64)) & np.uint64(1)
+    return ancho, np.packbits(bits.astype(np.uint8).ravel(), bitorder='little').tobytes()
+
+
+def _desempaquetar(datos, n, ancho):
+    if ancho == 0:
+        return np.zeros(n, dtype=np.uint64)
+    bits = np.unpackbits(np.frombuffer(datos, dtype=np.uint8), count=n * ancho, bitorder='little')
+    bits = bits.reshape(n, ancho).astype(np.uint64)
+    return (bits << np.arange(ancho, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+
+
+def _bytes_empaquetados(n, ancho):
+    return (n * ancho + 7) // 8
+
+
+def _codificar_enteros(a, orden):
+    """Seccion con los primeros `orden` valores y los residuos de np.diff de ese orden"""
+    primeros = [int(v) for v in a[:orden]] + [0] * (2 - min(orden, len(a)))
+    residuos = np.diff(a, n=orden) if len(a) > orden else np.zeros(0, dtype=np.int64)
+    ancho, datos = _empaquetar(_zigzag(residuos))
+    return CABECERA_SECCION.pack(primeros[0], primeros[1], ancho) + datos
+
+
+def _decodificar_enteros(buf, pos, n, orden):
+    """Inversa de _codificar_enteros. Retorna (arreglo int64, nueva posicion)"""
+    p0, p1, ancho = CABECERA_SECCION.unpack_from(buf, pos)
+    pos += CABECERA_SECCION.size
+    n_res = max(n - orden, 0)
+    largo = _bytes_empaquetados(n_res, ancho)
+    residuos = _unzigzag(_desempaquetar(buf[pos:pos + largo], n_res, ancho))
+    pos += largo
+
+    if orden == 1:
+        a = np.concatenate([[p0], p0 + np.cumsum(residuos)])
+    else:
+        # Deltas reconstruidos desde el delta-of-delta, luego los valores
+        deltas = np.concatenate([[p1 - p0], (p1 - p0) + np.cumsum(residuos)])
+        a = np.concatenate([[p0], p0 + np.cumsum(deltas)])
+    return a[:n].astype(np.int64), pos
+
+
+# ============================================================
+# BLOQUES
+# ============================================================
+
+def _rellenar_hacia_adelante(q, faltantes):
+    """Repite el ultimo valor valido en los huecos (no rompe los deltas)"""
+    idx = np.where(faltantes, 0, np.arange(len(q)))
+    np.maximum.accumulate(idx, out=idx)
+    return q[idx]
+
+
+def codificar_bloque(segundos, columnas, resoluciones):
+    """
+    Bytes de un bloque.
+
+    segundos: int64 ordenados; columnas: lista de arreglos float alineados.
+    """
+    n = len(segundos)
+    cuerpo = [_codificar_enteros(segundos, 2)]
+    for valores, res in zip(columnas, resoluciones):
+        valores = np.asarray(valores, dtype=np.float64)
+        faltantes = ~np.isfinite(valores)
+        q = np.round(np.where(faltantes, 0.0, valores) / res).astype(np.int64)
+        if faltantes.any():
+            q = _rellenar_hacia_adelante(q, faltantes)
+            cuerpo.append(b"\x01" + np.packbits(faltantes, bitorder='little').tobytes())
+        else:
+            cuerpo.append(b"\x00")
+        cuerpo.append(_codificar_enteros(q, 1))
+
+    cuerpo = b"".join(cuerpo)
+    cabecera = CABECERA_BLOQUE.pack(n, len(cuerpo), int(segundos[0]), int(segundos[-1]))
+    return cabecera + cuerpo
+
+
+def decodificar_bloque(buf, pos, n, resoluciones):
+    """Retorna (segundos int64, lista de arreglos float64)"""
+    segundos, pos = _decodificar_enteros(buf, pos, n, 2)
+    columnas = []
+    for res in resoluciones:
+        tiene_faltantes = buf[pos] == 1
+        pos += 1
+        faltantes = None
+        if tiene_faltantes:
+            largo = (n + 7) // 8
+            faltantes = np.unpackbits(np.frombuffer(buf[pos:pos + largo], dtype=np.uint8),
+                                      count=n, bitorder='little').astype(bool)
+            pos += largo
+        q, pos = _decodificar_enteros(buf, pos, n, 1)
+        valores = q * res
+        if faltantes is not None:
+            valores[faltantes] = np.nan
+        columnas.append(valores)
+    return segundos, columnas
+
+
+# ============================================================
+# ARCHIVO
+# ============================================================
+
+def leer_cabecera(f):
+    """Metadatos del archivo y posicion del primer bloque"""
+    if f.read(len(MAGIA)) != MAGIA:
+        raise ValueError("No es un archivo de serie comprimida")
+    (largo,) = struct.unpack("<I", f.read(4))
+    meta = json.loads(f.read(largo).decode('utf-8'))
+    return meta, len(MAGIA) + 4 + largo
+
+
+def leer_indice(ruta):
+    """
+    Indice de bloques sin decodificarlos.
+
+    Retorna (meta, lista de dicts con pos, n, largo, t_min, t_max).
+    """
+    indice = []
+    with open(ruta, 'rb') as f:
+        meta, pos = leer_cabecera(f)
+        while True:
+            f.seek(pos)
+            cab = f.read(CABECERA_BLOQUE.size)
+            if len(cab) < CABECERA_BLOQUE.size:
+                break
+            n, largo, t_min, t_max = CABECERA_BLOQUE.unpack(cab)
+            indice.append({'pos': pos, 'n': n, 'largo': largo, 't_min': t_min, 't_max': t_max})
+            pos += CABECERA_BLOQUE.size + largo
+    return meta, indice
+
+
+def leer_serie(ruta, desde=None):
+    """
+    Lecturas con fecha > desde (segundos epoch; None = todo).
+
+    Retorna (meta, segundos int64, dict columna -> float64).
+    Solo se leen del disco los bloques que pueden tener lecturas nuevas.
+    """
+    meta, indice = leer_indice(ruta)
+    if desde is not None:
+        indice = [b for b in indice if b['t_max'] > desde]
+
+    partes_t = []
+    partes_v = [[] for _ in meta['columnas']]
+    with open(ruta, 'rb') as f:
+        for b in indice:
+            f.seek(b['pos'] + CABECERA_BLOQUE.size)
+            buf = f.read(b['largo'])
+            segundos, columnas = decodificar_bloque(buf, 0, b['n'], meta['resoluciones'])
+            partes_t.append(segundos)
+            for lista, valores in zip(partes_v, columnas):
+                lista.append(valores)
+
+    if not partes_t:
+        return meta, np.zeros(0, dtype=np.int64), {c: np.zeros(0) for c in meta['columnas']}
+
+    segundos = np.concatenate(partes_t)
+    valores = {c: np.concatenate(p) for c, p in zip(meta['columnas'], partes_v)}
+    if desde is not None:
+        mascara = segundos > desde
+        segundos = segundos[mascara]
+        valores = {c: v[mascara] for c, v in valores.items()}
+    return meta, segundos, valores
+
+
+def ultima_fecha(ruta):
+    """Fecha maxima guardada (segundos epoch) o None, sin decodificar bloques"""
+    _, indice = leer_indice(ruta)
+    return indice[-1]['t_max'] if indice else None
+
+
+def agregar_serie(ruta, columnas, resoluciones, segundos, valores):
+    """
+    Agrega lecturas (ordenadas y posteriores a la ultima guardada).
+
+    El ultimo bloque incompleto se reescribe junto con las lecturas nuevas;
+    los bloques completos anteriores no se tocan.
+    """
+    segundos = np.asarray(segundos, dtype=np.int64)
+    valores = [np.asarray(valores[c], dtype=np.float64) for c in columnas]
+
+    if not ruta.exists():
+        meta = json.dumps({'columnas': columnas, 'resoluciones': resoluciones}).encode('utf-8')
+        with open(ruta, 'wb') as f:
+            f.write(MAGIA + struct.pack("<I", len(meta)) + meta)
+
+    meta, indice = leer_indice(ruta)
+    if meta['columnas'] != list(columnas):
+        raise ValueError(f"Columnas distintas a las del archivo: {meta['columnas']}")
+
+    corte = None
+    if indice and indice[-1]['n'] < PUNTOS_POR_BLOQUE:
+        ultimo = indice[-1]
+        corte = ultimo['pos']
+        with open(ruta, 'rb') as f:
+            f.seek(ultimo['pos'] + CABECERA_BLOQUE.size)
+            seg_prev, val_prev = decodificar_bloque(f.read(ultimo['largo']), 0,
+                                                    ultimo['n'], meta['resoluciones'])
+        segundos = np.concatenate([seg_prev, segundos])
+        valores = [np.concatenate([p, v]) for p, v in zip(val_prev, valores)]
+
+    with open(ruta, 'r+b') as f:
+        if corte is not None:
+            f.truncate(corte)
+        f.seek(0, 2)
+        for i in range(0, len(segundos), PUNTOS_POR_BLOQUE):
+            fin = i + PUNTOS_POR_BLOQUE
+            f.write(codificar_bloque(segundos[i:fin], [v[i:fin] for v in valores],
+                                     meta['resoluciones']))
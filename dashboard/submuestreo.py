@@ -0,0 +1,127 @@
+"""
+HUERTA INTELIGENTE LPET - Submuestreo visual de series
+=======================================================
+Reduce series largas (sensores por minuto, registros de Google Sheets)
+al ancho en pixeles del grafico antes de enviarlas a Plotly.
+
+- LTTB (Largest-Triangle-Three-Buckets): conserva la forma de la curva
+- Envolvente min/max: conserva picos y valles de cada bucket
+"""
+
+import numpy as np
+
+# Ancho de referencia de un grafico a use_container_width en layout wide
+ANCHO_GRAFICO_PX = 800
+
+# LTTB trabaja sobre una preseleccion min/max de este multiplo del ancho,
+# asi el costo del ciclo por bucket no depende del largo de la serie
+FACTOR_PRESELECCION = 4
+
+
+def _eje_numerico(x):
+    """Convierte el eje x (fechas o numeros) a float64"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def _buckets(n, n_buckets):
+    """Matriz (n_buckets, tamano) de indices; -1 donde sobra relleno"""
+    # Bordes balanceados: ningun bucket queda vacio si n_buckets <= n
+    bordes = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    tamano = int(np.max(np.diff(bordes)))
+    idx = bordes[:-1, None] + np.arange(tamano)
+    return np.where(idx < bordes[1:, None], idx, -1)
+
+
+def minmax(y, n_puntos):
+    """Indices de la envolvente min/max (2 puntos por bucket, ordenados)"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_puntos or n_puntos < 2:
+        return np.arange(n)
+
+    matriz = _buckets(n, n_puntos // 2)
+    validos = matriz >= 0
+    valores = y[matriz]
+    i_min = np.argmin(np.where(validos, valores, np.inf), axis=1)
+    i_max = np.argmax(np.where(validos, valores, -np.inf), axis=1)
+
+    filas = np.arange(len(matriz))
+    elegidos = np.concatenate([matriz[filas, i_min], matriz[filas, i_max]])
+    return np.unique(elegidos[elegidos >= 0])
+
+
+def lttb(x, y, n_puntos):
+    """Indices elegidos por LTTB (siempre incluye el primero y el ultimo)"""
+    x = _eje_numerico(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_puntos or n_puntos < 3:
+        return np.arange(n)
+
+    # Buckets interiores: todo menos el primer y el ultimo punto
+    matriz = _buckets(n - 2, n_puntos - 2) + 1
+    validos = matriz > 0
+    matriz = np.where(validos, matriz, 0)
+    xs = np.where(validos, x[matriz], np.nan)
+    ys = np.where(validos, y[matriz], np.nan)
+
+    # Promedio de cada bucket (el "tercer vertice" del triangulo)
+    x_prom = np.nanmean(xs, axis=1)
+    y_prom = np.nanmean(ys, axis=1)
+    x_prom = np.append(x_prom, x[-1])
+    y_prom = np.append(y_prom, y[-1])
+
+    elegidos = np.empty(len(matriz) + 2, dtype=np.int64)
+    elegidos[0] = 0
+    elegidos[-1] = n - 1
+    ax, ay = x[0], y[0]
+    for b in range(len(matriz)):
+        cx, cy = x_prom[b + 1], y_prom[b + 1]
+        # Area (x2) del triangulo a-punto-c para todo el bucket a la vez
+        areas = np.abs((ax - cx) * (ys[b] - ay) - (ax - xs[b]) * (cy - ay))
+        j = np.nanargmax(areas)
+        elegidos[b + 1] = matriz[b, j]
+        ax, ay = xs[b, j], ys[b, j]
+    return elegidos
+
+
+def submuestrear(x, y, n_puntos=ANCHO_GRAFICO_PX, metodo="lttb"):
+    """
+    Indices de los puntos a graficar.
+
+    metodo: "lttb" (forma de la curva) o "minmax" (picos y valles).
+    Los valores no finitos se descartan antes de submuestrear.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    finitos = np.flatnonzero(np.isfinite(y))
+    if len(finitos) <= n_puntos:
+        return finitos
+
+    if metodo == "minmax":
+        return finitos[minmax(y[finitos], n_puntos)]
+
+    # MinMax-LTTB: preseleccion vectorizada y LTTB sobre los candidatos
+    x = np.asarray(x)[finitos]
+    candidatos = minmax(y[finitos], n_puntos * FACTOR_PRESELECCION)
+    candidatos = np.union1d([0, len(finitos) - 1], candidatos)
+    elegidos = lttb(x[candidatos], y[finitos][candidatos], n_puntos)
+    return finitos[candidatos[elegidos]]
+
+
+def serie_para_grafico(df, col_y, col_x=None, n_puntos=ANCHO_GRAFICO_PX,
+                       metodo="lttb", ultimos=None):
+    """
+    Filas de df listas para Plotly, reducidas a n_puntos.
+
+    col_x: columna del eje x (None = indice del DataFrame).
+    ultimos: limitar a los ultimos N registros antes de submuestrear.
+    """
+    if ultimos is not None:
+        df = df.tail(ultimos)
+    x = df.index.to_numpy() if col_x is None else df[col_x].to_numpy()
+    idx = submuestrear(x, df[col_y].to_numpy(dtype=np.float64, na_value=np.nan),
+                       n_puntos, metodo)
+    return df.iloc[idx]
@@ -0,0 +1,19 @@
+"""
+HUERTA INTELIGENTE LPET - Nucleo de tareas
+==========================================
+Logica compartida por tareas_equipo.py (JSON) y tareas_equipo_supabase.py:
+
+- ColeccionTareas: busquedas, filtros, fechas y grafo de dependencias
+- Programa nivelado por responsable (tareas_core.programacion)
+- Gantt: tablas, agregacion por grupo y trazas por color (tareas_core.gantt)
+- Carga diaria por responsable en una pasada NumPy (tareas_core.carga)
+- Kanban paginado con tarjetas cacheadas por version (tareas_core.kanban)
+- Conteos del Resumen en una sola pasada (tareas_core.resumen)
+- Spans con p50/p95 y cliente de Supabase medido (tareas_core.instrumentacion)
+- Backends intercambiables con la misma interfaz cargar / actualizar_tarea
+  / crear_tarea: JSON, Supabase y SQLite embebido
+"""
+
+from .backends import BackendJSON, BackendSupabase
+from .coleccion import ColeccionTareas, parsear_fecha
+from .sqlite import BackendSQLite
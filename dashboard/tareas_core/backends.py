@@ -0,0 +1,82 @@
+"""
+Backends de almacenamiento de tareas
+====================================
+Todos exponen la misma interfaz y devuelven el mismo diccionario que
+data/tareas_proyecto.json (metadata, equipo, estados, categorias, tareas):
+
+- cargar() -> datos
+- actualizar_tarea(tarea_id, cambios)
+- crear_tarea(tarea)
+
+BackendJSON reescribe el archivo completo en cada cambio; BackendSupabase
+y BackendSQLite (tareas_core.sqlite) escriben una fila por cambio.
+"""
+
+import json
+from datetime import datetime
+
+
+class BackendJSON:
+    """data/tareas_proyecto.json (app local tareas_equipo.py)"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.datos = None
+
+    def cargar(self):
+        with open(self.ruta, 'r', encoding='utf-8') as f:
+            self.datos = json.load(f)
+        return self.datos
+
+    def guardar(self, datos):
+        datos['metadata']['ultima_modificacion'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+        with open(self.ruta, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2)
+        self.datos = datos
+
+    def actualizar_tarea(self, tarea_id, cambios):
+        # Se relee el archivo: no se pisan cambios guardados por otra sesion
+        datos = self.cargar()
+        tarea = next((t for t in datos['tareas'] if t['id'] == tarea_id), None)
+        if tarea is None:
+            raise KeyError(f"No existe la tarea {tarea_id}")
+        tarea.update(cambios)
+        # updated_at por tarea: lo usa la sincronizacion con Supabase para resolver conflictos
+        tarea['updated_at'] = datetime.now().astimezone().isoformat()
+        self.guardar(datos)
+        return tarea
+
+    def crear_tarea(self, tarea):
+        datos = self.cargar()
+        if 'id' not in tarea:
+            tarea = {**tarea, 'id': max((t['id'] for t in datos['tareas']), default=0) + 1}
+        tarea['updated_at'] = datetime.now().astimezone().isoformat()
+        datos['tareas'].append(tarea)
+        self.guardar(datos)
+        return tarea
+
+
+class BackendSupabase:
+    """Tablas de scripts/supabase_schema.sql (app tareas_equipo_supabase.py)"""
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def cargar(self):
+        metadata = self.cliente.table('metadata').select('*').limit(1).execute().data
+        return {
+            'metadata': metadata[0] if metadata else {},
+            'equipo': self.cliente.table('equipo').select('*').execute().data,
+            'estados': self.cliente.table('estados').select('*').order('orden').execute().data,
+            'categorias': self.cliente.table('categorias').select('*').execute().data,
+            'tareas': self.cliente.table('tareas').select('*').order('fecha_objetivo').execute().data,
+        }
+
+    def actualizar_tarea(self, tarea_id, cambios):
+        cambios['updated_at'] = datetime.now().isoformat()
+        return self.cliente.table('tareas').update(cambios).eq('id', tarea_id).execute().data
+
+    def crear_tarea(self, tarea):
+        tarea['created_at'] = datetime.now().isoformat()
+        tarea['updated_at'] = datetime.now().isoformat()
+        return self.cliente.table('tareas').insert(tarea).execute().data
@@ -0,0 +1,74 @@
+"""
+Carga de trabajo por responsable y dia
+======================================
+Reparte el esfuerzo de cada tarea (dias de trabajo) entre los dias de
+calendario de su intervalo y lo suma por responsable x dia:
+
+- Una sola pasada NumPy: np.add.at suma +tasa en el dia de inicio y -tasa
+  en el dia siguiente al fin de cada tarea; un cumsum por fila reconstruye
+  la carga diaria. O(tareas + responsables x dias), sin ciclos en Python
+- Carga en jornadas por dia; se compara con la capacidad de cada
+  responsable (1 = jornada completa, 0.5 = medio tiempo) para marcar los
+  dias sobrecargados
+"""
+
+import numpy as np
+import pandas as pd
+
+# Bases de la carga: intervalos del programa nivelado o terminar justo en la fecha objetivo
+BASES = ("programa", "objetivo")
+
+
+def matriz_carga(inicio, fin, esfuerzo, fila, n_filas, desde, n_dias):
+    """
+    (n_filas, n_dias) jornadas por dia.
+
+    inicio / fin: fechas (fin exclusivo); esfuerzo: dias de trabajo de cada
+    tarea; fila: indice entero del responsable; desde: primer dia.
+    """
+    origen = np.datetime64(pd.Timestamp(desde).date(), 'D')
+    inicio = (np.asarray(inicio, dtype='datetime64[D]') - origen).astype(np.int64)
+    fin = (np.asarray(fin, dtype='datetime64[D]') - origen).astype(np.int64)
+    fila = np.asarray(fila, dtype=np.int64)
+    tasa = np.asarray(esfuerzo, dtype=np.float64) / np.maximum(fin - inicio, 1)
+
+    # Recortar a la ventana: la tasa se conserva, solo cambian los bordes
+    a = np.clip(inicio, 0, n_dias)
+    b = np.clip(fin, 0, n_dias)
+    visibles = b > a
+    delta = np.zeros((n_filas, n_dias + 1))
+    np.add.at(delta, (fila[visibles], a[visibles]), tasa[visibles])
+    np.add.at(delta, (fila[visibles], b[visibles]), -tasa[visibles])
+    return np.cumsum(delta[:, :-1], axis=1)
+
+
+def intervalos(df, base="programa"):
+    """(inicio, fin exclusivo) de cada fila de tabla_gantt segun la base"""
+    if base not in BASES:
+        raise ValueError(f"Base desconocida: {base} (usar {', '.join(BASES)})")
+    if base == "programa":
+        return df['Inicio'], df['Fin']
+    fin = df['Objetivo'] + pd.Timedelta(days=1)
+    return fin - pd.to_timedelta(df['Dias'], unit='D'), fin
+
+
+def carga_por_responsable(df, desde=None, hasta=None, base="programa", max_dias=366):
+    """
+    (responsables, fechas, matriz) con la carga diaria de las filas de
+    tabla_gantt entre desde y hasta (inclusive). Sin limites se usa el
+    rango de las tareas, hasta max_dias.
+    """
+    responsables, fila = np.unique(df['Responsable'].astype(str).to_numpy(), return_inverse=True)
+    inicio, fin = intervalos(df, base)
+    desde = pd.Timestamp(inicio.min() if desde is None else desde).normalize()
+    if hasta is None:
+        hasta = min(fin.max() - pd.Timedelta(days=1), desde + pd.Timedelta(days=max_dias - 1))
+    fechas = pd.date_range(desde, pd.Timestamp(hasta).normalize(), freq='D')
+    matriz = matriz_carga(inicio.to_numpy(), fin.to_numpy(), df['Dias'].to_numpy(),
+                          fila, len(responsables), desde, len(fechas))
+    return list(responsables), fechas, matriz
+
+
+def sobrecarga(matriz, capacidades):
+    """Mascara de dias con carga mayor a la capacidad de cada fila"""
+    return matriz > np.asarray(capacidades, dtype=np.float64)[:, None] + 1e-9
@@ -0,0 +1,235 @@
+"""
+Coleccion indexada de tareas
+============================
+Una sola estructura para las dos apps de tareas:
+
+- Diccionarios por id de equipo, estados, categorias y tareas (O(1))
+- Indices invertidos por estado, responsable, categoria, prioridad y fecha;
+  filtrar() intersecta conjuntos en vez de recorrer la lista por filtro
+- Clasificacion de fechas (vencidas / hoy / manana) y grafo de
+  dependencias calculados una vez por coleccion
+- actualizar() mueve solo la tarea cambiada entre indices
+- programa(): inicio y fin nivelados por responsable (tareas_core.programacion)
+"""
+
+from collections import deque
+from datetime import datetime, timedelta
+
+CAMPOS_INDEXADOS = ("estado", "responsable", "categoria", "prioridad", "fecha_objetivo")
+
+COLOR_ESTADO_DEFAULT = '#6c757d'
+CATEGORIA_DEFAULT = {'nombre': None, 'icono': '📌'}
+
+
+def parsear_fecha(texto):
+    """'YYYY-MM-DD' (o ISO con hora) -> date, None si no es valida"""
+    if not texto:
+        return None
+    try:
+        return datetime.strptime(str(texto)[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+class ColeccionTareas:
+    """Tareas y catalogos del proyecto con busquedas indexadas"""
+
+    def __init__(self, datos):
+        self.metadata = datos.get('metadata') or {}
+        self.equipo = {e['id']: e for e in datos.get('equipo', [])}
+        self.estados = {e['id']: e for e in datos.get('estados', [])}
+        self.categorias = {c['id']: c for c in datos.get('categorias', [])}
+        self.lista = list(datos.get('tareas', []))
+        self.por_id = {t['id']: t for t in self.lista}
+        self.posicion = {t['id']: i for i, t in enumerate(self.lista)}
+
+        # Nombre visible -> id (los filtros del sidebar trabajan con nombres)
+        self._id_responsable = {e['nombre']: i for i, e in self.equipo.items()}
+        self._id_estado = {e['nombre']: i for i, e in self.estados.items()}
+        self._id_categoria = {c['nombre']: i for i, c in self.categorias.items()}
+
+        self.indices = {campo: {} for campo in CAMPOS_INDEXADOS}
+        for t in self.lista:
+            self._indexar(t)
+        self._fechas = {}
+        self._grafo = None
+        self._impacto = {}
+        self._programa = {}
+
+    # -------------------- indices --------------------
+
+    def _indexar(self, tarea):
+        for campo in CAMPOS_INDEXADOS:
+            self.indices[campo].setdefault(tarea.get(campo), set()).add(tarea['id'])
+
+    def _desindexar(self, tarea):
+        for campo in CAMPOS_INDEXADOS:
+            grupo = self.indices[campo].get(tarea.get(campo))
+            if grupo:
+                grupo.discard(tarea['id'])
+
+    def actualizar(self, tarea_id, cambios):
+        """Aplica cambios a una tarea y refresca solo lo que depende de ellos"""
+        tarea = self.por_id[tarea_id]
+        self._desindexar(tarea)
+        tarea.update(cambios)
+        self._indexar(tarea)
+        if 'fecha_objetivo' in cambios or 'estado' in cambios:
+            self._fechas.clear()
+        if 'dependencias' in cambios or 'estado' in cambios:
+            self._grafo = None
+        if 'dependencias' in cambios:
+            self._impacto.clear()
+        # Cualquier campo (fechas, duracion, responsable, prioridad...) mueve el programa
+        self._programa.clear()
+        return tarea
+
+    def agregar(self, tarea):
+        self.lista.append(tarea)
+        self.por_id[tarea['id']] = tarea
+        self.posicion[tarea['id']] = len(self.lista) - 1
+        self._indexar(tarea)
+        self._fechas.clear()
+        self._grafo = None
+        self._impacto.clear()
+        self._programa.clear()
+
+    # -------------------- catalogos --------------------
+
+    def estado_color(self, estado_id):
+        return self.estados.get(estado_id, {}).get('color', COLOR_ESTADO_DEFAULT)
+
+    def estado_nombre(self, estado_id):
+        return self.estados.get(estado_id, {}).get('nombre', estado_id)
+
+    def responsable_nombre(self, resp_id):
+        return self.equipo.get(resp_id, {}).get('nombre', resp_id)
+
+    def categoria_info(self, cat_id):
+        return self.categorias.get(cat_id, {**CATEGORIA_DEFAULT, 'nombre': cat_id})
+
+    def titulo(self, tarea_id, largo=None):
+        texto = self.por_id.get(tarea_id, {}).get('tarea', str(tarea_id))
+        return texto[:largo] if largo else texto
+
+    def responsable_id(self, nombre):
+        return self._id_responsable.get(nombre)
+
+    def estado_id(self, nombre):
+        return self._id_estado.get(nombre)
+
+    def categoria_id(self, nombre):
+        return self._id_categoria.get(nombre)
+
+    # -------------------- filtros --------------------
+
+    def ids(self, **filtros):
+        """Ids que cumplen todos los filtros campo=valor (None = sin filtro)"""
+        conjuntos = [self.indices[campo].get(valor, set())
+                     for campo, valor in filtros.items() if valor is not None]
+        if not conjuntos:
+            return set(self.por_id)
+        conjuntos.sort(key=len)
+        return set(conjuntos[0]).intersection(*conjuntos[1:])
+
+    def filtrar(self, **filtros):
+        """Tareas que cumplen los filtros, en el orden original"""
+        return [self.por_id[i] for i in sorted(self.ids(**filtros), key=self.posicion.__getitem__)]
+
+    def contar(self, **filtros):
+        return len(self.ids(**filtros))
+
+    def agrupar(self, tareas, campo):
+        """{valor: [tareas]} preservando el orden de la lista recibida"""
+        grupos = {}
+        for t in tareas:
+            grupos.setdefault(t.get(campo), []).append(t)
+        return grupos
+
+    # -------------------- fechas --------------------
+
+    def fecha(self, tarea):
+        return parsear_fecha(tarea.get('fecha_objetivo'))
+
+    def clasificar_fechas(self, hoy):
+        """{'vencidas', 'hoy', 'manana'}: ids de tareas no finalizadas (cache por dia)"""
+        if hoy not in self._fechas:
+            manana = hoy + timedelta(days=1)
+            clases = {'vencidas': set(), 'hoy': set(), 'manana': set()}
+            finalizadas = self.indices['estado'].get('finalizado', set())
+            for texto, ids in self.indices['fecha_objetivo'].items():
+                fecha = parsear_fecha(texto)
+                if fecha is None:
+                    continue
+                clase = 'vencidas' if fecha < hoy else 'hoy' if fecha == hoy else 'manana' if fecha == manana else None
+                if clase:
+                    clases[clase] |= ids - finalizadas
+            self._fechas = {hoy: clases}
+        return self._fechas[hoy]
+
+    # -------------------- grafo de dependencias --------------------
+
+    def _construir_grafo(self):
+        bloqueado_por = {}  # tarea_id -> dependencias NO finalizadas
+        bloquea_a = {}      # tarea_id -> tareas que dependen de esta
+        for t in self.lista:
+            deps = t.get('dependencias') or []
+            bloqueado_por[t['id']] = [d for d in deps if d in self.por_id
+                                      and self.por_id[d]['estado'] != 'finalizado']
+            for d in deps:
+                bloquea_a.setdefault(d, []).append(t['id'])
+        self._grafo = (bloqueado_por, bloquea_a)
+
+    @property
+    def bloqueado_por(self):
+        if self._grafo is None:
+            self._construir_grafo()
+        return self._grafo[0]
+
+    @property
+    def bloquea_a(self):
+        if self._grafo is None:
+            self._construir_grafo()
+        return self._grafo[1]
+
+    def impacto_cascada(self, tarea_id):
+        """Todas las tareas que se retrasan si tarea_id se retrasa (memoizado)"""
+        if tarea_id not in self._impacto:
+            afectadas = set()
+            pila = list(self.bloquea_a.get(tarea_id, []))
+            while pila:
+                actual = pila.pop()
+                if actual in afectadas or actual == tarea_id:
+                    continue
+                afectadas.add(actual)
+                pila.extend(self.bloquea_a.get(actual, []))
+            self._impacto[tarea_id] = afectadas
+        return self._impacto[tarea_id]
+
+    def orden_topologico(self):
+        """Ids en orden de dependencias; ValueError si hay un ciclo"""
+        pendientes = {i: len([d for d in t.get('dependencias') or [] if d in self.por_id])
+                      for i, t in self.por_id.items()}
+        cola = deque(i for i in sorted(pendientes, key=self.posicion.__getitem__) if pendientes[i] == 0)
+        orden = []
+        while cola:
+            actual = cola.popleft()
+            orden.append(actual)
+            for s in self.bloquea_a.get(actual, []):
+                if s in pendientes:
+                    pendientes[s] -= 1
+                    if pendientes[s] == 0:
+                        cola.append(s)
+        if len(orden) != len(self.por_id):
+            ciclo = sorted(str(i) for i, n in pendientes.items() if n > 0)
+            raise ValueError(f"Dependencias circulares entre las tareas {ciclo}")
+        return orden
+
+    # -------------------- programacion --------------------
+
+    def programa(self, hoy):
+        """{tarea_id: {'inicio', 'fin', 'dias', 'atraso'}} nivelado por responsable (cache por dia)"""
+        if hoy not in self._programa:
+            from .programacion import programar
+            self._programa = {hoy: programar(self, hoy)}
+        return self._programa[hoy]
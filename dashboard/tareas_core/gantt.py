@@ -0,0 +1,134 @@
+"""
+Datos del diagrama de Gantt
+===========================
+Prepara las barras de la Linea de Tiempo sin depender de Streamlit:
+
+- tabla_gantt(): una fila por tarea con fechas ya convertidas (se cachea
+  en la app por estado de filtros); con el programa nivelado
+  (ColeccionTareas.programa) las barras van del inicio al fin calculados
+- en_ventana(): solo las tareas que se cruzan con la ventana visible
+- agregar(): a zoom amplio, una barra por grupo x color x periodo con el
+  numero de tareas, en vez de una barra por tarea
+- segmentos(): todas las barras de un color en una sola traza (inicio,
+  punto medio para el hover, fin y None como separador), apta para
+  Scattergl; el numero de trazas depende de los colores, no de las tareas
+"""
+
+from datetime import timedelta
+
+import pandas as pd
+
+from .coleccion import parsear_fecha
+from .programacion import duracion
+
+# Mas barras que esto en la ventana -> vista agregada por grupo
+MAX_BARRAS = 400
+
+# Ventanas mas largas que esto se agregan por mes en vez de por semana
+DIAS_PERIODO_MENSUAL = 180
+
+COLUMNAS = ["id", "Tarea", "Inicio", "Fin", "Objetivo", "Dias", "Atraso", "Categoria", "Estado",
+            "Responsable", "Prioridad", "Individual"]
+
+
+def tabla_gantt(coleccion, tareas, mostrar_finalizadas=False, programa=None):
+    """
+    DataFrame con una fila por tarea con fecha objetivo valida. Fin es
+    exclusivo (dia siguiente al ultimo dia de trabajo) para que una tarea
+    de un dia tenga ancho. Las tareas fuera del programa (finalizadas)
+    terminan en su fecha objetivo.
+    """
+    programa = programa or {}
+    filas = []
+    for t in tareas:
+        if not mostrar_finalizadas and t.get('estado') == 'finalizado':
+            continue
+        objetivo = parsear_fecha(t.get('fecha_objetivo'))
+        if objetivo is None:
+            continue
+        if t['id'] in programa:
+            inicio = programa[t['id']]['inicio']
+            fin = programa[t['id']]['fin'] + timedelta(days=1)
+            dias = programa[t['id']]['dias']
+            atraso = programa[t['id']]['atraso']
+        else:
+            dias = duracion(t)
+            inicio = parsear_fecha(t.get('fecha_inicio')) or objetivo - timedelta(days=dias - 1)
+            fin = objetivo + timedelta(days=1)
+            atraso = 0
+        cat = coleccion.categoria_info(t.get('categoria'))
+        texto = t.get('tarea') or ""
+        filas.append((
+            t['id'],
+            texto[:45] + ('...' if len(texto) > 45 else ''),
+            inicio,
+            fin,
+            objetivo,
+            dias,
+            atraso,
+            f"{cat['icono']} {cat['nombre']}",
+            coleccion.estado_nombre(t.get('estado')),
+            coleccion.responsable_nombre(t.get('responsable')),
+            t.get('prioridad'),
+            texto[:50],
+        ))
+    df = pd.DataFrame(filas, columns=COLUMNAS)
+    df['Inicio'] = pd.to_datetime(df['Inicio'])
+    df['Fin'] = pd.to_datetime(df['Fin'])
+    df['Objetivo'] = pd.to_datetime(df['Objetivo'])
+    return df
+
+
+def en_ventana(df, desde=None, hasta=None):
+    """Tareas cuyo intervalo [Inicio, Fin] se cruza con [desde, hasta]"""
+    visible = pd.Series(True, index=df.index)
+    if desde is not None:
+        visible &= df['Fin'] >= pd.Timestamp(desde)
+    if hasta is not None:
+        visible &= df['Inicio'] <= pd.Timestamp(hasta)
+    return df[visible]
+
+
+def periodo_para(df):
+    """'W' (semana) o 'M' (mes) segun el rango de fechas mostrado"""
+    if df.empty:
+        return 'W'
+    rango = (df['Fin'].max() - df['Inicio'].min()).days
+    return 'M' if rango > DIAS_PERIODO_MENSUAL else 'W'
+
+
+def agregar(df, grupo, color, periodo='W'):
+    """
+    Una barra por (grupo, color, periodo de la fecha de fin): va del
+    primer inicio al ultimo fin de sus tareas y lleva la cuenta en 'Tareas'.
+    """
+    claves = list(dict.fromkeys([grupo, color])) + ['Periodo']
+    resumen = (df.assign(Periodo=df['Fin'].dt.to_period(periodo))
+               .groupby(claves, sort=False, dropna=False)
+               .agg(Inicio=('Inicio', 'min'), Fin=('Fin', 'max'), Tareas=('id', 'size'))
+               .reset_index())
+    resumen['Tarea'] = resumen['Tareas'].map(lambda n: f"{n} tarea" + ("s" if n != 1 else ""))
+    return resumen
+
+
+def segmentos(df, grupo, color, hover):
+    """
+    {valor de color: (x, y, texto)} con cada barra como los puntos
+    Inicio, medio y Fin seguidos de None, para dibujar un color por traza.
+    """
+    trazas = {}
+    for valor, parte in df.groupby(color, sort=False, dropna=False):
+        n = len(parte)
+        x = [None] * (4 * n)
+        y = [None] * (4 * n)
+        texto = [None] * (4 * n)
+        x[0::4] = parte['Inicio'].tolist()
+        x[1::4] = (parte['Inicio'] + (parte['Fin'] - parte['Inicio']) / 2).tolist()
+        x[2::4] = parte['Fin'].tolist()
+        filas = parte[grupo].tolist()
+        etiquetas = parte[hover].astype(str).tolist()
+        for k in range(3):
+            y[k::4] = filas
+            texto[k::4] = etiquetas
+        trazas[valor] = (x, y, texto)
+    return trazas
@@ -0,0 +1,152 @@
+"""
+Instrumentacion de tiempos
+==========================
+Spans con nombre agregados en ventanas moviles, para saber si un rerun
+lento es latencia de Supabase, calculo en Python o serializacion de
+Plotly:
+
+- Metricas: ultimas VENTANA duraciones por (tipo, nombre) con p50 / p95,
+  y exportacion en formato de texto de Prometheus (summary con cuantiles
+  de la ventana y _sum / _count acumulados desde que arranco el proceso)
+- ClienteInstrumentado: envuelve el cliente de Supabase; cada
+  .table(...)...execute() se mide como un span 'supabase' llamado
+  tabla.operacion (tareas.select, tareas.update...), sin cambiar los
+  backends que lo usan
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Duraciones guardadas por span para los percentiles
+VENTANA = 200
+
+CUANTILES = (0.5, 0.95)
+
+# Primer metodo del constructor de postgrest que define la operacion
+OPERACIONES = ("select", "insert", "update", "upsert", "delete")
+
+
+def percentil(ordenados, q):
+    """Cuantil q (0-1) de una lista ordenada, interpolado como np.percentile"""
+    # Sin NumPy: la app importa este modulo al arrancar y no debe cargar NumPy solo para esto
+    posicion = (len(ordenados) - 1) * q
+    i = math.floor(posicion)
+    siguiente = ordenados[min(i + 1, len(ordenados) - 1)]
+    return ordenados[i] + (siguiente - ordenados[i]) * (posicion - i)
+
+
+def _etiqueta(valor):
+    """Valor de label de Prometheus escapado"""
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metricas:
+    """Spans de un proceso (compartidos entre sesiones; seguros entre hilos)"""
+
+    def __init__(self, ventana=VENTANA):
+        self.ventana = ventana
+        self._duraciones = {}  # (tipo, nombre) -> deque de ms
+        self._totales = {}     # (tipo, nombre) -> [n, suma ms] desde el inicio
+        self._lock = threading.Lock()
+
+    def registrar(self, tipo, nombre, ms):
+        with self._lock:
+            clave = (tipo, nombre)
+            if clave not in self._duraciones:
+                self._duraciones[clave] = deque(maxlen=self.ventana)
+                self._totales[clave] = [0, 0.0]
+            self._duraciones[clave].append(ms)
+            self._totales[clave][0] += 1
+            self._totales[clave][1] += ms
+
+    @contextmanager
+    def span(self, tipo, nombre):
+        """Mide el bloque (tambien si termina con una excepcion)"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(tipo, nombre, (time.perf_counter() - inicio) * 1000)
+
+    def _copia(self):
+        with self._lock:
+            return {clave: (sorted(d), *self._totales[clave]) for clave, d in self._duraciones.items()}
+
+    def resumen(self):
+        """[{'tipo', 'nombre', 'n', 'p50_ms', 'p95_ms', 'max_ms', 'total'}] por tipo y p95 descendente"""
+        filas = []
+        for (tipo, nombre), (ms, total, _) in self._copia().items():
+            p50, p95 = (percentil(ms, q) for q in CUANTILES)
+            filas.append({'tipo': tipo, 'nombre': nombre, 'n': len(ms), 'p50_ms': round(p50, 1),
+                          'p95_ms': round(p95, 1), 'max_ms': round(ms[-1], 1), 'total': total})
+        return sorted(filas, key=lambda f: (f['tipo'], -f['p95_ms']))
+
+    def prometheus(self, prefijo="huerta_tareas"):
+        """Texto de exposicion de Prometheus (segundos, como pide la convencion)"""
+        metrica = f"{prefijo}_span_seconds"
+        lineas = [f"# HELP {metrica} Duracion de consultas, paginas y graficos del dashboard",
+                  f"# TYPE {metrica} summary"]
+        for (tipo, nombre), (ms, total, suma) in sorted(self._copia().items()):
+            labels = f'tipo="{_etiqueta(tipo)}",nombre="{_etiqueta(nombre)}"'
+            for q in CUANTILES:
+                lineas.append(f'{metrica}{{{labels},quantile="{q}"}} {percentil(ms, q) / 1000:.6f}')
+            lineas.append(f"{metrica}_sum{{{labels}}} {suma / 1000:.6f}")
+            lineas.append(f"{metrica}_count{{{labels}}} {total}")
+        return "\n".join(lineas) + "\n"
+
+    def exportar_prometheus(self, ruta, prefijo="huerta_tareas"):
+        """Escribe el archivo de una vez (rename atomico, como espera el textfile collector)"""
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus(prefijo))
+        os.replace(temporal, ruta)
+
+    def limpiar(self):
+        with self._lock:
+            self._duraciones.clear()
+            self._totales.clear()
+
+
+class _Consulta:
+    """Constructor de consulta de postgrest; execute() se mide"""
+
+    def __init__(self, consulta, metricas, tabla, operacion=None):
+        self._consulta = consulta
+        self._metricas = metricas
+        self._tabla = tabla
+        self._operacion = operacion
+
+    def _envolver(self, valor, operacion):
+        return _Consulta(valor, self._metricas, self._tabla, operacion) if hasattr(valor, 'execute') else valor
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self._consulta, nombre)
+        operacion = self._operacion or (nombre if nombre in OPERACIONES else None)
+        if not callable(atributo):
+            return self._envolver(atributo, operacion)
+
+        def llamar(*args, **kwargs):
+            return self._envolver(atributo(*args, **kwargs), operacion)
+        return llamar
+
+    def execute(self):
+        with self._metricas.span('supabase', f"{self._tabla}.{self._operacion or 'consulta'}"):
+            return self._consulta.execute()
+
+
+class ClienteInstrumentado:
+    """Mismo uso que el cliente de Supabase; .table() devuelve consultas medidas"""
+
+    def __init__(self, cliente, metricas):
+        self._cliente = cliente
+        self._metricas = metricas
+
+    def table(self, nombre):
+        return _Consulta(self._cliente.table(nombre), self._metricas, nombre)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cliente, nombre)
@@ -0,0 +1,49 @@
+"""
+Tablero Kanban paginado
+=======================
+Cada columna muestra una ventana fija de tarjetas ("ver mas" agranda la
+ventana), asi el numero de elementos de Streamlit por rerun no depende
+del total de tareas:
+
+- ventana(): primeras tarjetas de una columna y cuantas quedan
+- TarjetasKanban: HTML de cada tarjeta cacheado por version de la tarea
+  (updated_at y campos que muestra) y contexto (dia, dependencias
+  pendientes); solo se arma de nuevo la tarjeta que cambio
+"""
+
+TARJETAS_POR_PAGINA = 20
+
+# Campos que muestra la tarjeta: parte de la version aunque haya updated_at
+# (una copia en sesion puede cambiar sin que se le actualice la marca)
+CAMPOS_TARJETA = ("tarea", "categoria", "responsable", "fecha_objetivo", "estado", "prioridad")
+
+
+def ventana(tareas, limite=TARJETAS_POR_PAGINA):
+    """(primeras `limite` tareas, cuantas quedan fuera)"""
+    return tareas[:limite], max(0, len(tareas) - limite)
+
+
+class TarjetasKanban:
+    """Cache {tarea_id: (version, html)} que vive en la sesion"""
+
+    def __init__(self):
+        self._html = {}
+
+    def version(self, tarea):
+        return (tarea.get('updated_at'), *(tarea.get(c) for c in CAMPOS_TARJETA))
+
+    def obtener(self, tarea, construir, *contexto):
+        """HTML de la tarjeta; construir(tarea, *contexto) solo si cambio la version o el contexto"""
+        clave = (self.version(tarea), tarea.get('estado'), contexto)
+        guardada = self._html.get(tarea['id'])
+        if guardada is None or guardada[0] != clave:
+            guardada = (clave, construir(tarea, *contexto))
+            self._html[tarea['id']] = guardada
+        return guardada[1]
+
+    def columna(self, tareas, construir, *contexto):
+        """HTML de varias tarjetas en un solo bloque (columnas sin botones por tarjeta)"""
+        return "".join(self.obtener(t, construir, *contexto) for t in tareas)
+
+    def limpiar(self):
+        self._html.clear()
@@ -0,0 +1,133 @@
+"""
+Programacion de tareas con nivelacion de recursos
+=================================================
+Calcula inicio y fin de cada tarea no finalizada:
+
+- Una tarea empieza despues de que terminan sus dependencias, no antes de
+  hoy ni de su fecha_inicio (si la tiene)
+- Cada responsable hace una tarea a la vez segun su capacidad
+  (equipo[].capacidad, fraccion de jornada: 0.5 = medio tiempo, una tarea
+  de 2 dias ocupa 4 dias de calendario). Capacidad 2 o mas = cuadrilla
+  con floor(capacidad) tareas en paralelo (2.5 = dos frentes a 1.25)
+- List scheduling con colas de prioridad: cuando un responsable queda
+  libre toma, entre sus tareas ya liberadas, la de mayor prioridad
+  (empates por fecha objetivo y orden original). O((n + e) log n)
+- 'sin_asignar' y 'contratistas' (cuadrilla externa sin tamano fijo) no
+  se nivelan; las tareas finalizadas no ocupan capacidad
+"""
+
+import heapq
+import math
+from datetime import timedelta
+
+from .coleccion import parsear_fecha
+
+DURACION_DEFAULT = 1
+CAPACIDAD_DEFAULT = 1.0
+SIN_NIVELAR = {'sin_asignar', 'contratistas'}
+ORDEN_PRIORIDAD = {'urgente': 0, 'alta': 1, 'media': 2, 'baja': 3}
+
+
+def duracion(tarea):
+    """Dias de trabajo: duracion_dias, o el rango fecha_inicio..fecha_objetivo"""
+    if tarea.get('duracion_dias'):
+        return max(int(tarea['duracion_dias']), 1)
+    inicio = parsear_fecha(tarea.get('fecha_inicio'))
+    fin = parsear_fecha(tarea.get('fecha_objetivo'))
+    if inicio and fin and fin >= inicio:
+        return (fin - inicio).days + 1
+    return DURACION_DEFAULT
+
+
+def programar(coleccion, hoy):
+    """
+    {tarea_id: {'inicio', 'fin', 'dias', 'atraso'}} de las tareas no
+    finalizadas. fin es inclusivo; atraso son los dias de fin despues de
+    fecha_objetivo. ValueError si hay dependencias circulares.
+
+    Eventos en orden de fecha: cada responsable tiene una cola de tareas
+    que esperan su fecha de liberacion y otra de tareas ya liberadas
+    (ordenadas por prioridad); cuando queda libre toma la primera.
+    """
+    capacidad = {r: float(e.get('capacidad') or CAPACIDAD_DEFAULT) for r, e in coleccion.equipo.items()}
+    frentes = {r: max(1, math.floor(c)) for r, c in capacidad.items()}
+    pendientes = {i: t for i, t in coleccion.por_id.items() if t.get('estado') != 'finalizado'}
+    faltan = {i: sum(1 for d in t.get('dependencias') or [] if d in pendientes)
+              for i, t in pendientes.items()}
+    liberacion = {}
+    for i, t in pendientes.items():
+        fecha_inicio = parsear_fecha(t.get('fecha_inicio'))
+        liberacion[i] = max(hoy, fecha_inicio) if fecha_inicio else hoy
+
+    libre = {}      # responsable -> heap con el primer dia disponible de cada frente
+    esperando = {}  # responsable -> heap (liberacion, i)
+    listas = {}     # responsable -> heap (prioridad, fecha objetivo, posicion, i)
+    eventos = []    # heap (fecha, responsable)
+    programa = {}
+
+    def asignar(i, inicio):
+        t = pendientes[i]
+        resp = t.get('responsable')
+        dias = duracion(t)
+        if resp in SIN_NIVELAR:
+            dias_calendario = dias
+        else:
+            ritmo = capacidad.get(resp, CAPACIDAD_DEFAULT) / frentes.get(resp, 1)
+            dias_calendario = math.ceil(dias / ritmo)
+        fin = inicio + timedelta(days=dias_calendario - 1)
+        objetivo = parsear_fecha(t.get('fecha_objetivo'))
+        programa[i] = {'inicio': inicio, 'fin': fin, 'dias': dias,
+                       'atraso': max(0, (fin - objetivo).days) if objetivo else 0}
+        for s in coleccion.bloquea_a.get(i, []):
+            if s in faltan:
+                liberacion[s] = max(liberacion[s], fin + timedelta(days=1))
+                faltan[s] -= 1
+                if faltan[s] == 0:
+                    encolar(s)
+        return fin
+
+    def encolar(i):
+        resp = pendientes[i].get('responsable')
+        if resp in SIN_NIVELAR:
+            asignar(i, liberacion[i])
+            return
+        heapq.heappush(esperando.setdefault(resp, []), (liberacion[i], coleccion.posicion[i], i))
+        heapq.heappush(eventos, (max(liberacion[i], primer_libre(resp)), str(resp)))
+
+    def primer_libre(resp):
+        if resp not in libre:
+            libre[resp] = [hoy] * frentes.get(resp, 1)
+        return libre[resp][0]
+
+    por_texto = {str(r): r for r in {t.get('responsable') for t in pendientes.values()}}
+    # Lista fija antes de encolar: asignar una tarea sin_asignar ya libera a sus sucesoras
+    for i in sorted((i for i in pendientes if faltan[i] == 0), key=coleccion.posicion.__getitem__):
+        encolar(i)
+
+    while eventos:
+        fecha, clave_resp = heapq.heappop(eventos)
+        resp = por_texto[clave_resp]
+        if fecha < primer_libre(resp):
+            continue  # todos los frentes del responsable ya tenian tarea en esa fecha
+        cola_espera = esperando.get(resp, [])
+        cola_lista = listas.setdefault(resp, [])
+        while cola_espera and cola_espera[0][0] <= fecha:
+            _, posicion, i = heapq.heappop(cola_espera)
+            t = pendientes[i]
+            heapq.heappush(cola_lista, (ORDEN_PRIORIDAD.get(t.get('prioridad'), 2),
+                                        str(t.get('fecha_objetivo') or '9999'), posicion, i))
+        if not cola_lista:
+            continue
+        i = heapq.heappop(cola_lista)[-1]
+        heapq.heapreplace(libre[resp], asignar(i, fecha) + timedelta(days=1))
+        if cola_lista or cola_espera:
+            # Con otro frente libre la siguiente tarea puede empezar el mismo dia
+            siguiente = max(fecha, libre[resp][0])
+            if not cola_lista:
+                siguiente = max(siguiente, cola_espera[0][0])
+            heapq.heappush(eventos, (siguiente, clave_resp))
+
+    if len(programa) != len(pendientes):
+        ciclo = sorted(str(i) for i in pendientes if i not in programa)
+        raise ValueError(f"Dependencias circulares entre las tareas {ciclo}")
+    return programa
@@ -0,0 +1,43 @@
+"""
+Conteos de la pagina Resumen
+============================
+Todo lo que muestra el Resumen (KPIs, dona por estado, barras por
+responsable o categoria, semaforo por categoria) sale de una sola pasada
+por las tareas filtradas, en vez de una lista por KPI y un recorrido de
+todas las tareas por cada categoria.
+"""
+
+from collections import Counter
+
+import pandas as pd
+
+
+def resumen_conteos(tareas, vencidas):
+    """
+    {'total', 'por_estado': {estado: n}, 'vencidas': n,
+     'por_categoria': {categoria: {'total', 'finalizadas', 'vencidas'}}}
+
+    por_estado y por_categoria conservan el orden de aparicion.
+    """
+    por_estado = {}
+    por_categoria = {}
+    n_vencidas = 0
+    for t in tareas:
+        por_estado[t.get('estado')] = por_estado.get(t.get('estado'), 0) + 1
+        cat = por_categoria.setdefault(t.get('categoria'), {'total': 0, 'finalizadas': 0, 'vencidas': 0})
+        cat['total'] += 1
+        if t.get('estado') == 'finalizado':
+            cat['finalizadas'] += 1
+        if t['id'] in vencidas:
+            cat['vencidas'] += 1
+            n_vencidas += 1
+    return {'total': len(tareas), 'por_estado': por_estado, 'vencidas': n_vencidas,
+            'por_categoria': por_categoria}
+
+
+def conteo_por_estado(tareas, etiqueta, nombre_estado, columna):
+    """DataFrame [columna, 'Estado', 'Tareas'] ordenado como un groupby"""
+    conteo = Counter((etiqueta(t), nombre_estado(t.get('estado'))) for t in tareas)
+    claves = sorted(conteo, key=lambda c: (str(c[0]), str(c[1])))
+    filas = [(grupo, estado, conteo[(grupo, estado)]) for grupo, estado in claves]
+    return pd.DataFrame(filas, columns=[columna, 'Estado', 'Tareas'])
@@ -0,0 +1,269 @@
+"""
+Sincronizacion incremental JSON <-> Supabase
+============================================
+Compara las dos copias de las tareas contra la ultima sincronizacion
+(data/sync_supabase.json: marca de agua + huella por id):
+
+- Cambio solo en un lado -> se copia al otro
+- Cambio en los dos lados -> politica: "reciente" (gana el updated_at
+  mayor), "local" o "remoto"
+- Fila que falta en un lado: si el otro no cambio desde la ultima vez se
+  borra (solo con borrar=True), si no se vuelve a copiar
+- Del remoto solo se leen completas las filas con updated_at posterior a
+  la marca de agua; el resto basta con id + updated_at
+- Escrituras en lotes; sin diferencias no se escribe nada (ni el estado)
+- Catalogos y metadata solo van del JSON a Supabase, y solo las filas
+  distintas (la metadata se actualiza en su fila, no se borra)
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+
+CAMPOS_TAREA = ["categoria", "tarea", "fecha_objetivo", "fecha_inicio", "duracion_dias", "estado",
+                "responsable", "prioridad", "dependencias", "notas"]
+POLITICAS = ("reciente", "local", "remoto")
+TAMANO_LOTE = 100
+
+
+def id_texto(valor):
+    return str(valor)
+
+
+def id_local(valor):
+    """Ids de Supabase (TEXT) -> int si son numericos, como en el JSON"""
+    return int(valor) if isinstance(valor, str) and valor.isdigit() else valor
+
+
+def normalizar(tarea):
+    """Solo los campos sincronizados, con tipos comparables entre los dos lados"""
+    fila = {c: tarea.get(c) for c in CAMPOS_TAREA}
+    fila['dependencias'] = [id_texto(d) for d in (tarea.get('dependencias') or [])]
+    for campo in ('fecha_objetivo', 'fecha_inicio'):
+        fila[campo] = str(fila[campo])[:10] if fila[campo] else None
+    fila['duracion_dias'] = int(fila['duracion_dias']) if fila['duracion_dias'] else None
+    fila['notas'] = fila['notas'] or ""
+    return fila
+
+
+def huella(tarea):
+    texto = json.dumps(normalizar(tarea), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+def _instante(texto):
+    """updated_at -> datetime con zona (las fechas sin zona se toman como hora local)"""
+    if not texto:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    fecha = datetime.fromisoformat(str(texto).replace('Z', '+00:00'))
+    return fecha if fecha.tzinfo else fecha.astimezone()
+
+
+# ============================================================
+# PLAN
+# ============================================================
+
+def planificar(locales, remotas, base, politica="reciente", borrar=False):
+    """
+    Decide que mover sin escribir nada.
+
+    locales / remotas: {id_texto: tarea}; en remotas basta con 'huella' y
+    'updated_at' para las filas no leidas completas.
+    base: {id_texto: huella en la ultima sincronizacion}.
+
+    Retorna dict de listas de ids: subir, bajar, borrar_local,
+    borrar_remoto, conflictos (los conflictos ya estan en subir o bajar).
+    """
+    if politica not in POLITICAS:
+        raise ValueError(f"Politica desconocida: {politica} (usar {', '.join(POLITICAS)})")
+    plan = {'subir': [], 'bajar': [], 'borrar_local': [], 'borrar_remoto': [], 'conflictos': []}
+
+    for i in sorted(set(locales) | set(remotas), key=str):
+        local, remota = locales.get(i), remotas.get(i)
+        h_local = huella(local) if local else None
+        h_remota = remota.get('huella') or huella(remota) if remota else None
+        h_base = base.get(i)
+
+        if h_local == h_remota:
+            continue
+        cambio_local = h_local != h_base
+        cambio_remoto = h_remota != h_base
+
+        if local is None or remota is None:
+            lado = 'remoto' if local is None else 'local'
+            otro_cambio = cambio_remoto if lado == 'remoto' else cambio_local
+            if h_base is not None and not otro_cambio and borrar:
+                plan['borrar_remoto' if lado == 'remoto' else 'borrar_local'].append(i)
+            else:
+                plan['bajar' if lado == 'remoto' else 'subir'].append(i)
+            continue
+
+        if cambio_local and not cambio_remoto:
+            plan['subir'].append(i)
+        elif cambio_remoto and not cambio_local:
+            plan['bajar'].append(i)
+        else:
+            plan['conflictos'].append(i)
+            if politica == "local":
+                gana_local = True
+            elif politica == "remoto":
+                gana_local = False
+            else:
+                gana_local = _instante(local.get('updated_at')) >= _instante(remota.get('updated_at'))
+            plan['subir' if gana_local else 'bajar'].append(i)
+    return plan
+
+
+# ============================================================
+# ESTADO (MARCA DE AGUA)
+# ============================================================
+
+def cargar_estado(ruta):
+    if not ruta.exists():
+        return {'marca_agua': None, 'huellas': {}}
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_estado(ruta, estado):
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ruta.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, ensure_ascii=False, indent=2)
+    tmp.replace(ruta)
+
+
+# ============================================================
+# EJECUCION
+# ============================================================
+
+def _lotes(filas, tamano):
+    for inicio in range(0, len(filas), tamano):
+        yield filas[inicio:inicio + tamano]
+
+
+def leer_remotas(cliente, estado):
+    """
+    {id_texto: fila} del remoto leyendo completas solo las filas nuevas o
+    modificadas despues de la marca de agua.
+    """
+    indice = cliente.table('tareas').select('id, updated_at').execute().data
+    consulta = cliente.table('tareas').select('*')
+    if estado.get('marca_agua'):
+        consulta = consulta.gt('updated_at', estado['marca_agua'])
+    completas = {id_texto(f['id']): f for f in consulta.execute().data}
+
+    remotas = {}
+    faltantes = []
+    for fila in indice:
+        i = id_texto(fila['id'])
+        if i in completas:
+            remotas[i] = completas[i]
+        elif i in estado['huellas']:
+            # Sin cambios desde la ultima sincronizacion: vale la huella guardada
+            remotas[i] = {'id': fila['id'], 'updated_at': fila['updated_at'], 'huella': estado['huellas'][i]}
+        else:
+            faltantes.append(fila['id'])
+    remotas.update(leer_completas(cliente, faltantes))
+    return remotas
+
+
+def leer_completas(cliente, ids, tamano_lote=TAMANO_LOTE):
+    filas = {}
+    for lote in _lotes(list(ids), tamano_lote):
+        for fila in cliente.table('tareas').select('*').in_('id', lote).execute().data:
+            filas[id_texto(fila['id'])] = fila
+    return filas
+
+
+def sincronizar_catalogos(datos, cliente, tamano_lote=TAMANO_LOTE):
+    """
+    Equipo, estados, categorias y metadata del JSON hacia Supabase, solo
+    las filas distintas (la metadata se actualiza, nunca se borra).
+    """
+    escrituras = 0
+    catalogos = {
+        'equipo': [{'id': e['id'], 'nombre': e['nombre'], 'rol': e.get('rol', ''), 'capacidad': e.get('capacidad', 1)}
+                   for e in datos['equipo']],
+        'estados': [{'id': e['id'], 'nombre': e['nombre'], 'color': e['color'],
+                     'descripcion': e.get('descripcion', ''), 'orden': i} for i, e in enumerate(datos['estados'])],
+        'categorias': [{'id': c['id'], 'nombre': c['nombre'], 'icono': c['icono']} for c in datos['categorias']],
+    }
+    for tabla, filas in catalogos.items():
+        remotas = {f['id']: f for f in cliente.table(tabla).select('*').execute().data}
+        distintas = [f for f in filas
+                     if any(remotas.get(f['id'], {}).get(k) != v for k, v in f.items())]
+        for lote in _lotes(distintas, tamano_lote):
+            cliente.table(tabla).upsert(lote).execute()
+            escrituras += 1
+
+    campos = ['proyecto', 'finca', 'ubicacion', 'fecha_inicio_obra', 'fecha_limite_compras', 'ventana_critica']
+    meta = {c: datos['metadata'][c] for c in campos if datos['metadata'].get(c) is not None}
+    actual = cliente.table('metadata').select('*').limit(1).execute().data
+    if not actual:
+        cliente.table('metadata').insert(meta).execute()
+        escrituras += 1
+    elif any(str(actual[0].get(c))[:10 if c.startswith('fecha') else None] != str(v) for c, v in meta.items()):
+        cliente.table('metadata').update(meta).eq('id', actual[0]['id']).execute()
+        escrituras += 1
+    return escrituras
+
+
+def sincronizar(backend_json, cliente, ruta_estado, politica="reciente", borrar=False,
+                tamano_lote=TAMANO_LOTE, simular=False):
+    """
+    Una pasada de sincronizacion. Retorna (plan, escrituras) donde
+    escrituras cuenta llamadas de escritura a Supabase + al archivo JSON.
+    """
+    estado = cargar_estado(ruta_estado)
+    datos = backend_json.cargar()
+    locales = {id_texto(t['id']): t for t in datos['tareas']}
+    # La marca de agua es el inicio de la lectura: lo escrito despues se relee la proxima vez
+    ahora = datetime.now(timezone.utc).isoformat()
+    remotas = leer_remotas(cliente, estado)
+    plan = planificar(locales, remotas, estado['huellas'], politica, borrar)
+    if simular:
+        return plan, 0
+
+    escrituras = sincronizar_catalogos(datos, cliente, tamano_lote)
+    # Filas a bajar que solo se conocian por su huella
+    remotas.update(leer_completas(cliente, [remotas[i]['id'] for i in plan['bajar'] if 'huella' in remotas[i]],
+                                  tamano_lote))
+
+    # Local -> Supabase
+    subir = [{'id': i, **normalizar(locales[i]), 'updated_at': locales[i].get('updated_at') or ahora}
+             for i in plan['subir']]
+    for lote in _lotes(subir, tamano_lote):
+        cliente.table('tareas').upsert(lote).execute()
+        escrituras += 1
+    for lote in _lotes(plan['borrar_remoto'], tamano_lote):
+        cliente.table('tareas').delete().in_('id', lote).execute()
+        escrituras += 1
+
+    # Supabase -> JSON (una sola escritura del archivo)
+    if plan['bajar'] or plan['borrar_local']:
+        por_id = {id_texto(t['id']): t for t in datos['tareas']}
+        for i in plan['bajar']:
+            remota = remotas[i]
+            fila = normalizar(remota)
+            fila['dependencias'] = [id_local(d) for d in fila['dependencias']]
+            # Campos vacios en Supabase = sin la clave en el JSON (como las tareas escritas a mano)
+            vacios = [c for c, v in fila.items() if v is None]
+            fila = {c: v for c, v in fila.items() if v is not None}
+            if i in por_id:
+                for campo in vacios:
+                    por_id[i].pop(campo, None)
+                por_id[i].update(fila)
+                por_id[i]['updated_at'] = remota.get('updated_at')
+            else:
+                datos['tareas'].append({'id': id_local(i), **fila, 'updated_at': remota.get('updated_at')})
+        borrar_ids = set(plan['borrar_local'])
+        datos['tareas'] = [t for t in datos['tareas'] if id_texto(t['id']) not in borrar_ids]
+        backend_json.guardar(datos)
+        escrituras += 1
+
+    cambios = any(plan[k] for k in ('subir', 'bajar', 'borrar_local', 'borrar_remoto'))
+    if cambios:
+        huellas = {id_texto(t['id']): huella(t) for t in datos['tareas']}
+        guardar_estado(ruta_estado, {'marca_agua': ahora, 'huellas': huellas})
+    return plan, escrituras
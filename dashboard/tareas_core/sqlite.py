@@ -0,0 +1,243 @@
+"""
+Backend SQLite embebido
+=======================
+Mismo esquema que scripts/supabase_schema.sql (incluidos los indices por
+estado, responsable, categoria y fecha) en un archivo local:
+
+- Modo WAL: varias sesiones de Streamlit leen mientras otra escribe
+- actualizar_tarea() escribe una sola fila (no reescribe todo el JSON)
+- importar_json() carga data/tareas_proyecto.json una vez
+- Las dependencias se guardan como texto JSON (TEXT[] en Supabase); los
+  ids numericos vuelven como int para que la app JSON no note el cambio
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS equipo (
+    id TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    rol TEXT,
+    capacidad REAL DEFAULT 1,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS estados (
+    id TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    color TEXT DEFAULT '#6c757d',
+    descripcion TEXT,
+    orden INT DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS categorias (
+    id TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    icono TEXT DEFAULT '📌'
+);
+
+CREATE TABLE IF NOT EXISTS metadata (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    proyecto TEXT NOT NULL,
+    finca TEXT,
+    ubicacion TEXT,
+    fecha_inicio_obra TEXT,
+    fecha_limite_compras TEXT,
+    ventana_critica TEXT,
+    ultima_modificacion TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS tareas (
+    id TEXT PRIMARY KEY,
+    categoria TEXT REFERENCES categorias(id),
+    tarea TEXT NOT NULL,
+    fecha_objetivo TEXT,
+    fecha_inicio TEXT,
+    duracion_dias INTEGER,
+    estado TEXT REFERENCES estados(id) DEFAULT 'por_iniciar',
+    responsable TEXT REFERENCES equipo(id) DEFAULT 'sin_asignar',
+    prioridad TEXT DEFAULT 'media',
+    dependencias TEXT,
+    notas TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_tareas_estado ON tareas(estado);
+CREATE INDEX IF NOT EXISTS idx_tareas_responsable ON tareas(responsable);
+CREATE INDEX IF NOT EXISTS idx_tareas_categoria ON tareas(categoria);
+CREATE INDEX IF NOT EXISTS idx_tareas_fecha ON tareas(fecha_objetivo);
+"""
+
+COLUMNAS_TAREA = ["id", "categoria", "tarea", "fecha_objetivo", "fecha_inicio", "duracion_dias",
+                  "estado", "responsable", "prioridad", "dependencias", "notas", "created_at", "updated_at"]
+
+# Columnas agregadas despues de la primera version: (tabla, columna, tipo)
+MIGRACIONES = [
+    ("equipo", "capacidad", "REAL DEFAULT 1"),
+    ("tareas", "fecha_inicio", "TEXT"),
+    ("tareas", "duracion_dias", "INTEGER"),
+]
+COLUMNAS_METADATA = ["proyecto", "finca", "ubicacion", "fecha_inicio_obra",
+                     "fecha_limite_compras", "ventana_critica", "ultima_modificacion"]
+
+
+def _a_texto(valor):
+    return None if valor is None else str(valor)
+
+
+def _desde_texto(valor):
+    """'11' -> 11 (ids numericos del JSON original); el resto queda igual"""
+    return int(valor) if isinstance(valor, str) and valor.isdigit() else valor
+
+
+def _ahora():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class BackendSQLite:
+    """data/tareas_proyecto.db con la misma interfaz que BackendJSON"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(ESQUEMA)
+            for tabla, columna, tipo in MIGRACIONES:
+                existentes = {f['name'] for f in con.execute(f"PRAGMA table_info({tabla})")}
+                if columna not in existentes:
+                    con.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
+
+    @contextmanager
+    def _conectar(self):
+        """Conexion corta por operacion (segura entre hilos/sesiones); commit al salir"""
+        con = sqlite3.connect(self.ruta, timeout=10)
+        con.row_factory = sqlite3.Row
+        con.execute("PRAGMA busy_timeout=10000")
+        con.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def vacio(self):
+        with self._conectar() as con:
+            return con.execute("SELECT COUNT(*) FROM tareas").fetchone()[0] == 0
+
+    # -------------------- lectura --------------------
+
+    def _tarea_desde_fila(self, fila):
+        tarea = dict(fila)
+        tarea['id'] = _desde_texto(tarea['id'])
+        tarea['dependencias'] = [_desde_texto(str(d)) for d in json.loads(tarea['dependencias'] or "[]")]
+        tarea['notas'] = tarea['notas'] or ""
+        return tarea
+
+    def cargar(self):
+        with self._conectar() as con:
+            metadata = con.execute("SELECT * FROM metadata ORDER BY id DESC LIMIT 1").fetchone()
+            return {
+                'metadata': {k: v for k, v in dict(metadata).items() if k != 'id'} if metadata else {},
+                'equipo': [dict(f) for f in con.execute("SELECT id, nombre, rol, capacidad FROM equipo ORDER BY rowid")],
+                'estados': [dict(f) for f in con.execute("SELECT * FROM estados ORDER BY orden")],
+                'categorias': [dict(f) for f in con.execute("SELECT * FROM categorias ORDER BY rowid")],
+                'tareas': [self._tarea_desde_fila(f) for f in
+                           con.execute("SELECT * FROM tareas ORDER BY rowid")],
+            }
+
+    def tareas_donde(self, **filtros):
+        """Tareas filtradas en SQL (usa los indices del esquema)"""
+        condiciones = " AND ".join(f"{campo} = ?" for campo in filtros)
+        sql = "SELECT * FROM tareas" + (f" WHERE {condiciones}" if condiciones else "")
+        with self._conectar() as con:
+            filas = con.execute(sql + " ORDER BY fecha_objetivo", [_a_texto(v) for v in filtros.values()])
+            return [self._tarea_desde_fila(f) for f in filas]
+
+    # -------------------- escritura --------------------
+
+    def _fila_tarea(self, tarea):
+        fila = {c: tarea.get(c) for c in COLUMNAS_TAREA if c in tarea}
+        fila['id'] = _a_texto(tarea['id'])
+        if 'dependencias' in tarea:
+            fila['dependencias'] = json.dumps([_a_texto(d) for d in tarea.get('dependencias') or []])
+        return fila
+
+    def _tocar_metadata(self, con):
+        con.execute("UPDATE metadata SET ultima_modificacion = ? "
+                    "WHERE id = (SELECT MAX(id) FROM metadata)", (_ahora(),))
+
+    def actualizar_tarea(self, tarea_id, cambios):
+        fila = {k: v for k, v in self._fila_tarea({**cambios, 'id': tarea_id}).items() if k != 'id'}
+        fila['updated_at'] = _ahora()
+        asignaciones = ", ".join(f"{c} = ?" for c in fila)
+        with self._conectar() as con:
+            cursor = con.execute(f"UPDATE tareas SET {asignaciones} WHERE id = ?",
+                                 [*fila.values(), _a_texto(tarea_id)])
+            if cursor.rowcount == 0:
+                raise KeyError(f"No existe la tarea {tarea_id}")
+            self._tocar_metadata(con)
+        return {**cambios, 'updated_at': fila['updated_at']}
+
+    def crear_tarea(self, tarea):
+        with self._conectar() as con:
+            if 'id' not in tarea:
+                maximo = con.execute("SELECT MAX(CAST(id AS INTEGER)) FROM tareas").fetchone()[0]
+                tarea = {**tarea, 'id': (maximo or 0) + 1}
+            fila = self._fila_tarea(tarea)
+            fila['created_at'] = fila['updated_at'] = _ahora()
+            con.execute(f"INSERT INTO tareas ({', '.join(fila)}) VALUES ({', '.join('?' * len(fila))})",
+                        list(fila.values()))
+            self._tocar_metadata(con)
+        return tarea
+
+    def guardar(self, datos):
+        """Reemplaza todo el contenido (equivale a BackendJSON.guardar)"""
+        datos['metadata']['ultima_modificacion'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+        self.importar(datos)
+
+    # -------------------- importacion --------------------
+
+    def importar(self, datos):
+        """Carga catalogos, metadata y tareas en una sola transaccion (upsert)"""
+        with self._conectar() as con:
+            con.executemany("INSERT OR REPLACE INTO equipo (id, nombre, rol, capacidad) VALUES (?, ?, ?, ?)",
+                            [(e['id'], e['nombre'], e.get('rol', ''), e.get('capacidad', 1))
+                             for e in datos['equipo']])
+            con.executemany("INSERT OR REPLACE INTO estados (id, nombre, color, descripcion, orden) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            [(e['id'], e['nombre'], e.get('color', '#6c757d'), e.get('descripcion', ''), i)
+                             for i, e in enumerate(datos['estados'])])
+            con.executemany("INSERT OR REPLACE INTO categorias (id, nombre, icono) VALUES (?, ?, ?)",
+                            [(c['id'], c['nombre'], c.get('icono', '📌')) for c in datos['categorias']])
+
+            meta = datos.get('metadata', {})
+            con.execute("DELETE FROM metadata")
+            con.execute(f"INSERT INTO metadata ({', '.join(COLUMNAS_METADATA)}) VALUES "
+                        f"({', '.join('?' * len(COLUMNAS_METADATA))})",
+                        [meta.get(c, '' if c != 'ultima_modificacion' else _ahora()) for c in COLUMNAS_METADATA])
+
+            filas = [self._fila_tarea(t) for t in datos['tareas']]
+            ahora = _ahora()
+            columnas = [c for c in COLUMNAS_TAREA if c not in ('created_at', 'updated_at')]
+            # Tareas que ya no estan en el origen
+            con.execute("CREATE TEMP TABLE ids_origen (id TEXT PRIMARY KEY)")
+            con.executemany("INSERT OR IGNORE INTO ids_origen VALUES (?)", [(f['id'],) for f in filas])
+            con.execute("DELETE FROM tareas WHERE id NOT IN (SELECT id FROM ids_origen)")
+            con.executemany(
+                f"INSERT INTO tareas ({', '.join(columnas)}, created_at, updated_at) "
+                f"VALUES ({', '.join('?' * len(columnas))}, ?, ?) "
+                f"ON CONFLICT(id) DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in columnas if c != 'id')
+                + ", updated_at = excluded.updated_at"
+                # Filas iguales no se tocan: reimportar el mismo JSON no cambia updated_at
+                + " WHERE " + " OR ".join(f"tareas.{c} IS NOT excluded.{c}" for c in columnas if c != 'id'),
+                [[f.get(c) for c in columnas] + [ahora, ahora] for f in filas])
+        return len(filas)
+
+    def importar_json(self, ruta_json):
+        with open(ruta_json, 'r', encoding='utf-8') as f:
+            return self.importar(json.load(f))
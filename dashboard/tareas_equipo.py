@@ -5,10 +5,16 @@ Huerta Inteligente LPET - Finca La Palma y El Tucan
 
 import streamlit as st
 import json
-import pandas as pd
+import os
 from datetime import datetime, date
 from pathlib import Path
 
+from tareas_core import BackendJSON, BackendSQLite, ColeccionTareas
+from tareas_core.kanban import TARJETAS_POR_PAGINA, TarjetasKanban, ventana
+
+# pandas y compras_materiales (que lo usa) se importan en las paginas que
+# los necesitan: el arranque en frio no los carga (ver benchmarks/importacion.py)
+
 # Configuracion de la pagina
 st.set_page_config(
     page_title="Tareas - Huerta LPET",
@@ -20,56 +26,41 @@ st.set_page_config(
 # Rutas de archivos
 BASE_DIR = Path(__file__).parent.parent
 DATA_PATH = BASE_DIR / "data" / "tareas_proyecto.json"
+DB_PATH = BASE_DIR / "data" / "tareas_proyecto.db"
+CONFIG_HUERTA_PATH = BASE_DIR / "config" / "huerta_config.json"
+
+# Almacenamiento: "json" (por defecto) o "sqlite" (despliegue local con varias sesiones)
+TAREAS_BACKEND = os.getenv("TAREAS_BACKEND", "json")
+
+@st.cache_resource
+def get_backend_sqlite():
+    backend = BackendSQLite(DB_PATH)
+    if backend.vacio() and DATA_PATH.exists():
+        backend.importar_json(DATA_PATH)
+    return backend
+
+backend = get_backend_sqlite() if TAREAS_BACKEND == "sqlite" else BackendJSON(DATA_PATH)
 
 # Funciones de carga y guardado
 def cargar_datos():
-    """Carga los datos del archivo JSON"""
+    """Carga los datos del backend configurado"""
     try:
-        with open(DATA_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return backend.cargar()
     except FileNotFoundError:
         st.error(f"No se encontro el archivo: {DATA_PATH}")
         return None
 
-def guardar_datos(datos):
-    """Guarda los datos al archivo JSON"""
+def guardar_tarea(tarea_id, cambios):
+    """Guarda los cambios de una tarea (una fila en SQLite) y la reindexa en la coleccion"""
+    guardada = backend.actualizar_tarea(tarea_id, dict(cambios))
+    # Con el updated_at que puso el backend: el Kanban cachea las tarjetas por version
+    coleccion.actualizar(tarea_id, {**cambios, 'updated_at': guardada['updated_at']})
     datos['metadata']['ultima_modificacion'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-    with open(DATA_PATH, 'w', encoding='utf-8') as f:
-        json.dump(datos, f, ensure_ascii=False, indent=2)
-    # Actualizar session_state con los datos nuevos
-    st.session_state['datos'] = datos
-
-def get_estado_color(estado_id, estados):
-    """Obtiene el color de un estado"""
-    for e in estados:
-        if e['id'] == estado_id:
-            return e['color']
-    return '#6c757d'
-
-def get_estado_nombre(estado_id, estados):
-    """Obtiene el nombre de un estado"""
-    for e in estados:
-        if e['id'] == estado_id:
-            return e['nombre']
-    return estado_id
-
-def get_responsable_nombre(resp_id, equipo):
-    """Obtiene el nombre de un responsable"""
-    for e in equipo:
-        if e['id'] == resp_id:
-            return e['nombre']
-    return resp_id
-
-def get_categoria_info(cat_id, categorias):
-    """Obtiene info de una categoria"""
-    for c in categorias:
-        if c['id'] == cat_id:
-            return c
-    return {'nombre': cat_id, 'icono': '📌'}
 
 # Cargar datos usando session_state para persistencia durante edicion
 if 'datos' not in st.session_state or st.session_state.get('recargar', False):
     st.session_state['datos'] = cargar_datos()
+    st.session_state.pop('coleccion', None)
     st.session_state['recargar'] = False
 
 datos = st.session_state['datos']
@@ -77,6 +68,16 @@ datos = st.session_state['datos']
 if datos is None:
     st.stop()
 
+# Indices de tareas y catalogos: se construyen una vez por version de los datos
+if 'coleccion' not in st.session_state:
+    st.session_state['coleccion'] = ColeccionTareas(datos)
+coleccion = st.session_state['coleccion']
+
+get_estado_color = coleccion.estado_color
+get_estado_nombre = coleccion.estado_nombre
+get_responsable_nombre = coleccion.responsable_nombre
+get_categoria_info = coleccion.categoria_info
+
 # CSS personalizado
 st.markdown("""
 <style>
@@ -165,39 +166,28 @@ filtro_prioridad = st.sidebar.selectbox(
     index=0
 )
 
-# Aplicar filtros
-tareas_filtradas = datos['tareas'].copy()
-
-if filtro_responsable != "Todos":
-    resp_id = next((e['id'] for e in datos['equipo'] if e['nombre'] == filtro_responsable), None)
-    if resp_id:
-        tareas_filtradas = [t for t in tareas_filtradas if t['responsable'] == resp_id]
-
-if filtro_categoria != "Todas":
-    cat_nombre = filtro_categoria.split(' ', 1)[1] if ' ' in filtro_categoria else filtro_categoria
-    cat_id = next((c['id'] for c in datos['categorias'] if c['nombre'] == cat_nombre), None)
-    if cat_id:
-        tareas_filtradas = [t for t in tareas_filtradas if t['categoria'] == cat_id]
-
-if filtro_estado != "Todos":
-    estado_id = next((e['id'] for e in datos['estados'] if e['nombre'] == filtro_estado), None)
-    if estado_id:
-        tareas_filtradas = [t for t in tareas_filtradas if t['estado'] == estado_id]
-
-if filtro_prioridad != "Todas":
-    tareas_filtradas = [t for t in tareas_filtradas if t['prioridad'] == filtro_prioridad]
+# Aplicar filtros (interseccion de indices)
+cat_nombre = filtro_categoria.split(' ', 1)[1] if ' ' in filtro_categoria else filtro_categoria
+tareas_filtradas = coleccion.filtrar(
+    responsable=coleccion.responsable_id(filtro_responsable) if filtro_responsable != "Todos" else None,
+    categoria=coleccion.categoria_id(cat_nombre) if filtro_categoria != "Todas" else None,
+    estado=coleccion.estado_id(filtro_estado) if filtro_estado != "Todos" else None,
+    prioridad=filtro_prioridad if filtro_prioridad != "Todas" else None,
+)
 
 # Navegacion
 st.sidebar.markdown("---")
 pagina = st.sidebar.radio(
     "Vista",
-    ["📊 Resumen", "📝 Lista de Tareas", "🎯 Tablero Kanban", "✏️ Editar Tarea"]
+    ["📊 Resumen", "📝 Lista de Tareas", "🎯 Tablero Kanban", "🛒 Compras", "✏️ Editar Tarea"]
 )
 
 # ============================================
 # PAGINA: RESUMEN
 # ============================================
 if pagina == "📊 Resumen":
+    import pandas as pd
+
     st.title("📊 Resumen del Proyecto")
 
     # Fechas criticas
@@ -213,11 +203,11 @@ if pagina == "📊 Resumen":
     st.markdown("---")
 
     # KPIs principales
-    total_tareas = len(datos['tareas'])
-    por_iniciar = len([t for t in datos['tareas'] if t['estado'] == 'por_iniciar'])
-    en_proceso = len([t for t in datos['tareas'] if t['estado'] == 'en_proceso'])
-    finalizadas = len([t for t in datos['tareas'] if t['estado'] == 'finalizado'])
-    bloqueadas = len([t for t in datos['tareas'] if t['estado'] == 'bloqueado'])
+    total_tareas = coleccion.contar()
+    por_iniciar = coleccion.contar(estado='por_iniciar')
+    en_proceso = coleccion.contar(estado='en_proceso')
+    finalizadas = coleccion.contar(estado='finalizado')
+    bloqueadas = coleccion.contar(estado='bloqueado')
 
     col1, col2, col3, col4, col5 = st.columns(5)
 
@@ -275,9 +265,8 @@ if pagina == "📊 Resumen":
 
     with col1:
         for cat in datos['categorias']:
-            cat_tareas = [t for t in datos['tareas'] if t['categoria'] == cat['id']]
-            cat_completadas = len([t for t in cat_tareas if t['estado'] == 'finalizado'])
-            cat_total = len(cat_tareas)
+            cat_completadas = coleccion.contar(categoria=cat['id'], estado='finalizado')
+            cat_total = coleccion.contar(categoria=cat['id'])
 
             st.markdown(f"**{cat['icono']} {cat['nombre']}** ({cat_completadas}/{cat_total})")
             if cat_total > 0:
@@ -289,8 +278,8 @@ if pagina == "📊 Resumen":
         for miembro in datos['equipo']:
             if miembro['id'] == 'sin_asignar':
                 continue
-            resp_tareas = [t for t in datos['tareas'] if t['responsable'] == miembro['id']]
-            resp_pendientes = len([t for t in resp_tareas if t['estado'] not in ['finalizado']])
+            resp_pendientes = (coleccion.contar(responsable=miembro['id'])
+                               - coleccion.contar(responsable=miembro['id'], estado='finalizado'))
             if resp_pendientes > 0:
                 st.markdown(f"**{miembro['nombre']}:** {resp_pendientes} pendientes")
 
@@ -300,17 +289,18 @@ if pagina == "📊 Resumen":
     st.markdown("### 🚨 Tareas Urgentes (Vencidas o Hoy)")
     hoy = date.today()
 
+    clases_fecha = coleccion.clasificar_fechas(hoy)
+    ids_urgentes = (clases_fecha['vencidas'] | clases_fecha['hoy']
+                    | (coleccion.ids(prioridad='urgente') - coleccion.ids(estado='finalizado')))
+
     tareas_urgentes = []
-    for t in datos['tareas']:
-        if t['estado'] == 'finalizado':
-            continue
-        fecha_obj = datetime.strptime(t['fecha_objetivo'], "%Y-%m-%d").date()
-        if fecha_obj <= hoy or t['prioridad'] == 'urgente':
+    for t in coleccion.filtrar():
+        if t['id'] in ids_urgentes:
             tareas_urgentes.append({
                 'tarea': t['tarea'],
                 'fecha': t['fecha_objetivo'],
-                'responsable': get_responsable_nombre(t['responsable'], datos['equipo']),
-                'estado': get_estado_nombre(t['estado'], datos['estados']),
+                'responsable': get_responsable_nombre(t['responsable']),
+                'estado': get_estado_nombre(t['estado']),
                 'prioridad': t['prioridad']
             })
 
@@ -332,21 +322,19 @@ elif pagina == "📝 Lista de Tareas":
     tareas_filtradas = sorted(tareas_filtradas, key=lambda x: x['fecha_objetivo'])
 
     for tarea in tareas_filtradas:
-        cat_info = get_categoria_info(tarea['categoria'], datos['categorias'])
-        estado_color = get_estado_color(tarea['estado'], datos['estados'])
-        estado_nombre = get_estado_nombre(tarea['estado'], datos['estados'])
-        resp_nombre = get_responsable_nombre(tarea['responsable'], datos['equipo'])
+        cat_info = get_categoria_info(tarea['categoria'])
+        estado_color = get_estado_color(tarea['estado'])
+        estado_nombre = get_estado_nombre(tarea['estado'])
+        resp_nombre = get_responsable_nombre(tarea['responsable'])
 
         # Verificar si esta vencida
-        fecha_obj = datetime.strptime(tarea['fecha_objetivo'], "%Y-%m-%d").date()
-        hoy = date.today()
+        clases_fecha = coleccion.clasificar_fechas(date.today())
 
         fecha_class = ""
-        if tarea['estado'] != 'finalizado':
-            if fecha_obj < hoy:
-                fecha_class = "fecha-vencida"
-            elif fecha_obj == hoy:
-                fecha_class = "fecha-hoy"
+        if tarea['id'] in clases_fecha['vencidas']:
+            fecha_class = "fecha-vencida"
+        elif tarea['id'] in clases_fecha['hoy']:
+            fecha_class = "fecha-hoy"
 
         with st.container():
             col1, col2, col3, col4, col5 = st.columns([0.5, 3, 1.5, 1.5, 1])
@@ -384,16 +372,32 @@ elif pagina == "📝 Lista de Tareas":
 elif pagina == "🎯 Tablero Kanban":
     st.title("🎯 Tablero Kanban")
 
+    def html_tarjeta_kanban(tarea):
+        cat_info = get_categoria_info(tarea['categoria'])
+        resp_nombre = get_responsable_nombre(tarea['responsable'])
+        return f"""
+        <div class="task-card {tarea['prioridad']}">
+            <strong>{cat_info['icono']} {tarea['tarea'][:40]}{'...' if len(tarea['tarea']) > 40 else ''}</strong><br>
+            <small>👤 {resp_nombre}</small><br>
+            <small>📅 {tarea['fecha_objetivo']}</small>
+        </div>
+        """
+
+    if 'tarjetas_kanban' not in st.session_state:
+        st.session_state['tarjetas_kanban'] = TarjetasKanban()
+    tarjetas_kanban = st.session_state['tarjetas_kanban']
+
     # Crear columnas para cada estado principal
     estados_kanban = ['por_iniciar', 'en_proceso', 'revision', 'finalizado']
     cols = st.columns(len(estados_kanban))
+    tareas_por_estado = coleccion.agrupar(tareas_filtradas, 'estado')
 
     for idx, estado_id in enumerate(estados_kanban):
-        estado_info = next((e for e in datos['estados'] if e['id'] == estado_id), None)
+        estado_info = coleccion.estados.get(estado_id)
         if not estado_info:
             continue
 
-        tareas_estado = [t for t in tareas_filtradas if t['estado'] == estado_id]
+        tareas_estado = tareas_por_estado.get(estado_id, [])
 
         with cols[idx]:
             st.markdown(f"""
@@ -403,19 +407,75 @@ elif pagina == "🎯 Tablero Kanban":
             </div>
             """, unsafe_allow_html=True)
 
-            for tarea in tareas_estado:
-                cat_info = get_categoria_info(tarea['categoria'], datos['categorias'])
-                resp_nombre = get_responsable_nombre(tarea['responsable'], datos['equipo'])
+            # Ventana de tarjetas en un solo bloque HTML (cacheado por version de cada tarea)
+            clave_limite = f"kanban_limite_{estado_id}"
+            limite = st.session_state.get(clave_limite, TARJETAS_POR_PAGINA)
+            visibles, restantes = ventana(tareas_estado, limite)
+            st.markdown(tarjetas_kanban.columna(visibles, html_tarjeta_kanban), unsafe_allow_html=True)
 
-                prioridad_class = tarea['prioridad']
+            if restantes:
+                if st.button(f"⬇️ Ver {min(restantes, TARJETAS_POR_PAGINA)} mas ({restantes} restantes)",
+                             key=f"kanban_mas_{estado_id}", use_container_width=True):
+                    st.session_state[clave_limite] = limite + TARJETAS_POR_PAGINA
+                    st.rerun()
+            elif limite > TARJETAS_POR_PAGINA:
+                if st.button("⬆️ Ver menos", key=f"kanban_menos_{estado_id}", use_container_width=True):
+                    st.session_state[clave_limite] = TARJETAS_POR_PAGINA
+                    st.rerun()
 
-                st.markdown(f"""
-                <div class="task-card {prioridad_class}">
-                    <strong>{cat_info['icono']} {tarea['tarea'][:40]}{'...' if len(tarea['tarea']) > 40 else ''}</strong><br>
-                    <small>👤 {resp_nombre}</small><br>
-                    <small>📅 {tarea['fecha_objetivo']}</small>
-                </div>
-                """, unsafe_allow_html=True)
+# ============================================
+# PAGINA: COMPRAS
+# ============================================
+elif pagina == "🛒 Compras":
+    from compras_materiales import PlanCompras
+
+    st.title("🛒 Plan de Compras de Materiales")
+
+    presupuesto_real = None
+    if CONFIG_HUERTA_PATH.exists():
+        with open(CONFIG_HUERTA_PATH, 'r', encoding='utf-8') as f:
+            presupuesto_real = json.load(f).get('presupuesto_real')
+
+    if not presupuesto_real:
+        st.info("No hay presupuesto_real en config/huerta_config.json")
+    else:
+        # El plan vive en la sesion: cada visita solo aplica fechas y cantidades cambiadas
+        try:
+            if 'plan_compras' not in st.session_state:
+                st.session_state['plan_compras'] = PlanCompras(datos, presupuesto_real)
+            plan = st.session_state['plan_compras']
+            plan.actualizar(datos)
+            plan.actualizar_presupuesto(presupuesto_real)
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+
+        df_lineas = plan.tabla_lineas()
+        df_lotes = plan.tabla_lotes()
+        pendientes = df_lineas[~df_lineas['comprado']]
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("🛒 Limite Compras", datos['metadata'].get('fecha_limite_compras', '-'))
+        with col2:
+            st.metric("Por comprar", f"${pendientes['costo_cop'].sum():,.0f}")
+        with col3:
+            st.metric("Pedidos (lotes)", len(df_lotes))
+        with col4:
+            st.metric("Lineas atrasadas", int(pendientes['atrasado'].sum()))
+
+        st.subheader("Lotes por proveedor")
+        st.dataframe(df_lotes, use_container_width=True, hide_index=True,
+                     column_config={'costo_cop': st.column_config.NumberColumn("Costo (COP)", format="$%d")})
+
+        st.subheader("Materiales")
+        df_lineas['tareas_que_usan'] = df_lineas['tareas_que_usan'].map(
+            lambda ids: ", ".join(f"#{i}" for i in ids))
+        st.dataframe(df_lineas, use_container_width=True, hide_index=True,
+                     column_config={'costo_cop': st.column_config.NumberColumn("Costo (COP)", format="$%d")})
+
+        st.caption("Pedir antes de = fecha en que la tarea de compra debe terminar (segun las tareas que "
+                   "dependen de ella y el limite de compras) menos el tiempo de entrega del proveedor.")
 
 # ============================================
 # PAGINA: EDITAR TAREA
@@ -443,7 +503,7 @@ elif pagina == "✏️ Editar Tarea":
 
     if tarea_seleccionada:
         tarea_id = tareas_opciones[tarea_seleccionada]
-        tarea = next((t for t in datos['tareas'] if t['id'] == tarea_id), None)
+        tarea = coleccion.por_id.get(tarea_id)
 
         if tarea:
             st.markdown("---")
@@ -453,12 +513,12 @@ elif pagina == "✏️ Editar Tarea":
             with col1:
                 st.markdown("### Informacion de la Tarea")
 
-                cat_info = get_categoria_info(tarea['categoria'], datos['categorias'])
+                cat_info = get_categoria_info(tarea['categoria'])
                 st.markdown(f"**Categoria:** {cat_info['icono']} {cat_info['nombre']}")
                 st.markdown(f"**Tarea:** {tarea['tarea']}")
 
                 if tarea['dependencias']:
-                    deps = [next((t['tarea'] for t in datos['tareas'] if t['id'] == d), str(d)) for d in tarea['dependencias']]
+                    deps = [coleccion.titulo(d) for d in tarea['dependencias']]
                     st.markdown(f"**Dependencias:** {', '.join(deps[:3])}{'...' if len(deps) > 3 else ''}")
 
             with col2:
@@ -466,7 +526,7 @@ elif pagina == "✏️ Editar Tarea":
 
                 # Responsable
                 resp_opciones = [e['nombre'] for e in datos['equipo']]
-                resp_actual = get_responsable_nombre(tarea['responsable'], datos['equipo'])
+                resp_actual = get_responsable_nombre(tarea['responsable'])
                 resp_idx = resp_opciones.index(resp_actual) if resp_actual in resp_opciones else 0
 
                 nuevo_responsable = st.selectbox(
@@ -484,7 +544,7 @@ elif pagina == "✏️ Editar Tarea":
 
                 # Estado
                 estados_opciones = [e['nombre'] for e in datos['estados']]
-                estado_actual = get_estado_nombre(tarea['estado'], datos['estados'])
+                estado_actual = get_estado_nombre(tarea['estado'])
                 estado_idx = estados_opciones.index(estado_actual) if estado_actual in estados_opciones else 0
 
                 nuevo_estado = st.selectbox(
@@ -515,32 +575,20 @@ elif pagina == "✏️ Editar Tarea":
 
             with col1:
                 if st.button("💾 Guardar Cambios", type="primary", use_container_width=True):
-                    # Actualizar tarea
-                    for i, t in enumerate(st.session_state['datos']['tareas']):
-                        if t['id'] == tarea_id:
-                            # Obtener IDs
-                            nuevo_resp_id = next((e['id'] for e in datos['equipo'] if e['nombre'] == nuevo_responsable), tarea['responsable'])
-                            nuevo_estado_id = next((e['id'] for e in datos['estados'] if e['nombre'] == nuevo_estado), tarea['estado'])
-
-                            st.session_state['datos']['tareas'][i]['responsable'] = nuevo_resp_id
-                            st.session_state['datos']['tareas'][i]['fecha_objetivo'] = nueva_fecha.strftime("%Y-%m-%d")
-                            st.session_state['datos']['tareas'][i]['estado'] = nuevo_estado_id
-                            st.session_state['datos']['tareas'][i]['prioridad'] = nueva_prioridad
-                            st.session_state['datos']['tareas'][i]['notas'] = nuevas_notas
-                            break
-
-                    guardar_datos(st.session_state['datos'])
+                    guardar_tarea(tarea_id, {
+                        'responsable': coleccion.responsable_id(nuevo_responsable) or tarea['responsable'],
+                        'fecha_objetivo': nueva_fecha.strftime("%Y-%m-%d"),
+                        'estado': coleccion.estado_id(nuevo_estado) or tarea['estado'],
+                        'prioridad': nueva_prioridad,
+                        'notas': nuevas_notas,
+                    })
                     st.success("✅ Tarea actualizada correctamente")
                     st.rerun()
 
             with col2:
                 if tarea['estado'] != 'finalizado':
                     if st.button("✅ Marcar Finalizada", use_container_width=True):
-                        for i, t in enumerate(st.session_state['datos']['tareas']):
-                            if t['id'] == tarea_id:
-                                st.session_state['datos']['tareas'][i]['estado'] = 'finalizado'
-                                break
-                        guardar_datos(st.session_state['datos'])
+                        guardar_tarea(tarea_id, {'estado': 'finalizado'})
                         st.success("✅ Tarea marcada como finalizada")
                         st.rerun()
 
@@ -553,4 +601,5 @@ st.sidebar.markdown(f"Dashboard v1.0")
 # Boton de recarga
 if st.sidebar.button("🔄 Recargar Datos"):
     st.session_state['recargar'] = True
+    st.session_state.pop('tarjetas_kanban', None)
     st.rerun()
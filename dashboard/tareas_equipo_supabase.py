@@ -5,14 +5,25 @@ VERSION CON SUPABASE - v3.0 (Mejorado)
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
 from pathlib import Path
 import os
+import time
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import create_client
+
+from tareas_core import BackendSupabase, ColeccionTareas
+from tareas_core.instrumentacion import ClienteInstrumentado, Metricas
+from tareas_core.kanban import TARJETAS_POR_PAGINA, TarjetasKanban, ventana
+
+# pandas, plotly.express y los modulos de tareas_core que usan pandas
+# (gantt, carga, resumen) se importan en las paginas que los usan: Kanban,
+# Panel del Dia, Editar y Nuevo no los cargan en un arranque en frio
+# (ver benchmarks/importacion.py). plotly.graph_objects ya lo carga Streamlit.
+
+# Tiempo de cada rerun completo (se registra en Metricas al final del script)
+inicio_rerun = time.perf_counter()
 
 # Cargar variables de entorno (soporta .env local y Streamlit Cloud secrets)
 BASE_DIR = Path(__file__).parent.parent
@@ -34,47 +45,46 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Archivo para el textfile collector de Prometheus (pagina Diagnostico)
+METRICAS_PATH = Path(os.getenv("METRICAS_PROM_PATH", BASE_DIR / "output" / "metricas_tareas.prom"))
+
 # Crear cliente Supabase
 @st.cache_resource
 def get_supabase_client():
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
-supabase = get_supabase_client()
+@st.cache_resource
+def get_metricas():
+    """Spans de todas las sesiones del proceso: consultas, paginas, fragmentos y graficos"""
+    return Metricas()
+
+metricas = get_metricas()
+supabase = ClienteInstrumentado(get_supabase_client(), metricas)
+backend = BackendSupabase(supabase)
 
 # ============================================
-# FUNCIONES DE CARGA DESDE SUPABASE
+# FUNCIONES DE ESCRITURA EN SUPABASE
 # ============================================
 
-def cargar_equipo():
-    response = supabase.table('equipo').select('*').execute()
-    return response.data
-
-def cargar_estados():
-    response = supabase.table('estados').select('*').order('orden').execute()
-    return response.data
-
-def cargar_categorias():
-    response = supabase.table('categorias').select('*').execute()
-    return response.data
+def actualizar_tarea(tarea_id, datos):
+    return backend.actualizar_tarea(tarea_id, datos)
 
-def cargar_metadata():
-    response = supabase.table('metadata').select('*').limit(1).execute()
-    return response.data[0] if response.data else {}
+def crear_tarea(datos):
+    return backend.crear_tarea(datos)
 
-def cargar_tareas():
-    response = supabase.table('tareas').select('*').order('fecha_objetivo').execute()
-    return response.data
+def aplicar_cambios(tarea_id, datos):
+    """Escribe en Supabase y actualiza la coleccion de la sesion sin recargar todo"""
+    actualizar_tarea(tarea_id, datos)  # agrega updated_at a datos
+    st.session_state['coleccion'].actualizar(tarea_id, datos)
 
-def actualizar_tarea(tarea_id, datos):
-    datos['updated_at'] = datetime.now().isoformat()
-    response = supabase.table('tareas').update(datos).eq('id', tarea_id).execute()
-    return response.data
+def mostrar_grafico(fig, **kwargs):
+    """st.plotly_chart medido: serializar la figura se cuenta aparte del calculo de la pagina"""
+    with metricas.span('plotly', pagina):
+        st.plotly_chart(fig, **kwargs)
 
-def crear_tarea(datos):
-    datos['created_at'] = datetime.now().isoformat()
-    datos['updated_at'] = datetime.now().isoformat()
-    response = supabase.table('tareas').insert(datos).execute()
-    return response.data
+def fijar_limite(clave_limite, limite):
+    """Callback de 'ver mas / menos' (Kanban y Panel del Dia)"""
+    st.session_state[clave_limite] = limite
 
 # ============================================
 # AUTENTICACION
@@ -121,11 +131,10 @@ def es_admin():
 
 if 'datos_cargados' not in st.session_state or st.session_state.get('recargar', False):
     with st.spinner('Cargando datos desde Supabase...'):
-        st.session_state['equipo'] = cargar_equipo()
-        st.session_state['estados'] = cargar_estados()
-        st.session_state['categorias'] = cargar_categorias()
-        st.session_state['metadata'] = cargar_metadata()
-        st.session_state['tareas'] = cargar_tareas()
+        datos_supabase = backend.cargar()
+        for clave in ['equipo', 'estados', 'categorias', 'metadata', 'tareas']:
+            st.session_state[clave] = datos_supabase[clave]
+        st.session_state['coleccion'] = ColeccionTareas(datos_supabase)
         st.session_state['datos_cargados'] = True
         st.session_state['recargar'] = False
 
@@ -136,25 +145,20 @@ metadata = st.session_state['metadata']
 tareas = st.session_state['tareas']
 
 # ============================================
-# LOOKUPS O(1) - Diccionarios precalculados
+# LOOKUPS O(1) - Coleccion indexada (tareas_core)
 # ============================================
 
-equipo_dict = {e['id']: e for e in equipo}
-estados_dict = {e['id']: e for e in estados}
-categorias_dict = {c['id']: c for c in categorias}
-tareas_dict = {t['id']: t for t in tareas}
+coleccion = st.session_state['coleccion']
 
-def get_estado_color(estado_id):
-    return estados_dict.get(estado_id, {}).get('color', '#6c757d')
+equipo_dict = coleccion.equipo
+estados_dict = coleccion.estados
+categorias_dict = coleccion.categorias
+tareas_dict = coleccion.por_id
 
-def get_estado_nombre(estado_id):
-    return estados_dict.get(estado_id, {}).get('nombre', estado_id)
-
-def get_responsable_nombre(resp_id):
-    return equipo_dict.get(resp_id, {}).get('nombre', resp_id)
-
-def get_categoria_info(cat_id):
-    return categorias_dict.get(cat_id, {'nombre': cat_id, 'icono': '📌'})
+get_estado_color = coleccion.estado_color
+get_estado_nombre = coleccion.estado_nombre
+get_responsable_nombre = coleccion.responsable_nombre
+get_categoria_info = coleccion.categoria_info
 
 # ============================================
 # VARIABLES GLOBALES PRECALCULADAS
@@ -177,72 +181,54 @@ except Exception:
 dias_para_obra = (fecha_inicio_obra - hoy).days
 dias_para_compras = (fecha_limite_compras - hoy).days
 
-# Grafo de dependencias
-def calcular_grafo_dependencias():
-    bloqueado_por = {}  # tarea_id -> [ids de tareas que la bloquean y NO estan finalizadas]
-    bloquea_a = {}      # tarea_id -> [ids de tareas que dependen de esta]
-    for t in tareas:
-        tid = t['id']
-        deps = t.get('dependencias') or []
-        # Filtrar dependencias no cumplidas
-        deps_no_cumplidas = []
-        for d in deps:
-            dep_tarea = tareas_dict.get(d)
-            if dep_tarea and dep_tarea['estado'] != 'finalizado':
-                deps_no_cumplidas.append(d)
-        bloqueado_por[tid] = deps_no_cumplidas
-        # Construir inverso
-        for d in deps:
-            if d not in bloquea_a:
-                bloquea_a[d] = []
-            bloquea_a[d].append(tid)
-    return bloqueado_por, bloquea_a
-
-bloqueado_por, bloquea_a = calcular_grafo_dependencias()
-
-# Tareas vencidas (no finalizadas, fecha pasada)
-def calcular_tareas_vencidas():
-    vencidas = set()
-    for t in tareas:
-        if t['estado'] == 'finalizado':
-            continue
-        try:
-            fecha_obj = datetime.strptime(t['fecha_objetivo'], "%Y-%m-%d").date()
-            if fecha_obj < hoy:
-                vencidas.add(t['id'])
-        except Exception:
-            pass
-    return vencidas
+# Grafo de dependencias y clasificacion de fechas (calculados una vez en la coleccion)
+bloqueado_por = coleccion.bloqueado_por   # tarea_id -> dependencias NO finalizadas
+bloquea_a = coleccion.bloquea_a           # tarea_id -> tareas que dependen de esta
+
+clases_fecha = coleccion.clasificar_fechas(hoy)
+tareas_vencidas_set = clases_fecha['vencidas']
+tareas_hoy_set = clases_fecha['hoy']
+tareas_manana_set = clases_fecha['manana']
 
-tareas_vencidas_set = calcular_tareas_vencidas()
+# Impacto en cascada: cuantas tareas se afectan si una tarea se retrasa
+calcular_impacto_cascada = coleccion.impacto_cascada
 
-# Tareas de hoy y manana
-tareas_hoy_set = set()
-tareas_manana_set = set()
-for t in tareas:
-    if t['estado'] == 'finalizado':
-        continue
+# Programa nivelado: inicio/fin desde dependencias, duracion y capacidad de cada responsable
+def programa_actual():
+    """(programa, error); la coleccion lo cachea por dia hasta el proximo cambio"""
     try:
-        fecha_obj = datetime.strptime(t['fecha_objetivo'], "%Y-%m-%d").date()
-        if fecha_obj == hoy:
-            tareas_hoy_set.add(t['id'])
-        elif fecha_obj == hoy + timedelta(days=1):
-            tareas_manana_set.add(t['id'])
-    except Exception:
-        pass
+        return coleccion.programa(hoy), None
+    except ValueError as e:
+        return {}, str(e)
 
-# Impacto en cascada: cuantas tareas se afectan si una tarea se retrasa
-def calcular_impacto_cascada(tarea_id, visitados=None):
-    if visitados is None:
-        visitados = set()
-    if tarea_id in visitados:
-        return set()
-    visitados.add(tarea_id)
-    dependientes = bloquea_a.get(tarea_id, [])
-    afectadas = set(dependientes)
-    for d in dependientes:
-        afectadas |= calcular_impacto_cascada(d, visitados)
-    return afectadas
+programa, error_programa = programa_actual()
+
+# ============================================
+# LINEA DE TIEMPO - Tabla cacheada por filtros
+# ============================================
+
+# Dias visibles desde una semana antes de hoy (None = todo el proyecto)
+VENTANAS_GANTT = {
+    "Todo el proyecto": None,
+    "Proximos 3 meses": 90,
+    "Proximo mes": 30,
+    "Proximas 2 semanas": 14,
+}
+ALTO_MAX_GANTT = 1400
+
+# Carga por responsable: etiqueta -> base de tareas_core.carga
+BASES_CARGA = {"Programa nivelado": "programa", "Fechas objetivo": "objetivo"}
+MAX_DIAS_CARGA = 366
+
+def huella_tareas(lista):
+    """Clave de cache: ids y updated_at de las tareas (cambia con ediciones)"""
+    return tuple((t['id'], t.get('updated_at')) for t in lista)
+
+@st.cache_data(max_entries=32)
+def gantt_preparado(ids_filtrados, huella, dia, _tareas, mostrar_finalizadas):
+    """Cache por filtros (ids visibles) y por version de todas las tareas (el programa las cruza)"""
+    from tareas_core.gantt import tabla_gantt
+    return tabla_gantt(coleccion, _tareas, mostrar_finalizadas, programa)
 
 # ============================================
 # CSS PROFESIONAL
@@ -574,30 +560,22 @@ filtro_estado = st.sidebar.selectbox("Estado", estados_opciones_filtro, index=0)
 prioridades_opciones = ["Todas", "urgente", "alta", "media", "baja"]
 filtro_prioridad = st.sidebar.selectbox("Prioridad", prioridades_opciones, index=0)
 
-# Aplicar filtros
-tareas_filtradas = tareas.copy()
-
+# Aplicar filtros (interseccion de indices)
 # Usuarios normales: filtrar automaticamente por sus tareas
 if usuario_logueado() and not es_admin():
-    tareas_filtradas = [t for t in tareas_filtradas if t['responsable'] == get_usuario_actual()]
+    filtro_resp_id = get_usuario_actual()
 elif filtro_responsable != "Todos":
-    resp_id = next((e['id'] for e in equipo if e['nombre'] == filtro_responsable), None)
-    if resp_id:
-        tareas_filtradas = [t for t in tareas_filtradas if t['responsable'] == resp_id]
-
-if filtro_categoria != "Todas":
-    cat_nombre = filtro_categoria.split(' ', 1)[1] if ' ' in filtro_categoria else filtro_categoria
-    cat_id = next((c['id'] for c in categorias if c['nombre'] == cat_nombre), None)
-    if cat_id:
-        tareas_filtradas = [t for t in tareas_filtradas if t['categoria'] == cat_id]
-
-if filtro_estado != "Todos":
-    estado_id = next((e['id'] for e in estados if e['nombre'] == filtro_estado), None)
-    if estado_id:
-        tareas_filtradas = [t for t in tareas_filtradas if t['estado'] == estado_id]
-
-if filtro_prioridad != "Todas":
-    tareas_filtradas = [t for t in tareas_filtradas if t['prioridad'] == filtro_prioridad]
+    filtro_resp_id = coleccion.responsable_id(filtro_responsable)
+else:
+    filtro_resp_id = None
+
+cat_nombre = filtro_categoria.split(' ', 1)[1] if ' ' in filtro_categoria else filtro_categoria
+tareas_filtradas = coleccion.filtrar(
+    responsable=filtro_resp_id,
+    categoria=coleccion.categoria_id(cat_nombre) if filtro_categoria != "Todas" else None,
+    estado=coleccion.estado_id(filtro_estado) if filtro_estado != "Todos" else None,
+    prioridad=filtro_prioridad if filtro_prioridad != "Todas" else None,
+)
 
 # Navegacion
 st.sidebar.markdown("---")
@@ -615,15 +593,24 @@ paginas = [
     "➕ Nuevo Proyecto",
     "✏️ Editar Tarea"
 ]
+if es_admin():
+    paginas.append("🩺 Diagnostico")
 pagina_idx = paginas.index(st.session_state['pagina_actual']) if st.session_state['pagina_actual'] in paginas else 0
 
 pagina = st.sidebar.radio("Vista", paginas, index=pagina_idx)
 st.session_state['pagina_actual'] = pagina
 
+# Span de la pagina: solo el bloque de la vista elegida (sin carga ni sidebar)
+inicio_pagina = time.perf_counter()
+
 # ============================================
 # PAGINA: RESUMEN
 # ============================================
 if pagina == "📊 Resumen":
+    import pandas as pd
+    import plotly.express as px
+    from tareas_core.resumen import conteo_por_estado, resumen_conteos
+
     # Usar tareas filtradas para todos los graficos (responde a filtros del sidebar)
     resumen_tareas = tareas_filtradas
 
@@ -676,13 +663,14 @@ if pagina == "📊 Resumen":
 
     st.markdown("")
 
-    # KPIs basados en resumen_tareas
-    total_tareas = len(resumen_tareas)
-    por_iniciar = len([t for t in resumen_tareas if t['estado'] == 'por_iniciar'])
-    en_proceso = len([t for t in resumen_tareas if t['estado'] == 'en_proceso'])
-    finalizadas = len([t for t in resumen_tareas if t['estado'] == 'finalizado'])
-    bloqueadas = len([t for t in resumen_tareas if t['estado'] == 'bloqueado'])
-    n_vencidas_kpi = len([t for t in resumen_tareas if t['id'] in tareas_vencidas_set])
+    # KPIs basados en resumen_tareas (una sola pasada)
+    conteos = resumen_conteos(resumen_tareas, tareas_vencidas_set)
+    total_tareas = conteos['total']
+    por_iniciar = conteos['por_estado'].get('por_iniciar', 0)
+    en_proceso = conteos['por_estado'].get('en_proceso', 0)
+    finalizadas = conteos['por_estado'].get('finalizado', 0)
+    bloqueadas = conteos['por_estado'].get('bloqueado', 0)
+    n_vencidas_kpi = conteos['vencidas']
 
     col1, col2, col3, col4, col5, col6 = st.columns(6)
 
@@ -751,10 +739,10 @@ if pagina == "📊 Resumen":
         st.markdown("### Distribucion por Estado")
         estado_counts = {}
         estado_colors_map = {}
-        for t in resumen_tareas:
-            ename = get_estado_nombre(t['estado'])
-            estado_counts[ename] = estado_counts.get(ename, 0) + 1
-            estado_colors_map[ename] = get_estado_color_chart(t['estado'])
+        for estado_id, n in conteos['por_estado'].items():
+            ename = get_estado_nombre(estado_id)
+            estado_counts[ename] = estado_counts.get(ename, 0) + n
+            estado_colors_map[ename] = get_estado_color_chart(estado_id)
 
         if estado_counts:
             fig_donut = go.Figure(data=[go.Pie(
@@ -775,23 +763,18 @@ if pagina == "📊 Resumen":
                 uniformtext_minsize=10,
                 uniformtext_mode='hide'
             )
-            st.plotly_chart(fig_donut, use_container_width=True)
+            mostrar_grafico(fig_donut, use_container_width=True)
 
     with col_g2:
         if vista_personal:
             # Usuario normal: grafico por categoria
             st.markdown("### Mis Tareas por Categoria")
-            cat_estado_data = []
-            for t in resumen_tareas:
+            def etiqueta_categoria(t):
                 cat_info = get_categoria_info(t['categoria'])
-                cat_estado_data.append({
-                    'Categoria': f"{cat_info['icono']} {cat_info['nombre']}",
-                    'Estado': get_estado_nombre(t['estado']),
-                    'Tareas': 1
-                })
-            df_cat = pd.DataFrame(cat_estado_data)
-            if not df_cat.empty:
-                df_cat_grouped = df_cat.groupby(['Categoria', 'Estado']).sum().reset_index()
+                return f"{cat_info['icono']} {cat_info['nombre']}"
+
+            df_cat_grouped = conteo_por_estado(resumen_tareas, etiqueta_categoria, get_estado_nombre, 'Categoria')
+            if not df_cat_grouped.empty:
                 estado_order = [get_estado_nombre(e['id']) for e in estados]
                 color_map = {get_estado_nombre(e['id']): get_estado_color_chart(e['id']) for e in estados}
                 fig_cat = px.bar(
@@ -811,20 +794,13 @@ if pagina == "📊 Resumen":
                     height=320,
                     legend=dict(orientation="h", yanchor="bottom", y=-0.3)
                 )
-                st.plotly_chart(fig_cat, use_container_width=True)
+                mostrar_grafico(fig_cat, use_container_width=True)
         else:
             # Admin: grafico por responsable
             st.markdown("### Tareas por Responsable")
-            resp_estado_data = []
-            for t in resumen_tareas:
-                resp_estado_data.append({
-                    'Responsable': get_responsable_nombre(t['responsable']),
-                    'Estado': get_estado_nombre(t['estado']),
-                    'Tareas': 1
-                })
-            df_resp = pd.DataFrame(resp_estado_data)
-            if not df_resp.empty:
-                df_grouped = df_resp.groupby(['Responsable', 'Estado']).sum().reset_index()
+            df_grouped = conteo_por_estado(resumen_tareas, lambda t: get_responsable_nombre(t['responsable']),
+                                           get_estado_nombre, 'Responsable')
+            if not df_grouped.empty:
                 estado_order = [get_estado_nombre(e['id']) for e in estados]
                 color_map = {get_estado_nombre(e['id']): get_estado_color_chart(e['id']) for e in estados}
                 fig_resp = px.bar(
@@ -844,23 +820,23 @@ if pagina == "📊 Resumen":
                     height=320,
                     legend=dict(orientation="h", yanchor="bottom", y=-0.3)
                 )
-                st.plotly_chart(fig_resp, use_container_width=True)
+                mostrar_grafico(fig_resp, use_container_width=True)
 
     st.markdown("---")
 
     # Semaforo por categoria (solo las que tienen tareas del usuario)
     st.markdown("### Semaforo por Categoria")
-    cats_con_tareas = [cat for cat in categorias if any(t['categoria'] == cat['id'] for t in resumen_tareas)]
+    cats_con_tareas = [cat for cat in categorias if cat['id'] in conteos['por_categoria']]
 
     if cats_con_tareas:
         cat_cols = st.columns(min(len(cats_con_tareas), 6))
         for idx, cat in enumerate(cats_con_tareas):
             col_idx = idx % len(cat_cols)
             with cat_cols[col_idx]:
-                cat_tareas = [t for t in resumen_tareas if t['categoria'] == cat['id']]
-                cat_total = len(cat_tareas)
-                cat_completadas = len([t for t in cat_tareas if t['estado'] == 'finalizado'])
-                cat_vencidas = len([t for t in cat_tareas if t['id'] in tareas_vencidas_set])
+                cat_conteo = conteos['por_categoria'][cat['id']]
+                cat_total = cat_conteo['total']
+                cat_completadas = cat_conteo['finalizadas']
+                cat_vencidas = cat_conteo['vencidas']
 
                 pct = cat_completadas / cat_total if cat_total > 0 else 0
 
@@ -1035,62 +1011,56 @@ elif pagina == "📝 Lista de Tareas":
 # PAGINA: LINEA DE TIEMPO (GANTT)
 # ============================================
 elif pagina == "🗓️ Linea de Tiempo":
+    import plotly.express as px
+    from tareas_core.carga import carga_por_responsable, sobrecarga
+    from tareas_core.programacion import SIN_NIVELAR
+    from tareas_core.gantt import MAX_BARRAS, agregar, en_ventana, periodo_para, segmentos
+
     st.title("🗓️ Linea de Tiempo")
 
     # Controles
-    col_ctrl1, col_ctrl2, col_ctrl3 = st.columns(3)
+    col_ctrl1, col_ctrl2, col_ctrl3, col_ctrl4 = st.columns(4)
     with col_ctrl1:
         gantt_color = st.selectbox("Colorear por", ["Categoria", "Estado", "Responsable", "Prioridad"])
     with col_ctrl2:
         gantt_grupo = st.selectbox("Agrupar por", ["Categoria", "Responsable", "Individual"])
     with col_ctrl3:
+        gantt_zoom = st.selectbox("Ventana", list(VENTANAS_GANTT))
+    with col_ctrl4:
         mostrar_finalizadas = st.checkbox("Mostrar finalizadas", value=False)
 
-    # Preparar datos para Gantt
-    gantt_data = []
-    for t in tareas_filtradas:
-        if not mostrar_finalizadas and t['estado'] == 'finalizado':
-            continue
+    if error_programa:
+        st.warning(f"No se pudo nivelar el programa: {error_programa}")
 
-        try:
-            fecha_fin = datetime.strptime(t['fecha_objetivo'], "%Y-%m-%d")
-        except Exception:
-            continue
-
-        # Estimar fecha inicio (3 dias antes si no hay info)
-        fecha_inicio = fecha_fin - timedelta(days=3)
+    # Tabla base cacheada por estado de filtros; barras con el programa nivelado
+    df_gantt = gantt_preparado(tuple(t['id'] for t in tareas_filtradas), huella_tareas(coleccion.lista),
+                               hoy, tareas_filtradas, mostrar_finalizadas)
 
-        cat_info = get_categoria_info(t['categoria'])
-        resp_nombre = get_responsable_nombre(t['responsable'])
-
-        if gantt_grupo == "Categoria":
-            grupo = f"{cat_info['icono']} {cat_info['nombre']}"
-        elif gantt_grupo == "Responsable":
-            grupo = resp_nombre
+    if not df_gantt.empty:
+        dias_zoom = VENTANAS_GANTT[gantt_zoom]
+        if dias_zoom is None:
+            df_vista = df_gantt
         else:
-            grupo = t['tarea'][:50]
-
-        row = {
-            'Tarea': t['tarea'][:45] + ('...' if len(t['tarea']) > 45 else ''),
-            'Inicio': fecha_inicio,
-            'Fin': fecha_fin,
-            'Grupo': grupo,
-            'Categoria': f"{cat_info['icono']} {cat_info['nombre']}",
-            'Estado': get_estado_nombre(t['estado']),
-            'Responsable': resp_nombre,
-            'Prioridad': t['prioridad']
-        }
-        gantt_data.append(row)
-
-    if gantt_data:
-        df_gantt = pd.DataFrame(gantt_data)
-
-        color_col_map = {
-            "Categoria": "Categoria",
-            "Estado": "Estado",
-            "Responsable": "Responsable",
-            "Prioridad": "Prioridad"
-        }
+            desde = hoy - timedelta(days=7)
+            df_vista = en_ventana(df_gantt, desde, desde + timedelta(days=dias_zoom))
+
+        # Zoom amplio o demasiadas barras: una barra por grupo y periodo
+        agregado = len(df_vista) > MAX_BARRAS
+        grupo_col = gantt_grupo
+        if agregado:
+            if grupo_col == "Individual":
+                grupo_col = "Categoria"
+            df_vista = agregar(df_vista, grupo_col, gantt_color, periodo_para(df_vista))
+            df_vista['Hover'] = (df_vista[grupo_col].astype(str) + "<br>" + df_vista['Tarea']
+                                 + " (" + df_vista['Fin'].dt.strftime('%d %b') + ")")
+            st.caption(f"{len(df_gantt)} tareas: vista resumida por {grupo_col.lower()}. "
+                       "Reduce la ventana o usa los filtros para ver cada tarea.")
+        else:
+            df_vista = df_vista.assign(Hover="<b>" + df_vista['Tarea'] + "</b><br>Estado: " + df_vista['Estado']
+                                       + "<br>Responsable: " + df_vista['Responsable']
+                                       + "<br>Prioridad: " + df_vista['Prioridad'].astype(str)
+                                       + "<br>Objetivo: " + df_vista['Objetivo'].dt.strftime('%Y-%m-%d')
+                                       + df_vista['Atraso'].map(lambda d: f"<br>⚠️ Atraso: {d} dias" if d else ""))
 
         # Color maps
         if gantt_color == "Estado":
@@ -1098,18 +1068,19 @@ elif pagina == "🗓️ Linea de Tiempo":
         elif gantt_color == "Prioridad":
             cmap = {"urgente": "#dc3545", "alta": "#ff9800", "media": "#2196f3", "baja": "#00acc1"}
         else:
-            cmap = None
-
-        fig_gantt = px.timeline(
-            df_gantt,
-            x_start="Inicio",
-            x_end="Fin",
-            y="Grupo",
-            color=color_col_map[gantt_color],
-            hover_name="Tarea",
-            hover_data=["Estado", "Responsable", "Prioridad"],
-            color_discrete_map=cmap
-        )
+            cmap = {}
+        paleta = px.colors.qualitative.Plotly
+
+        # Una traza WebGL por color (no por tarea)
+        filas_gantt = list(dict.fromkeys(df_vista[grupo_col]))
+        alto_fila = max(6, min(22, 600 // max(1, len(filas_gantt))))
+        fig_gantt = go.Figure()
+        for i, (valor, (x, y, texto)) in enumerate(segmentos(df_vista, grupo_col, gantt_color, 'Hover').items()):
+            fig_gantt.add_trace(go.Scattergl(
+                x=x, y=y, text=texto, name=str(valor), mode='lines',
+                line=dict(width=alto_fila, color=cmap.get(valor, paleta[i % len(paleta)])),
+                hovertemplate='%{text}<extra></extra>', connectgaps=False
+            ))
 
         # Lineas verticales: HOY, limite compras, inicio obra
         lineas_ref = [
@@ -1130,28 +1101,45 @@ elif pagina == "🗓️ Linea de Tiempo":
             )
 
         fig_gantt.update_layout(
-            height=max(400, len(set(df_gantt['Grupo'])) * 40),
+            height=min(ALTO_MAX_GANTT, max(400, len(filas_gantt) * (alto_fila + 10))),
             margin=dict(t=60, b=20),
             xaxis_title="Fecha",
+            xaxis=dict(type="date"),
             yaxis_title="",
-            yaxis=dict(autorange="reversed")
+            yaxis=dict(autorange="reversed", type="category", categoryorder="array", categoryarray=filas_gantt),
+            legend_title_text=gantt_color
         )
-        st.plotly_chart(fig_gantt, use_container_width=True)
-
-        # Carga por fecha de vencimiento
-        st.markdown("### Carga por Fecha de Vencimiento")
-        df_carga = df_gantt.groupby(df_gantt['Fin'].dt.date).size().reset_index(name='Tareas')
-        df_carga.columns = ['Fecha', 'Tareas']
-        df_carga['Fecha'] = pd.to_datetime(df_carga['Fecha'])
-
-        fig_carga = px.bar(
-            df_carga,
-            x='Fecha',
-            y='Tareas',
-            color_discrete_sequence=['#4CAF50'],
-            labels={'Tareas': 'Tareas', 'Fecha': 'Fecha'}
+        mostrar_grafico(fig_gantt, use_container_width=True)
+
+        # Carga por responsable y dia (esfuerzo repartido en el intervalo de cada tarea)
+        st.markdown("### Carga por Responsable")
+        base_carga = st.radio(
+            "Base", list(BASES_CARGA), horizontal=True,
+            help="Programa nivelado: fechas calculadas. Fechas objetivo: cada tarea termina justo en su fecha objetivo."
         )
-        fig_carga.update_traces(hovertemplate='<b>%{x|%d %b %Y}</b><br>Tareas: %{y}<extra></extra>')
+        if dias_zoom is None:
+            desde_carga = hasta_carga = None  # rango de las tareas
+        else:
+            desde_carga, hasta_carga = desde, desde + timedelta(days=dias_zoom)
+        nombres_carga, fechas_carga, matriz = carga_por_responsable(
+            df_gantt, desde_carga, hasta_carga, BASES_CARGA[base_carga], MAX_DIAS_CARGA
+        )
+        # Filas por nombre visible; la capacidad se busca por id del responsable
+        ids_carga = [coleccion.responsable_id(n) or n for n in nombres_carga]
+        capacidades_carga = [float(equipo_dict.get(r, {}).get('capacidad') or 1) for r in ids_carga]
+        utilizacion = matriz / [[c] for c in capacidades_carga]
+        dias_sobrecarga = sobrecarga(matriz, capacidades_carga)
+        # Sin asignar y las cuadrillas no se nivelan: no tienen una capacidad que superar
+        dias_sobrecarga[[r in SIN_NIVELAR for r in ids_carga]] = False
+
+        fig_carga = go.Figure(go.Heatmap(
+            z=utilizacion, x=fechas_carga, y=nombres_carga, customdata=matriz,
+            zmin=0, zmax=2, xgap=1, ygap=2,
+            colorscale=[[0, "#f1f8e9"], [0.5, "#4CAF50"], [0.5001, "#ff9800"], [1, "#b71c1c"]],
+            colorbar=dict(title="Uso", tickvals=[0, 1, 2], ticktext=["0%", "100%", "200%+"]),
+            hovertemplate="<b>%{y}</b><br>%{x|%d %b %Y}<br>Carga: %{customdata:.2f} jornadas"
+                          "<br>Uso: %{z:.0%}<extra></extra>"
+        ))
         x_hoy_iso = datetime.combine(hoy, datetime.min.time()).isoformat()
         fig_carga.add_shape(
             type="line", x0=x_hoy_iso, x1=x_hoy_iso, y0=0, y1=1,
@@ -1162,8 +1150,15 @@ elif pagina == "🗓️ Linea de Tiempo":
             text="🔴 HOY", showarrow=False,
             font=dict(color="red", size=10)
         )
-        fig_carga.update_layout(height=250, margin=dict(t=40, b=20))
-        st.plotly_chart(fig_carga, use_container_width=True)
+        fig_carga.update_layout(height=max(250, 40 * len(nombres_carga) + 80), margin=dict(t=40, b=20),
+                                yaxis=dict(autorange="reversed"))
+        mostrar_grafico(fig_carga, use_container_width=True)
+
+        sobrecargados = [(n, int(d.sum())) for n, d in zip(nombres_carga, dias_sobrecarga) if d.any()]
+        if sobrecargados:
+            st.warning("⚠️ Dias sobrecargados: " + ", ".join(f"{n} ({d})" for n, d in sobrecargados))
+        else:
+            st.caption("Nadie supera su capacidad en la ventana mostrada.")
     else:
         st.info("No hay tareas para mostrar en la linea de tiempo.")
 
@@ -1171,6 +1166,9 @@ elif pagina == "🗓️ Linea de Tiempo":
 # PAGINA: DEPENDENCIAS
 # ============================================
 elif pagina == "🔗 Dependencias":
+    import pandas as pd
+    import plotly.express as px
+
     st.title("🔗 Analisis de Dependencias")
 
     tab1, tab2, tab3 = st.tabs(["🚨 Alertas", "⛓️ Cadenas Criticas", "💥 Impacto Cascada"])
@@ -1246,7 +1244,7 @@ elif pagina == "🔗 Dependencias":
                 margin=dict(t=40, b=20),
                 yaxis=dict(autorange="reversed")
             )
-            st.plotly_chart(fig_cadenas, use_container_width=True)
+            mostrar_grafico(fig_cadenas, use_container_width=True)
         else:
             st.info("No hay tareas que bloqueen a 2 o mas tareas.")
 
@@ -1289,7 +1287,7 @@ elif pagina == "🔗 Dependencias":
                 margin=dict(t=40, b=20),
                 yaxis=dict(autorange="reversed")
             )
-            st.plotly_chart(fig_impacto, use_container_width=True)
+            mostrar_grafico(fig_impacto, use_container_width=True)
         else:
             st.info("Ninguna tarea tiene dependencias en cascada.")
 
@@ -1299,66 +1297,97 @@ elif pagina == "🔗 Dependencias":
 elif pagina == "🎯 Tablero Kanban":
     st.title("🎯 Tablero Kanban")
 
-    # 5 columnas incluyendo bloqueado
-    estados_kanban = ['por_iniciar', 'en_proceso', 'revision', 'bloqueado', 'finalizado']
-    cols = st.columns(len(estados_kanban))
-
-    for idx, estado_id in enumerate(estados_kanban):
-        estado_info = estados_dict.get(estado_id)
-        if not estado_info:
-            # Si no existe en BD, crear info minima
-            estado_info = {'id': estado_id, 'nombre': estado_id.replace('_', ' ').title(), 'color': '#6c757d'}
-
-        tareas_estado = [t for t in tareas_filtradas if t['estado'] == estado_id]
-        vencidas_en_col = len([t for t in tareas_estado if t['id'] in tareas_vencidas_set])
-
-        with cols[idx]:
-            # Header con contador de vencidas
-            vencida_badge = f' <span style="background:#dc3545;color:white;padding:2px 6px;border-radius:10px;font-size:11px;">{vencidas_en_col}🔥</span>' if vencidas_en_col > 0 else ''
-            st.markdown(f"""
-            <div style="background-color: {estado_info['color']}; color: white; padding: 10px; border-radius: 8px; text-align: center; margin-bottom: 10px;">
-                <h4 style="margin:0;">{estado_info['nombre']}</h4>
-                <p style="margin:3px 0 0 0;">{len(tareas_estado)} tareas{vencida_badge}</p>
-            </div>
-            """, unsafe_allow_html=True)
+    def html_tarjeta_kanban(tarea, hoy, n_deps):
+        """HTML de una tarjeta (cacheado en la sesion por version de la tarea)"""
+        cat_info = get_categoria_info(tarea['categoria'])
+        resp_nombre = get_responsable_nombre(tarea['responsable'])
 
-            for tarea in tareas_estado:
-                cat_info = get_categoria_info(tarea['categoria'])
-                resp_nombre = get_responsable_nombre(tarea['responsable'])
+        # Indicador de fecha
+        fecha_ind = ""
+        try:
+            fecha_obj = datetime.strptime(tarea['fecha_objetivo'], "%Y-%m-%d").date()
+            if tarea['estado'] != 'finalizado':
+                if fecha_obj < hoy:
+                    dias_r = (hoy - fecha_obj).days
+                    fecha_ind = f'<span style="color:#ffcdd2;font-weight:bold;">⚠️ {dias_r}d atraso</span>'
+                elif fecha_obj == hoy:
+                    fecha_ind = '<span style="color:#ffe082;font-weight:bold;">📌 HOY</span>'
+        except Exception:
+            pass
 
-                # Indicador de fecha
-                fecha_ind = ""
-                try:
-                    fecha_obj = datetime.strptime(tarea['fecha_objetivo'], "%Y-%m-%d").date()
-                    if tarea['estado'] != 'finalizado':
-                        if fecha_obj < hoy:
-                            dias_r = (hoy - fecha_obj).days
-                            fecha_ind = f'<span style="color:#ffcdd2;font-weight:bold;">⚠️ {dias_r}d atraso</span>'
-                        elif fecha_obj == hoy:
-                            fecha_ind = '<span style="color:#ffe082;font-weight:bold;">📌 HOY</span>'
-                except Exception:
-                    pass
-
-                # Indicador de dependencias bloqueantes
-                dep_ind = ""
-                deps_pendientes = bloqueado_por.get(tarea['id'], [])
-                if deps_pendientes:
-                    dep_ind = f'<span style="color:#ffcdd2;font-size:11px;">🔒 {len(deps_pendientes)} dep(s)</span>'
+        # Indicador de dependencias bloqueantes
+        dep_ind = f'<span style="color:#ffcdd2;font-size:11px;">🔒 {n_deps} dep(s)</span>' if n_deps else ""
 
+        return f"""
+        <div class="task-card {tarea['prioridad']}">
+            <strong>{cat_info['icono']} {tarea['tarea'][:35]}{'...' if len(tarea['tarea']) > 35 else ''}</strong><br>
+            <small>👤 {resp_nombre}</small><br>
+            <small>📅 {tarea['fecha_objetivo']}</small> {fecha_ind}<br>
+            {dep_ind}
+        </div>
+        """
+
+    if 'tarjetas_kanban' not in st.session_state:
+        st.session_state['tarjetas_kanban'] = TarjetasKanban()
+    tarjetas_kanban = st.session_state['tarjetas_kanban']
+
+    @st.fragment
+    def tablero_kanban():
+        """Columnas del tablero; 'ver mas / menos' solo vuelve a ejecutar este bloque"""
+        inicio_fragmento = time.perf_counter()
+
+        # 5 columnas incluyendo bloqueado
+        estados_kanban = ['por_iniciar', 'en_proceso', 'revision', 'bloqueado', 'finalizado']
+        cols = st.columns(len(estados_kanban))
+        tareas_por_estado = coleccion.agrupar(tareas_filtradas, 'estado')
+
+        for idx, estado_id in enumerate(estados_kanban):
+            estado_info = estados_dict.get(estado_id)
+            if not estado_info:
+                # Si no existe en BD, crear info minima
+                estado_info = {'id': estado_id, 'nombre': estado_id.replace('_', ' ').title(), 'color': '#6c757d'}
+
+            tareas_estado = tareas_por_estado.get(estado_id, [])
+            vencidas_en_col = len(tareas_vencidas_set.intersection(t['id'] for t in tareas_estado))
+
+            with cols[idx]:
+                # Header con contador de vencidas
+                vencida_badge = f' <span style="background:#dc3545;color:white;padding:2px 6px;border-radius:10px;font-size:11px;">{vencidas_en_col}🔥</span>' if vencidas_en_col > 0 else ''
                 st.markdown(f"""
-                <div class="task-card {tarea['prioridad']}">
-                    <strong>{cat_info['icono']} {tarea['tarea'][:35]}{'...' if len(tarea['tarea']) > 35 else ''}</strong><br>
-                    <small>👤 {resp_nombre}</small><br>
-                    <small>📅 {tarea['fecha_objetivo']}</small> {fecha_ind}<br>
-                    {dep_ind}
+                <div style="background-color: {estado_info['color']}; color: white; padding: 10px; border-radius: 8px; text-align: center; margin-bottom: 10px;">
+                    <h4 style="margin:0;">{estado_info['nombre']}</h4>
+                    <p style="margin:3px 0 0 0;">{len(tareas_estado)} tareas{vencida_badge}</p>
                 </div>
                 """, unsafe_allow_html=True)
 
-                # Boton de edicion rapida
-                if st.button("✏️", key=f"kanban_edit_{tarea['id']}", help="Editar"):
-                    st.session_state['tarea_editar'] = tarea['id']
-                    st.session_state['pagina_actual'] = "✏️ Editar Tarea"
-                    st.rerun()
+                # Ventana de tarjetas: los widgets por rerun no crecen con el total de la columna
+                clave_limite = f"kanban_limite_{estado_id}"
+                limite = st.session_state.get(clave_limite, TARJETAS_POR_PAGINA)
+                visibles, restantes = ventana(tareas_estado, limite)
+
+                for tarea in visibles:
+                    n_deps = len(bloqueado_por.get(tarea['id'], []))
+                    st.markdown(tarjetas_kanban.obtener(tarea, html_tarjeta_kanban, hoy, n_deps),
+                                unsafe_allow_html=True)
+
+                    # Boton de edicion rapida
+                    if st.button("✏️", key=f"kanban_edit_{tarea['id']}", help="Editar"):
+                        st.session_state['tarea_editar'] = tarea['id']
+                        st.session_state['pagina_actual'] = "✏️ Editar Tarea"
+                        st.rerun()
+
+                # Callbacks: el clic dentro del fragmento solo vuelve a ejecutar el tablero
+                if restantes:
+                    st.button(f"⬇️ Ver {min(restantes, TARJETAS_POR_PAGINA)} mas ({restantes} restantes)",
+                              key=f"kanban_mas_{estado_id}", use_container_width=True,
+                              on_click=fijar_limite, args=(clave_limite, limite + TARJETAS_POR_PAGINA))
+                elif limite > TARJETAS_POR_PAGINA:
+                    st.button("⬆️ Ver menos", key=f"kanban_menos_{estado_id}", use_container_width=True,
+                              on_click=fijar_limite, args=(clave_limite, TARJETAS_POR_PAGINA))
+
+        metricas.registrar('fragmento', pagina, (time.perf_counter() - inicio_fragmento) * 1000)
+
+    tablero_kanban()
 
 # ============================================
 # PAGINA: PANEL DEL DIA
@@ -1366,22 +1395,29 @@ elif pagina == "🎯 Tablero Kanban":
 elif pagina == "📅 Panel del Dia":
     st.title("📅 Panel del Dia - Que hacer hoy")
 
-    tab_vencidas, tab_hoy, tab_manana = st.tabs([
-        f"🔴 Vencidas ({len(tareas_vencidas_set)})",
-        f"🟡 Hoy ({len(tareas_hoy_set)})",
-        f"🔵 Manana ({len(tareas_manana_set)})"
-    ])
+    if error_programa:
+        st.warning(f"No se pudo nivelar el programa: {error_programa}")
 
-    def render_panel_tareas(tarea_ids, card_class, label):
+    def marcar_finalizada(tarea_id, clave):
+        if st.session_state.get(clave):
+            aplicar_cambios(tarea_id, {'estado': 'finalizado'})
+
+    def render_panel_tareas(tarea_ids, card_class, label, programa):
         """Renderiza las tareas del panel agrupadas por responsable"""
-        panel_tareas = [tareas_dict[tid] for tid in tarea_ids if tid in tareas_dict]
+        panel_tareas = [tareas_dict[tid] for tid in sorted(tarea_ids, key=coleccion.posicion.get)
+                        if tid in tareas_dict]
         if not panel_tareas:
             st.info(f"No hay tareas {label}")
             return
 
+        # Ventana de tarjetas (como en el Kanban)
+        clave_limite = f"panel_limite_{label}"
+        limite = st.session_state.get(clave_limite, TARJETAS_POR_PAGINA)
+        visibles, restantes = ventana(panel_tareas, limite)
+
         # Agrupar por responsable
         por_responsable = {}
-        for t in panel_tareas:
+        for t in visibles:
             resp = get_responsable_nombre(t['responsable'])
             if resp not in por_responsable:
                 por_responsable[resp] = []
@@ -1395,20 +1431,28 @@ elif pagina == "📅 Panel del Dia":
                 prioridad_color = {"urgente": "#dc3545", "alta": "#ff9800", "media": "#2196f3", "baja": "#00acc1"}.get(t['prioridad'], "#9e9e9e")
 
                 # Dependencias
-                deps_pendientes = bloqueado_por.get(t['id'], [])
+                deps_pendientes = coleccion.bloqueado_por.get(t['id'], [])
                 dep_text = ""
                 if deps_pendientes:
                     dep_names = [tareas_dict.get(d, {}).get('tarea', str(d))[:25] for d in deps_pendientes]
                     dep_text = f"🔒 Bloqueada por: {', '.join(dep_names)}"
 
+                # Programa nivelado
+                prog = programa.get(t['id'])
+                prog_text = ""
+                if prog:
+                    prog_text = f"🗓️ Programada: {prog['inicio']} → {prog['fin']}"
+                    if prog['atraso']:
+                        prog_text += f" (⚠️ {prog['atraso']} dias despues del objetivo)"
+
                 col_check, col_info = st.columns([0.3, 5])
                 with col_check:
                     # Checkbox para marcar como finalizada (solo si logueado)
                     if usuario_logueado():
-                        if st.checkbox("✅", key=f"panel_check_{t['id']}", value=False):
-                            actualizar_tarea(t['id'], {'estado': 'finalizado'})
-                            st.session_state['recargar'] = True
-                            st.rerun()
+                        # Una tarea puede estar en dos pestanas (vencida y en programa): clave por pestana.
+                        # El callback corre antes del rerun del fragmento: la tarjeta ya no aparece
+                        st.checkbox("✅", key=f"panel_check_{label}_{t['id']}", value=False,
+                                    on_change=marcar_finalizada, args=(t['id'], f"panel_check_{label}_{t['id']}"))
                     else:
                         st.markdown("🔒")
 
@@ -1423,18 +1467,47 @@ elif pagina == "📅 Panel del Dia":
                             &nbsp; 📅 {t['fecha_objetivo']}
                         </small>
                         {'<br><small style="color:#ffcdd2;">⚠️ ' + dep_text + '</small>' if dep_text else ''}
+                        {'<br><small>' + prog_text + '</small>' if prog_text else ''}
                         {'<br><small style="color:#e0e0e0;">📝 ' + t['notas'] + '</small>' if t.get('notas') else ''}
                     </div>
                     """, unsafe_allow_html=True)
 
-    with tab_vencidas:
-        render_panel_tareas(tareas_vencidas_set, "dia-card-vencida", "vencidas")
+        if restantes:
+            st.button(f"⬇️ Ver {min(restantes, TARJETAS_POR_PAGINA)} mas ({restantes} restantes)",
+                      key=f"panel_mas_{label}", on_click=fijar_limite,
+                      args=(clave_limite, limite + TARJETAS_POR_PAGINA))
+
+    @st.fragment
+    def panel_del_dia():
+        """Pestanas y contadores; marcar una tarea solo vuelve a ejecutar este bloque"""
+        inicio_fragmento = time.perf_counter()
+        clases = coleccion.clasificar_fechas(hoy)
+        programa, _ = programa_actual()
+        programadas_hoy = {i for i, p in programa.items() if p['inicio'] <= hoy <= p['fin']}
 
-    with tab_hoy:
-        render_panel_tareas(tareas_hoy_set, "dia-card-hoy", "para hoy")
+        tab_vencidas, tab_hoy, tab_manana, tab_programadas = st.tabs([
+            f"🔴 Vencidas ({len(clases['vencidas'])})",
+            f"🟡 Hoy ({len(clases['hoy'])})",
+            f"🔵 Manana ({len(clases['manana'])})",
+            f"🗓️ En programa hoy ({len(programadas_hoy)})"
+        ])
 
-    with tab_manana:
-        render_panel_tareas(tareas_manana_set, "dia-card-manana", "para manana")
+        with tab_vencidas:
+            render_panel_tareas(clases['vencidas'], "dia-card-vencida", "vencidas", programa)
+
+        with tab_hoy:
+            render_panel_tareas(clases['hoy'], "dia-card-hoy", "para hoy", programa)
+
+        with tab_manana:
+            render_panel_tareas(clases['manana'], "dia-card-manana", "para manana", programa)
+
+        with tab_programadas:
+            st.caption("Tareas que el programa nivelado ubica hoy segun dependencias y capacidad de cada responsable")
+            render_panel_tareas(programadas_hoy, "dia-card-hoy", "programadas para hoy", programa)
+
+        metricas.registrar('fragmento', pagina, (time.perf_counter() - inicio_fragmento) * 1000)
+
+    panel_del_dia()
 
 # ============================================
 # PAGINA: EDITAR TAREA
@@ -1531,6 +1604,18 @@ elif pagina == "✏️ Editar Tarea":
                         fecha_actual = date.today()
                     nueva_fecha = st.date_input("Fecha objetivo", value=fecha_actual)
 
+                    fecha_inicio_actual = tarea.get('fecha_inicio')
+                    usar_fecha_inicio = st.checkbox("No empezar antes de...", value=bool(fecha_inicio_actual))
+                    nueva_fecha_inicio = None
+                    if usar_fecha_inicio:
+                        try:
+                            valor_inicio = datetime.strptime(str(fecha_inicio_actual)[:10], "%Y-%m-%d").date()
+                        except Exception:
+                            valor_inicio = fecha_actual
+                        nueva_fecha_inicio = st.date_input("Fecha inicio", value=valor_inicio)
+                    nueva_duracion = st.number_input("Duracion (dias de trabajo)", min_value=1,
+                                                     value=int(tarea.get('duracion_dias') or 1), step=1)
+
                     estados_opciones_edit = [e['nombre'] for e in estados]
                     estado_actual = get_estado_nombre(tarea['estado'])
                     estado_idx = estados_opciones_edit.index(estado_actual) if estado_actual in estados_opciones_edit else 0
@@ -1565,6 +1650,8 @@ elif pagina == "✏️ Editar Tarea":
                         datos_actualizados = {
                             'responsable': nuevo_resp_id,
                             'fecha_objetivo': nueva_fecha.strftime("%Y-%m-%d"),
+                            'fecha_inicio': nueva_fecha_inicio.strftime("%Y-%m-%d") if nueva_fecha_inicio else None,
+                            'duracion_dias': int(nueva_duracion),
                             'estado': nuevo_estado_id,
                             'prioridad': nueva_prioridad,
                             'notas': nuevas_notas
@@ -1622,6 +1709,9 @@ elif pagina == "➕ Nuevo Proyecto":
             # Fecha objetivo
             nueva_fecha = st.date_input("Fecha objetivo *", value=hoy + timedelta(days=3))
 
+            # Duracion (la fecha de inicio la calcula el programa nivelado)
+            nueva_duracion = st.number_input("Duracion (dias de trabajo)", min_value=1, value=1, step=1)
+
         with col2:
             # Prioridad
             nueva_prioridad = st.selectbox("Prioridad", ["media", "urgente", "alta", "baja"], index=0)
@@ -1663,6 +1753,7 @@ elif pagina == "➕ Nuevo Proyecto":
                     'categoria': cat_id,
                     'responsable': resp_id,
                     'fecha_objetivo': nueva_fecha.strftime("%Y-%m-%d"),
+                    'duracion_dias': int(nueva_duracion),
                     'prioridad': nueva_prioridad,
                     'estado': estado_id,
                     'dependencias': deps_ids if deps_ids else None,
@@ -1674,6 +1765,61 @@ elif pagina == "➕ Nuevo Proyecto":
                 st.session_state['recargar'] = True
                 st.rerun()
 
+# ============================================
+# PAGINA: DIAGNOSTICO (solo admins)
+# ============================================
+elif pagina == "🩺 Diagnostico":
+    import pandas as pd
+
+    st.title("🩺 Diagnostico de Rendimiento")
+    st.caption(f"Percentiles de las ultimas {metricas.ventana} mediciones de cada span, "
+               "de todas las sesiones desde que arranco la app")
+
+    filas_metricas = metricas.resumen()
+    if not filas_metricas:
+        st.info("Aun no hay mediciones. Navega por las paginas y vuelve aqui.")
+    else:
+        df_metricas = pd.DataFrame(filas_metricas)
+        tipos_span = {
+            'rerun': "🔁 Rerun completo (carga, sidebar y pagina)",
+            'pagina': "📄 Pagina (solo el bloque de la vista)",
+            'fragmento': "🧩 Fragmentos (Kanban, Panel del Dia)",
+            'plotly': "📈 Serializacion de graficos Plotly por pagina",
+            'supabase': "🗄️ Consultas a Supabase (tabla.operacion)",
+        }
+        for tipo, titulo in tipos_span.items():
+            parte = df_metricas[df_metricas['tipo'] == tipo].drop(columns='tipo')
+            if parte.empty:
+                continue
+            st.markdown(f"### {titulo}")
+            st.dataframe(
+                parte.rename(columns={'nombre': 'Nombre', 'n': 'Ventana', 'p50_ms': 'p50 (ms)',
+                                      'p95_ms': 'p95 (ms)', 'max_ms': 'Max (ms)', 'total': 'Total'}),
+                use_container_width=True, hide_index=True
+            )
+
+    st.markdown("---")
+    texto_prometheus = metricas.prometheus()
+    col_d1, col_d2, col_d3 = st.columns(3)
+    with col_d1:
+        if st.button("💾 Exportar a Prometheus", use_container_width=True):
+            try:
+                METRICAS_PATH.parent.mkdir(parents=True, exist_ok=True)
+                metricas.exportar_prometheus(METRICAS_PATH)
+                st.success(f"Metricas escritas en {METRICAS_PATH}")
+            except OSError as e:
+                st.error(f"No se pudo escribir {METRICAS_PATH}: {e}")
+    with col_d2:
+        st.download_button("⬇️ Descargar .prom", texto_prometheus, file_name=METRICAS_PATH.name,
+                           mime="text/plain", use_container_width=True)
+    with col_d3:
+        if st.button("🗑️ Reiniciar metricas", use_container_width=True):
+            metricas.limpiar()
+            st.rerun()
+
+    with st.expander("Ver texto de Prometheus"):
+        st.code(texto_prometheus, language="text")
+
 # ============================================
 # FOOTER
 # ============================================
@@ -1684,4 +1830,9 @@ st.sidebar.markdown("Dashboard v3.0 - Supabase")
 
 if st.sidebar.button("🔄 Recargar Datos"):
     st.session_state['recargar'] = True
+    st.session_state.pop('tarjetas_kanban', None)
     st.rerun()
+
+fin_rerun = time.perf_counter()
+metricas.registrar('pagina', pagina, (fin_rerun - inicio_pagina) * 1000)
+metricas.registrar('rerun', pagina, (fin_rerun - inicio_rerun) * 1000)
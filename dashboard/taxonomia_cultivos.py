@@ -0,0 +1,253 @@
+"""
+HUERTA INTELIGENTE LPET - Taxonomia de cultivos
+================================================
+Fuente unica de clase, ciclo, rendimiento y precio por cultivo, usada por
+Estimaciones (huerta_operativo) y por Produccion y Finanzas (huerta_app).
+
+- CLASES: rendimiento (kg/m2/mes) y precio (COP/kg) por clase
+- CULTIVOS: clase y dias de ciclo de cada cultivo (None = permanente)
+- IndiceCultivos: matriz zona x clase de m2, calculada una vez por
+  version de las zonas (se reconstruye solo si cambian)
+
+Una zona con varios cultivos cuenta su area completa en cada clase que
+tiene (como las estimaciones originales: la cama de tomate y albahaca es
+area de tomate y de aromaticas). Con reparto="partes_iguales" el area se
+divide entre sus cultivos; config['reparto_area'] lo elige en
+Estimaciones. Los cultivos que no estan en la taxonomia quedan en
+'sin_clasificar' para poder avisarlos en pantalla en vez de perderlos.
+
+Se pueden agregar o corregir cultivos en config['cultivos']:
+    "cultivos": {"mizuna": {"clase": "hojas", "ciclo_dias": 40}}
+"""
+
+import hashlib
+import json
+
+import pandas as pd
+
+CLASES = {
+    "hojas": {"nombre": "Hojas verdes", "color": "#4CAF50",
+              "rendimiento_kg_m2_mes": 2.0, "precio_cop_kg": 8000},
+    "brasicas": {"nombre": "Brasicas", "color": "#8BC34A",
+                 "rendimiento_kg_m2_mes": 1.5, "precio_cop_kg": 7000},
+    "raices": {"nombre": "Raices y bulbos", "color": "#FF9800",
+               "rendimiento_kg_m2_mes": 3.0, "precio_cop_kg": 5000},
+    "aromaticas": {"nombre": "Aromaticas", "color": "#9C27B0",
+                   "rendimiento_kg_m2_mes": 0.8, "precio_cop_kg": 20000},
+    "tomate": {"nombre": "Tomate", "color": "#F44336",
+               "rendimiento_kg_m2_mes": 4.0, "precio_cop_kg": 6000},
+    "legumbres": {"nombre": "Leguminosas", "color": "#795548",
+                  "rendimiento_kg_m2_mes": 0.8, "precio_cop_kg": 6000},
+    "descanso": {"nombre": "Descanso / rotacion", "color": "#DEB887",
+                 "rendimiento_kg_m2_mes": 0.0, "precio_cop_kg": 0},
+}
+
+SIN_CLASIFICAR = "sin_clasificar"
+
+# Clases que producen para la venta o el hotel
+CLASES_PRODUCTIVAS = ["hojas", "brasicas", "raices", "aromaticas", "tomate", "legumbres"]
+
+CULTIVOS = {
+    # Hojas
+    "lechuga": {"clase": "hojas", "ciclo_dias": 45},
+    "rucula": {"clase": "hojas", "ciclo_dias": 30},
+    "espinaca": {"clase": "hojas", "ciclo_dias": 45},
+    "acelga": {"clase": "hojas", "ciclo_dias": 60},
+    "mostaza": {"clase": "hojas", "ciclo_dias": 40},
+    "mesclun": {"clase": "hojas", "ciclo_dias": 30},
+    "apio": {"clase": "hojas", "ciclo_dias": 90},
+    # Brasicas
+    "brocoli": {"clase": "brasicas", "ciclo_dias": 90},
+    "coliflor": {"clase": "brasicas", "ciclo_dias": 90},
+    "repollo": {"clase": "brasicas", "ciclo_dias": 100},
+    "kale": {"clase": "brasicas", "ciclo_dias": 60},
+    # Raices y bulbos
+    "zanahoria": {"clase": "raices", "ciclo_dias": 90},
+    "remolacha": {"clase": "raices", "ciclo_dias": 70},
+    "rabano": {"clase": "raices", "ciclo_dias": 30},
+    "nabo": {"clase": "raices", "ciclo_dias": 50},
+    "cebolla": {"clase": "raices", "ciclo_dias": 120},
+    "ajo": {"clase": "raices", "ciclo_dias": 150},
+    # Aromaticas
+    "albahaca": {"clase": "aromaticas", "ciclo_dias": 60},
+    "cilantro": {"clase": "aromaticas", "ciclo_dias": 40},
+    "perejil": {"clase": "aromaticas", "ciclo_dias": 70},
+    "cebollin": {"clase": "aromaticas", "ciclo_dias": 60},
+    "cebolla larga": {"clase": "aromaticas", "ciclo_dias": 90},
+    "oregano": {"clase": "aromaticas", "ciclo_dias": None},
+    "tomillo": {"clase": "aromaticas", "ciclo_dias": None},
+    "romero": {"clase": "aromaticas", "ciclo_dias": None},
+    "medicinales": {"clase": "aromaticas", "ciclo_dias": None},
+    "curcuma": {"clase": "aromaticas", "ciclo_dias": 240},
+    "jengibre": {"clase": "aromaticas", "ciclo_dias": 240},
+    # Fruto
+    "tomate": {"clase": "tomate", "ciclo_dias": 120},
+    # Leguminosas
+    "habas": {"clase": "legumbres", "ciclo_dias": 120},
+    "arvejas": {"clase": "legumbres", "ciclo_dias": 90},
+    # Sin cosecha
+    "rotacion": {"clase": "descanso", "ciclo_dias": None},
+    "abono verde": {"clase": "descanso", "ciclo_dias": None},
+    "gallinas": {"clase": "descanso", "ciclo_dias": None},
+    "almacigos": {"clase": "descanso", "ciclo_dias": None},
+}
+
+# Nombres usados en los JSON que son variedades de un cultivo de la taxonomia
+ALIAS = {
+    "espinaca baby": "espinaca",
+    "mezcla mesclun": "mesclun",
+    "mostaza verde": "mostaza",
+    "arveja": "arvejas",
+    "haba": "habas",
+}
+
+# Zonas que cuentan para la produccion (el tour y el compostaje no)
+TIPOS_PRODUCTIVOS = ("cama", "invernadero")
+
+# Como se atribuye el area de una zona con varios cultivos
+REPARTOS = ("completa", "partes_iguales")
+
+CICLOS = [
+    ("Ciclo Rapido (hasta 45 dias)", 0, 45),
+    ("Ciclo Medio (46-75 dias)", 46, 75),
+    ("Ciclo Largo (mas de 75 dias)", 76, None),
+]
+
+# Titulo -> clave de produccion.cultivos_por_ciclo en huerta_datos.json
+CICLOS_DATOS = [
+    ("Ciclo Rapido (30 dias)", "rapido_30_dias"),
+    ("Ciclo Medio (60 dias)", "medio_60_dias"),
+    ("Ciclo Largo (90+ dias)", "largo_90_dias"),
+    ("Permanentes", "permanente"),
+]
+
+
+def normalizar(nombre):
+    nombre = nombre.strip().lower()
+    nombre = ALIAS.get(nombre, nombre)
+    # Plurales como los escribe la cocina ("lechugas", "tomates")
+    if nombre not in CULTIVOS and nombre not in CLASES:
+        for sufijo in ("es", "s"):
+            if nombre.endswith(sufijo) and nombre[:-len(sufijo)] in CULTIVOS:
+                return nombre[:-len(sufijo)]
+    return nombre
+
+
+def catalogo(extra=None):
+    """CULTIVOS completado con config['cultivos'] (extra gana)"""
+    if not extra:
+        return CULTIVOS
+    return {**CULTIVOS, **{normalizar(k): {**CULTIVOS.get(normalizar(k), {}), **v}
+                           for k, v in extra.items()}}
+
+
+def clase_cultivo(nombre, cultivos=CULTIVOS):
+    info = cultivos.get(normalizar(nombre))
+    return info['clase'] if info else SIN_CLASIFICAR
+
+
+# ============================================================
+# ZONAS
+# ============================================================
+
+def zonas_desde_config(config):
+    """Zonas productivas de huerta_config.json como (id, nombre, m2, cultivos)"""
+    return [(z['id'], z['nombre'], z['ancho'] * z['largo'], list(z.get('cultivos', [])))
+            for z in config.get('zonas', []) if z.get('tipo') in TIPOS_PRODUCTIVOS]
+
+
+def zonas_desde_datos(datos):
+    """Camas e invernadero de huerta_datos.json como (id, nombre, m2, cultivos)"""
+    dimensiones = datos.get('dimensiones', {})
+    zonas = [(f"cama{c['numero']}", f"Cama {c['numero']}", c['area_m2'], list(c.get('cultivos', [])))
+             for c in dimensiones.get('camas_huerta', [])]
+    inv = dimensiones.get('invernadero')
+    if inv:
+        zonas.append(("invernadero", "Invernadero", inv['area_m2'], list(inv.get('cultivos', []))))
+    return zonas
+
+
+# ============================================================
+# INDICE
+# ============================================================
+
+class IndiceCultivos:
+    """Matriz zona x clase (m2) y consultas derivadas"""
+
+    def __init__(self, zonas, extra=None, reparto="completa"):
+        if reparto not in REPARTOS:
+            raise ValueError(f"Reparto desconocido: {reparto} (usar {', '.join(REPARTOS)})")
+        self.cultivos = catalogo(extra)
+        columnas = list(CLASES) + [SIN_CLASIFICAR]
+        filas = []
+        nombres = []
+        self.sin_clasificar = set()
+        for _, nombre, area, cultivos in zonas:
+            fila = dict.fromkeys(columnas, 0.0)
+            for c in cultivos:
+                clase = clase_cultivo(c, self.cultivos)
+                if clase == SIN_CLASIFICAR:
+                    self.sin_clasificar.add(c)
+                if reparto == "partes_iguales":
+                    fila[clase] += area / len(cultivos)
+                else:
+                    fila[clase] = area
+            filas.append(fila)
+            nombres.append(nombre)
+        self.matriz = pd.DataFrame(filas, index=nombres, columns=columnas).fillna(0.0)
+        self.presentes = sorted({normalizar(c) for z in zonas for c in z[3]})
+
+    def area_por_clase(self):
+        """m2 por clase (Series)"""
+        return self.matriz.sum(axis=0)
+
+    def produccion_kg_mes(self, rendimientos=None):
+        """kg/mes por clase productiva; rendimientos reemplaza los de CLASES"""
+        rendimientos = rendimientos or {}
+        area = self.area_por_clase()
+        return pd.Series({c: area[c] * rendimientos.get(c, CLASES[c]['rendimiento_kg_m2_mes'])
+                          for c in CLASES_PRODUCTIVAS})
+
+    def valor_cop_mes(self, rendimientos=None, precios=None):
+        """COP/mes por clase productiva a los precios de CLASES (o los dados)"""
+        precios = precios or {}
+        kg = self.produccion_kg_mes(rendimientos)
+        return pd.Series({c: kg[c] * precios.get(c, CLASES[c]['precio_cop_kg'])
+                          for c in CLASES_PRODUCTIVAS})
+
+    def por_ciclo(self, cultivos_por_ciclo=None):
+        """
+        Diccionario titulo de ciclo -> cultivos (mas 'Permanentes'). Con
+        cultivos_por_ciclo (produccion.cultivos_por_ciclo de los datos) se
+        usan esas listas; si no, los cultivos presentes segun la taxonomia.
+        """
+        if cultivos_por_ciclo:
+            return {titulo: list(cultivos_por_ciclo.get(clave, [])) for titulo, clave in CICLOS_DATOS}
+        grupos = {titulo: [] for titulo, _, _ in CICLOS}
+        grupos["Permanentes"] = []
+        for c in self.presentes:
+            info = self.cultivos.get(c)
+            if not info or info['clase'] == "descanso":
+                continue
+            dias = info.get('ciclo_dias')
+            if dias is None:
+                grupos["Permanentes"].append(c)
+                continue
+            for titulo, desde, hasta in CICLOS:
+                if dias >= desde and (hasta is None or dias <= hasta):
+                    grupos[titulo].append(c)
+                    break
+        return grupos
+
+
+_INDICES = {}
+
+
+def indice_cultivos(zonas, extra=None, reparto="completa"):
+    """IndiceCultivos reutilizado mientras las zonas, el catalogo y el reparto no cambien"""
+    clave = hashlib.md5(json.dumps([zonas, extra, reparto], sort_keys=True, default=str).encode()).hexdigest()
+    if clave not in _INDICES:
+        if len(_INDICES) > 16:
+            _INDICES.clear()
+        _INDICES[clave] = IndiceCultivos(zonas, extra, reparto)
+    return _INDICES[clave]
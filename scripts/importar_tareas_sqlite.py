@@ -0,0 +1,38 @@
+"""
+Script para importar data/tareas_proyecto.json al backend SQLite local
+(data/tareas_proyecto.db, mismo esquema que supabase_schema.sql)
+
+Uso:
+    python scripts/importar_tareas_sqlite.py
+    python scripts/importar_tareas_sqlite.py --json otro.json --db otra.db
+
+Despues ejecutar la app con:
+    TAREAS_BACKEND=sqlite streamlit run dashboard/tareas_equipo.py
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "dashboard"))
+
+from tareas_core import BackendSQLite  # noqa: E402
+
+DATA_PATH = BASE_DIR / "data" / "tareas_proyecto.json"
+DB_PATH = BASE_DIR / "data" / "tareas_proyecto.db"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importar tareas JSON a SQLite")
+    parser.add_argument("--json", default=str(DATA_PATH))
+    parser.add_argument("--db", default=str(DB_PATH))
+    args = parser.parse_args()
+
+    backend = BackendSQLite(args.db)
+    n = backend.importar_json(args.json)
+    print(f"{n} tareas importadas: {args.json} -> {args.db}")
+
+
+if __name__ == "__main__":
+    main()
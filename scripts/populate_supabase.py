@@ -39,7 +39,8 @@ def poblar_equipo(datos):
             supabase.table('equipo').upsert({
                 'id': miembro['id'],
                 'nombre': miembro['nombre'],
-                'rol': miembro.get('rol', '')
+                'rol': miembro.get('rol', ''),
+                'capacidad': miembro.get('capacidad', 1)
             }).execute()
             print(f"  + {miembro['nombre']}")
         except Exception as e:
@@ -105,6 +106,8 @@ def poblar_tareas(datos):
                 'categoria': tarea['categoria'],
                 'tarea': tarea['tarea'],
                 'fecha_objetivo': tarea['fecha_objetivo'],
+                'fecha_inicio': tarea.get('fecha_inicio'),
+                'duracion_dias': tarea.get('duracion_dias'),
                 'estado': tarea['estado'],
                 'responsable': tarea['responsable'],
                 'prioridad': tarea['prioridad'],
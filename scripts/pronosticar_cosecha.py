@@ -0,0 +1,62 @@
+"""
+Job de pronostico de cosecha (corre fuera de Streamlit)
+
+Lee la pestana Cosecha del Google Sheet de config/google_sheets.json (o un
+CSV exportado), ajusta los modelos por cultivo/cama y guarda el artefacto
+output/pronostico_cosecha.json que lee el dashboard.
+
+Ejecutar a mano o programado, por ejemplo cada noche con cron:
+    0 2 * * * cd /ruta/del/proyecto && python scripts/pronosticar_cosecha.py
+
+Uso:
+    python scripts/pronosticar_cosecha.py
+    python scripts/pronosticar_cosecha.py --csv cosecha.csv
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "dashboard"))
+
+from pronostico_cosecha import (  # noqa: E402
+    SEMANAS_PRONOSTICO, PRONOSTICO_PATH, normalizar_cosecha, generar_pronostico, guardar_pronostico
+)
+
+SHEETS_CONFIG_PATH = BASE_DIR / "config" / "google_sheets.json"
+
+
+def leer_cosecha_sheets():
+    """Pestana Cosecha del Google Sheet publico configurado en el dashboard"""
+    if not SHEETS_CONFIG_PATH.exists():
+        print(f"Error: falta {SHEETS_CONFIG_PATH} (configura el Sheet en 'Ver Registros')")
+        sys.exit(1)
+    with open(SHEETS_CONFIG_PATH, 'r') as f:
+        sheet_id = json.load(f)['sheet_id']
+    url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet=Cosecha"
+    return pd.read_csv(url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pronostico de cosecha por cultivo y cama")
+    parser.add_argument("--csv", help="CSV exportado de la pestana Cosecha (en vez del Sheet)")
+    parser.add_argument("--semanas", type=int, default=SEMANAS_PRONOSTICO)
+    args = parser.parse_args()
+
+    crudo = pd.read_csv(args.csv) if args.csv else leer_cosecha_sheets()
+    cosecha = normalizar_cosecha(crudo)
+    print(f"Registros validos: {len(cosecha)}")
+
+    artefacto = generar_pronostico(cosecha, semanas=args.semanas)
+    guardar_pronostico(artefacto)
+
+    series = len({(p['cultivo'], p['cama']) for p in artefacto['pronostico']})
+    print(f"Pronostico de {args.semanas} semanas para {series} series -> {PRONOSTICO_PATH}")
+
+
+if __name__ == "__main__":
+    main()
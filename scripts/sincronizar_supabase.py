@@ -0,0 +1,62 @@
+"""
+Sincronizacion incremental entre data/tareas_proyecto.json y Supabase
+
+A diferencia de populate_supabase.py (carga inicial completa), solo
+transfiere las tareas que cambiaron desde la ultima sincronizacion, en los
+dos sentidos, y guarda la marca de agua en data/sync_supabase.json.
+Ejecutarlo dos veces seguidas sin cambios no escribe nada.
+
+Uso:
+    python scripts/sincronizar_supabase.py
+    python scripts/sincronizar_supabase.py --politica local --borrar
+    python scripts/sincronizar_supabase.py --simular
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+from supabase import create_client
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "dashboard"))
+
+from tareas_core import BackendJSON  # noqa: E402
+from tareas_core.sincronizacion import POLITICAS, TAMANO_LOTE, sincronizar  # noqa: E402
+
+DATA_PATH = BASE_DIR / "data" / "tareas_proyecto.json"
+ESTADO_SYNC_PATH = BASE_DIR / "data" / "sync_supabase.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sincronizar tareas JSON <-> Supabase")
+    parser.add_argument("--politica", choices=POLITICAS, default="reciente",
+                        help="Quien gana si una tarea cambio en los dos lados")
+    parser.add_argument("--borrar", action="store_true",
+                        help="Propagar tareas borradas en un lado (por defecto se vuelven a copiar)")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE)
+    parser.add_argument("--simular", action="store_true", help="Mostrar el plan sin escribir")
+    args = parser.parse_args()
+
+    load_dotenv(BASE_DIR / ".env")
+    url, key = os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY")
+    if not url or not key:
+        print("Error: Faltan SUPABASE_URL o SUPABASE_KEY en .env")
+        sys.exit(1)
+
+    plan, escrituras = sincronizar(BackendJSON(DATA_PATH), create_client(url, key), ESTADO_SYNC_PATH,
+                                   politica=args.politica, borrar=args.borrar,
+                                   tamano_lote=args.lote, simular=args.simular)
+
+    print(f"Subir a Supabase: {len(plan['subir'])}")
+    print(f"Bajar al JSON:    {len(plan['bajar'])}")
+    print(f"Borrar remoto:    {len(plan['borrar_remoto'])}")
+    print(f"Borrar local:     {len(plan['borrar_local'])}")
+    if plan['conflictos']:
+        print(f"Conflictos ({args.politica}): {', '.join(plan['conflictos'])}")
+    print("Simulacion: no se escribio nada" if args.simular else f"Escrituras: {escrituras}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ CREATE TABLE IF NOT EXISTS equipo (
     id TEXT PRIMARY KEY,
     nombre TEXT NOT NULL,
     rol TEXT,
+    capacidad NUMERIC DEFAULT 1, -- Fraccion de jornada (0.5 = medio tiempo)
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
@@ -45,6 +46,8 @@ CREATE TABLE IF NOT EXISTS tareas (
     categoria TEXT REFERENCES categorias(id),
     tarea TEXT NOT NULL,
     fecha_objetivo DATE,
+    fecha_inicio DATE, -- Opcional: no empezar antes de esta fecha
+    duracion_dias INT, -- Dias de trabajo (vacio = 1)
     estado TEXT REFERENCES estados(id) DEFAULT 'por_iniciar',
     responsable TEXT REFERENCES equipo(id) DEFAULT 'sin_asignar',
     prioridad TEXT DEFAULT 'media',
@@ -54,6 +57,11 @@ CREATE TABLE IF NOT EXISTS tareas (
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Columnas agregadas despues de la primera version (bases ya creadas)
+ALTER TABLE equipo ADD COLUMN IF NOT EXISTS capacidad NUMERIC DEFAULT 1;
+ALTER TABLE tareas ADD COLUMN IF NOT EXISTS fecha_inicio DATE;
+ALTER TABLE tareas ADD COLUMN IF NOT EXISTS duracion_dias INT;
+
 -- Trigger para actualizar updated_at automaticamente
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
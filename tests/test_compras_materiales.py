@@ -0,0 +1,39 @@
+"""
+Plan de compras con tareas sin duracion_dias
+============================================
+- SQLite migra la columna como NULL y la sincronizacion con Supabase
+  bajaba duracion_dias: None; PlanCompras debe tomarlas como 1 dia
+"""
+
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "dashboard"))
+
+from compras_materiales import PlanCompras  # noqa: E402
+
+HOY = date(2025, 1, 15)
+
+
+def _datos(**campos):
+    with open(BASE_DIR / "data" / "tareas_proyecto.json", 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    for tarea in datos['tareas']:
+        tarea.update(campos)
+    with open(BASE_DIR / "config" / "huerta_config.json", 'r', encoding='utf-8') as f:
+        presupuesto_real = json.load(f)['presupuesto_real']
+    return datos, presupuesto_real
+
+
+def test_duracion_none_cuenta_como_un_dia():
+    datos, presupuesto_real = _datos(duracion_dias=None)
+    plan = PlanCompras(datos, presupuesto_real, hoy=HOY)
+    datos_uno, _ = _datos(duracion_dias=1)
+    plan_uno = PlanCompras(datos_uno, presupuesto_real, hoy=HOY)
+    assert plan.lineas
+    assert plan.limite == plan_uno.limite
+    assert {c: l['pedir_antes_de'] for c, l in plan.lineas.items()} == \
+           {c: l['pedir_antes_de'] for c, l in plan_uno.lineas.items()}
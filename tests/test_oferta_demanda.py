@@ -0,0 +1,40 @@
+"""
+Cruce oferta / demanda
+======================
+- Items fuera de la taxonomia no se sustituyen entre si por clase
+- Alias y plurales de la cocina llegan al mismo cultivo del pronostico
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "dashboard"))
+
+from oferta_demanda import cruzar  # noqa: E402
+from taxonomia_cultivos import normalizar  # noqa: E402
+
+
+def _pronostico(**kg):
+    return pd.DataFrame({'cultivo': list(kg), 'semana': ['2026-W01'] * len(kg), 'kg': list(kg.values())})
+
+
+def test_sin_clase_no_se_sustituyen():
+    detalle, sugerencias, _ = cruzar(_pronostico(cultivo_nuevo=5.0), {'papaya': 3.0})
+    assert sugerencias.empty
+    assert detalle['faltante'].sum() == 3.0
+
+
+def test_sustitucion_por_misma_clase():
+    _, sugerencias, _ = cruzar(_pronostico(nabo=5.0), {'zanahoria': 2.0})
+    assert sugerencias[['pedido', 'usar', 'kg']].values.tolist() == [['zanahoria', 'nabo', 2.0]]
+
+
+def test_normalizar_alias_y_plurales():
+    assert normalizar(" Lechugas ") == "lechuga"
+    assert normalizar("Tomates") == "tomate"
+    assert normalizar("mostaza verde") == "mostaza"
+    assert normalizar("habas") == "habas"
+    assert normalizar("raices") == "raices"
@@ -0,0 +1,113 @@
+"""
+Programa nivelado por responsable
+=================================
+- Ninguna tarea empieza antes de que terminen sus dependencias
+- Capacidad 1: sin tareas superpuestas; capacidad 2: dos frentes
+- Capacidad 0.5 duplica los dias de calendario
+- 'sin_asignar' y 'contratistas' no se nivelan
+- Dependencias circulares -> ValueError
+"""
+
+import random
+import sys
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "dashboard"))
+
+from tareas_core import ColeccionTareas  # noqa: E402
+from tareas_core.programacion import programar  # noqa: E402
+
+HOY = date(2026, 2, 16)
+EQUIPO = [
+    {'id': 'felipe', 'nombre': 'Felipe'},
+    {'id': 'john', 'nombre': 'John', 'capacidad': 0.5},
+    {'id': 'cuadrilla', 'nombre': 'Cuadrilla', 'capacidad': 2},
+    {'id': 'contratistas', 'nombre': 'Contratistas'},
+    {'id': 'sin_asignar', 'nombre': 'Sin asignar'},
+]
+
+
+def _tarea(i, responsable='felipe', dias=1, dependencias=(), **campos):
+    return {'id': i, 'tarea': f"Tarea {i}", 'estado': 'por_iniciar', 'responsable': responsable,
+            'prioridad': 'media', 'fecha_objetivo': (HOY + timedelta(days=30)).isoformat(),
+            'duracion_dias': dias, 'dependencias': list(dependencias), **campos}
+
+
+def _programa(tareas):
+    coleccion = ColeccionTareas({'equipo': EQUIPO, 'tareas': tareas})
+    return coleccion, programar(coleccion, HOY)
+
+
+def _aleatorias(n=300, semilla=3):
+    """Grafo sin ciclos (dependencias hacia tareas anteriores), algunas finalizadas"""
+    rng = random.Random(semilla)
+    responsables = [e['id'] for e in EQUIPO]
+    tareas = []
+    for i in range(1, n + 1):
+        previas = rng.sample(range(max(1, i - 20), i), k=min(i - 1, rng.randint(0, 3))) if i > 1 else []
+        tareas.append(_tarea(i, rng.choice(responsables), rng.randint(1, 5), previas,
+                             prioridad=rng.choice(['urgente', 'alta', 'media', 'baja']),
+                             estado='finalizado' if rng.random() < 0.1 else 'por_iniciar'))
+    return tareas
+
+
+def _dias(inicio, fin):
+    return [inicio + timedelta(days=k) for k in range((fin - inicio).days + 1)]
+
+
+def test_dependencias_terminan_antes():
+    coleccion, programa = _programa(_aleatorias())
+    assert len(programa) == sum(1 for t in coleccion.lista if t['estado'] != 'finalizado')
+    for i, p in programa.items():
+        assert p['inicio'] >= HOY
+        for d in coleccion.por_id[i]['dependencias']:
+            if d in programa:
+                assert programa[d]['fin'] < p['inicio']
+
+
+@pytest.mark.parametrize("responsable, frentes", [('felipe', 1), ('john', 1), ('cuadrilla', 2)])
+def test_tareas_simultaneas_segun_capacidad(responsable, frentes):
+    coleccion, programa = _programa(_aleatorias())
+    ocupacion = Counter(dia for i, p in programa.items()
+                        if coleccion.por_id[i]['responsable'] == responsable
+                        for dia in _dias(p['inicio'], p['fin']))
+    assert max(ocupacion.values()) == frentes
+
+
+def test_media_jornada_duplica_calendario():
+    _, programa = _programa([_tarea(1, 'john', dias=3), _tarea(2, 'felipe', dias=3)])
+    assert (programa[1]['fin'] - programa[1]['inicio']).days + 1 == 6
+    assert (programa[2]['fin'] - programa[2]['inicio']).days + 1 == 3
+    assert programa[1]['dias'] == 3
+
+
+def test_cuadrilla_trabaja_en_paralelo():
+    _, programa = _programa([_tarea(i, 'cuadrilla', dias=2) for i in range(1, 4)])
+    assert [programa[i]['inicio'] for i in (1, 2, 3)] == [HOY, HOY, HOY + timedelta(days=2)]
+
+
+@pytest.mark.parametrize("responsable", ['sin_asignar', 'contratistas'])
+def test_sin_nivelar_empiezan_juntas(responsable):
+    _, programa = _programa([_tarea(i, responsable, dias=4) for i in range(1, 6)])
+    assert {p['inicio'] for p in programa.values()} == {HOY}
+
+
+def test_prioridad_primero():
+    _, programa = _programa([_tarea(1, prioridad='baja'), _tarea(2, prioridad='urgente')])
+    assert programa[2]['inicio'] < programa[1]['inicio']
+
+
+def test_atraso_contra_fecha_objetivo():
+    _, programa = _programa([_tarea(1, dias=5, fecha_objetivo=(HOY + timedelta(days=2)).isoformat())])
+    assert programa[1]['atraso'] == 2
+
+
+def test_ciclo_lanza_error():
+    tareas = [_tarea(1, dependencias=[3]), _tarea(2, dependencias=[1]), _tarea(3, dependencias=[2]), _tarea(4)]
+    with pytest.raises(ValueError):
+        _programa(tareas)
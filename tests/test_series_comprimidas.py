@@ -0,0 +1,101 @@
+"""
+Series comprimidas de sensores
+==============================
+Ida y vuelta del formato binario: fechas irregulares, huecos NaN, varios
+bloques, lectura 'desde' y agregados en varias llamadas.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "dashboard"))
+
+from series_comprimidas import (  # noqa: E402
+    PUNTOS_POR_BLOQUE, agregar_serie, leer_indice, leer_serie, ultima_fecha
+)
+
+COLUMNAS = ["humedad_suelo", "temperatura"]
+RESOLUCIONES = [1.0, 0.1]
+INICIO = 1735689600  # 2025-01-01 00:00 UTC
+
+
+def _serie(n, semilla=7):
+    """Lecturas cada ~5 min con saltos irregulares, valores a la resolucion de cada columna"""
+    rng = np.random.default_rng(semilla)
+    pasos = np.where(rng.random(n) < 0.1, rng.integers(1, 4000, n), 300)
+    segundos = INICIO + np.cumsum(pasos)
+    valores = {
+        "humedad_suelo": np.round(rng.uniform(10, 90, n)),
+        "temperatura": np.round(rng.normal(18, 4, n), 1),
+    }
+    return segundos, valores
+
+
+def _igual(valores, esperados):
+    for c, res in zip(COLUMNAS, RESOLUCIONES):
+        np.testing.assert_allclose(valores[c], esperados[c], atol=res / 2, equal_nan=True)
+
+
+def test_ida_y_vuelta_fechas_irregulares(tmp_path):
+    segundos, valores = _serie(500)
+    ruta = tmp_path / "s.bin"
+    agregar_serie(ruta, COLUMNAS, RESOLUCIONES, segundos, valores)
+    meta, leidos, columnas = leer_serie(ruta)
+    assert meta['columnas'] == COLUMNAS
+    np.testing.assert_array_equal(leidos, segundos)
+    _igual(columnas, valores)
+    assert ultima_fecha(ruta) == segundos[-1]
+
+
+def test_huecos_nan(tmp_path):
+    segundos, valores = _serie(300)
+    valores["humedad_suelo"][[0, 1, 150, 299]] = np.nan
+    valores["temperatura"][100:120] = np.nan
+    ruta = tmp_path / "s.bin"
+    agregar_serie(ruta, COLUMNAS, RESOLUCIONES, segundos, valores)
+    _, _, columnas = leer_serie(ruta)
+    for c in COLUMNAS:
+        np.testing.assert_array_equal(np.isnan(columnas[c]), np.isnan(valores[c]))
+    _igual(columnas, valores)
+
+
+def test_varios_bloques(tmp_path):
+    n = 2 * PUNTOS_POR_BLOQUE + 17
+    segundos, valores = _serie(n)
+    ruta = tmp_path / "s.bin"
+    agregar_serie(ruta, COLUMNAS, RESOLUCIONES, segundos, valores)
+    _, indice = leer_indice(ruta)
+    assert [b['n'] for b in indice] == [PUNTOS_POR_BLOQUE, PUNTOS_POR_BLOQUE, 17]
+    _, leidos, columnas = leer_serie(ruta)
+    np.testing.assert_array_equal(leidos, segundos)
+    _igual(columnas, valores)
+
+
+def test_leer_desde(tmp_path):
+    n = PUNTOS_POR_BLOQUE + 500
+    segundos, valores = _serie(n)
+    ruta = tmp_path / "s.bin"
+    agregar_serie(ruta, COLUMNAS, RESOLUCIONES, segundos, valores)
+    for k in (0, 10, PUNTOS_POR_BLOQUE - 1, PUNTOS_POR_BLOQUE + 100, n - 1):
+        _, leidos, columnas = leer_serie(ruta, desde=int(segundos[k]))
+        np.testing.assert_array_equal(leidos, segundos[k + 1:])
+        _igual(columnas, {c: v[k + 1:] for c, v in valores.items()})
+
+
+def test_agregar_en_dos_llamadas_igual_a_una(tmp_path):
+    n = PUNTOS_POR_BLOQUE + 300
+    segundos, valores = _serie(n)
+    valores["temperatura"][PUNTOS_POR_BLOQUE - 5:PUNTOS_POR_BLOQUE + 5] = np.nan
+    una = tmp_path / "una.bin"
+    agregar_serie(una, COLUMNAS, RESOLUCIONES, segundos, valores)
+
+    # El corte deja un bloque incompleto que la segunda llamada reescribe
+    dos = tmp_path / "dos.bin"
+    corte = PUNTOS_POR_BLOQUE - 100
+    agregar_serie(dos, COLUMNAS, RESOLUCIONES, segundos[:corte], {c: v[:corte] for c, v in valores.items()})
+    agregar_serie(dos, COLUMNAS, RESOLUCIONES, segundos[corte:], {c: v[corte:] for c, v in valores.items()})
+
+    assert una.read_bytes() == dos.read_bytes()
@@ -0,0 +1,233 @@
+"""
+Sincronizacion JSON <-> Supabase
+================================
+- planificar(): cambio en un solo lado, conflictos con cada politica y
+  filas que faltan en un lado con y sin borrar
+- sincronizar(): una segunda pasada sin cambios no escribe nada
+  (cliente en memoria con la interfaz de postgrest que usa el modulo)
+"""
+
+import copy
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR / "dashboard"))
+
+from tareas_core import BackendJSON  # noqa: E402
+from tareas_core.sincronizacion import huella, planificar, sincronizar  # noqa: E402
+
+ANTES = "2026-01-01T08:00:00+00:00"
+DESPUES = "2026-01-02T08:00:00+00:00"
+
+
+def _tarea(i, **campos):
+    return {'id': i, 'categoria': 'obra', 'tarea': f"Tarea {i}", 'fecha_objetivo': "2026-02-01",
+            'estado': 'por_iniciar', 'responsable': 'felipe', 'prioridad': 'media',
+            'dependencias': [], 'notas': "", 'updated_at': ANTES, **campos}
+
+
+def _lados(*tareas):
+    """(locales, remotas, base) iguales, como despues de una sincronizacion"""
+    locales = {str(t['id']): dict(t) for t in tareas}
+    remotas = {str(t['id']): dict(t) for t in tareas}
+    base = {str(t['id']): huella(t) for t in tareas}
+    return locales, remotas, base
+
+
+# ============================================================
+# PLAN
+# ============================================================
+
+def test_sin_cambios_plan_vacio():
+    plan = planificar(*_lados(_tarea(1), _tarea(2)))
+    assert not any(plan.values())
+
+
+def test_cambio_solo_local_sube():
+    locales, remotas, base = _lados(_tarea(1))
+    locales['1']['estado'] = 'en_proceso'
+    assert planificar(locales, remotas, base)['subir'] == ['1']
+
+
+def test_cambio_solo_remoto_baja():
+    locales, remotas, base = _lados(_tarea(1))
+    remotas['1']['notas'] = "cambiada en Supabase"
+    plan = planificar(locales, remotas, base)
+    assert plan['bajar'] == ['1'] and not plan['conflictos']
+
+
+@pytest.mark.parametrize("politica, local_reciente, lado", [
+    ("reciente", True, 'subir'),
+    ("reciente", False, 'bajar'),
+    ("local", False, 'subir'),
+    ("remoto", True, 'bajar'),
+])
+def test_conflicto_por_politica(politica, local_reciente, lado):
+    locales, remotas, base = _lados(_tarea(1))
+    locales['1'].update(estado='en_proceso', updated_at=DESPUES if local_reciente else ANTES)
+    remotas['1'].update(estado='bloqueado', updated_at=ANTES if local_reciente else DESPUES)
+    plan = planificar(locales, remotas, base, politica=politica)
+    assert plan['conflictos'] == ['1']
+    assert plan[lado] == ['1']
+    assert plan['subir' if lado == 'bajar' else 'bajar'] == []
+
+
+def test_politica_desconocida():
+    with pytest.raises(ValueError):
+        planificar({}, {}, {}, politica="ultima")
+
+
+def test_fila_borrada_con_borrar():
+    locales, remotas, base = _lados(_tarea(1), _tarea(2))
+    del locales['1']
+    del remotas['2']
+    plan = planificar(locales, remotas, base, borrar=True)
+    assert plan['borrar_remoto'] == ['1']
+    assert plan['borrar_local'] == ['2']
+    assert not plan['subir'] and not plan['bajar']
+
+
+def test_fila_borrada_sin_borrar_se_vuelve_a_copiar():
+    locales, remotas, base = _lados(_tarea(1), _tarea(2))
+    del locales['1']
+    del remotas['2']
+    plan = planificar(locales, remotas, base, borrar=False)
+    assert plan['bajar'] == ['1']
+    assert plan['subir'] == ['2']
+    assert not plan['borrar_local'] and not plan['borrar_remoto']
+
+
+def test_fila_borrada_y_cambiada_en_el_otro_lado_no_se_borra():
+    locales, remotas, base = _lados(_tarea(1))
+    del locales['1']
+    remotas['1']['notas'] = "editada despues del borrado"
+    plan = planificar(locales, remotas, base, borrar=True)
+    assert plan['bajar'] == ['1'] and not plan['borrar_remoto']
+
+
+def test_fila_nueva_se_copia():
+    locales, remotas, base = _lados(_tarea(1))
+    locales['2'] = _tarea(2)
+    assert planificar(locales, remotas, base, borrar=True)['subir'] == ['2']
+
+
+# ============================================================
+# EJECUCION
+# ============================================================
+
+class _Consulta:
+    def __init__(self, cliente, tabla):
+        self.cliente = cliente
+        self.tabla = tabla
+        self.operacion = 'select'
+        self.filtros = []
+        self.carga = None
+
+    def select(self, columnas='*'):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def gt(self, campo, valor):
+        self.filtros.append(lambda f: str(f.get(campo)) > valor)
+        return self
+
+    def eq(self, campo, valor):
+        self.filtros.append(lambda f: f.get(campo) == valor)
+        return self
+
+    def in_(self, campo, valores):
+        self.filtros.append(lambda f: f.get(campo) in valores)
+        return self
+
+    def _escritura(self, operacion, carga=None):
+        self.operacion, self.carga = operacion, carga
+        return self
+
+    def upsert(self, filas):
+        return self._escritura('upsert', filas)
+
+    def insert(self, fila):
+        return self._escritura('upsert', fila)
+
+    def update(self, cambios):
+        return self._escritura('update', cambios)
+
+    def delete(self):
+        return self._escritura('delete')
+
+    def execute(self):
+        filas = self.cliente.tablas.setdefault(self.tabla, [])
+        elegidas = [f for f in filas if all(filtro(f) for filtro in self.filtros)]
+        if self.operacion == 'select':
+            return _Respuesta(copy.deepcopy(elegidas))
+        self.cliente.escrituras += 1
+        ahora = datetime.now(timezone.utc).isoformat()
+        if self.operacion == 'upsert':
+            for fila in self.carga if isinstance(self.carga, list) else [self.carga]:
+                fila = {'id': len(filas) + 1, **fila}
+                if self.tabla == 'tareas':
+                    fila['updated_at'] = ahora  # como el trigger de supabase_schema.sql
+                existente = next((f for f in filas if f['id'] == fila['id']), None)
+                if existente:
+                    existente.update(fila)
+                else:
+                    filas.append(fila)
+        elif self.operacion == 'update':
+            for fila in elegidas:
+                fila.update(self.carga)
+        else:
+            self.cliente.tablas[self.tabla] = [f for f in filas if f not in elegidas]
+        return _Respuesta([])
+
+
+class _Respuesta:
+    def __init__(self, data):
+        self.data = data
+
+
+class ClienteMemoria:
+    """Tablas de Supabase en memoria; cuenta las llamadas de escritura"""
+
+    def __init__(self, tablas=None):
+        self.tablas = tablas or {}
+        self.escrituras = 0
+
+    def table(self, nombre):
+        return _Consulta(self, nombre)
+
+
+def _proyecto(tmp_path, tareas):
+    ruta = tmp_path / "tareas.json"
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({
+            'metadata': {'proyecto': "Prueba", 'fecha_inicio_obra': "2026-02-23"},
+            'equipo': [{'id': 'felipe', 'nombre': 'Felipe', 'rol': 'Propietario'}],
+            'estados': [{'id': 'por_iniciar', 'nombre': 'Por iniciar', 'color': '#6c757d'}],
+            'categorias': [{'id': 'obra', 'nombre': 'Obra', 'icono': '🏗️'}],
+            'tareas': tareas,
+        }, f)
+    return BackendJSON(ruta)
+
+
+def test_segunda_pasada_sin_cambios_no_escribe(tmp_path):
+    backend = _proyecto(tmp_path, [_tarea(1), _tarea(2, estado='en_proceso')])
+    remota = {**_tarea(3), 'id': '3', 'dependencias': ['1']}
+    cliente = ClienteMemoria({'tareas': [remota]})
+    ruta_estado = tmp_path / "sync.json"
+
+    plan, escrituras = sincronizar(backend, cliente, ruta_estado)
+    assert plan['subir'] == ['1', '2'] and plan['bajar'] == ['3']
+    assert escrituras > 0
+    assert {t['id'] for t in backend.cargar()['tareas']} == {1, 2, 3}
+
+    cliente.escrituras = 0
+    plan, escrituras = sincronizar(backend, cliente, ruta_estado)
+    assert not any(plan.values())
+    assert escrituras == 0 and cliente.escrituras == 0